@@ -4,12 +4,23 @@ import sys
 import json
 import time
 import math
+import random
 import queue
 import shutil
+import glob
 import string
+import copy
 import logging
+import bisect
+import heapq
+import socket
 import threading
+import weakref
+import functools
+import contextlib
 import hashlib, tempfile, os
+from collections import OrderedDict, deque
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 if getattr(sys, 'frozen', False):  # running from PyInstaller .exe
     ffmpeg_path = os.path.join(sys._MEIPASS, "ffmpeg.exe")
     os.environ["PATH"] = ffmpeg_path + os.pathsep + os.environ["PATH"]
@@ -23,16 +34,30 @@ except Exception:
     THUMB_OK = False
 
 import subprocess
+import multiprocessing
+from multiprocessing.connection import wait as wait_connections
 import webbrowser
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait as wait_futures, FIRST_COMPLETED
 
 try:
     from yt_dlp import YoutubeDL
+    from yt_dlp.version import __version__ as YTDLP_VERSION
 except Exception as e:
     raise SystemExit("yt-dlp is required. Install with: pip install yt-dlp\n" + str(e))
 
+# The pooled instances and download wrappers below use YoutubeDL internals
+# (_parse_outtmpl, _num_downloads, _pps, _progress_hooks, _calc_headers,
+# _request_director, _copy_infodict) and
+# MemoryFragmentsMixin overrides FragmentFD's _download_fragment, _read_fragment
+# and _hook_progress. They were checked against yt-dlp releases in this range.
+YTDLP_MIN_VERSION = "2023.11.16"
+YTDLP_TESTED_VERSION = "2026.08.19"
+if YTDLP_VERSION < YTDLP_MIN_VERSION:
+    raise SystemExit(f"yt-dlp {YTDLP_MIN_VERSION} or newer is required (found {YTDLP_VERSION}). "
+                     "Install with: pip install -U yt-dlp")
+
 try:
     from tkinterdnd2 import DND_FILES, TkinterDnD
     DND_AVAILABLE = True
@@ -60,6 +85,76 @@ APP_VERSION = "v1.1"
 CONFIG_FILE = os.path.join(os.path.expanduser("~"), ".ytdl_gui_settings.json")
 HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".ytdl_gui_history.json")
 LOG_FILE = os.path.join(os.path.expanduser("~"), ".ytdl_gui.log")
+HISTORY_DIR = os.path.join(os.path.expanduser("~"), ".ytdl_gui_history")
+ARCHIVE_FILE = os.path.join(os.path.expanduser("~"), ".ytdl_gui_archive.txt")   # yt-dlp --download-archive format
+ARCHIVE_BLOOM_CAPACITY = 1_000_000
+ARCHIVE_BLOOM_ERROR_RATE = 0.001
+SUBSCRIPTIONS_FILE = os.path.join(os.path.expanduser("~"), ".ytdl_gui_subscriptions.json")
+SYNC_KNOWN_STREAK = 5                      # stop after this many known entries in a row
+
+HISTORY_SEGMENT_BYTES = 4 * 1024 * 1024    # roll over to a new segment at this size
+HISTORY_COMPACT_SEGMENTS = 8               # compact once this many segments pile up
+HISTORY_COMPACT_INTERVAL = 30 * 60         # seconds between compaction checks
+HISTORY_PAGE_SIZE = 200                    # rows inserted per page in the History window
+HISTORY_SEARCH_DEBOUNCE_MS = 200
+HISTORY_RECENT = 1000                      # appends kept in memory for late subscribers
+
+THUMB_SIZE = (90, 50)
+THUMB_CACHE_MAX_BYTES = 20 * 1024 * 1024   # cap for the ytdl_thumbs temp folder
+THUMB_WORKERS = 4
+
+SCHEDULER_POLICIES = ("fifo", "priority", "sjf")
+PRIORITY_STEP = 300                        # one priority level is worth 5 minutes of waiting
+SJF_REFERENCE_RATE = 1024 * 1024           # bytes/s used to turn a file size into seconds of work
+SJF_UNKNOWN_BYTES = 200 * 1024 * 1024      # assumed size when metadata has no filesize
+
+ADAPTIVE_MAX_SLOTS = 8                     # upper bound for auto concurrency
+ADAPTIVE_INTERVAL = 5                      # seconds between throughput samples
+ADAPTIVE_MIN_GAIN = 0.05                   # an extra slot must add 5% throughput to stay
+ADAPTIVE_PLATEAU_HOLD = 6                  # samples to wait after a slot did not pay off
+ADAPTIVE_BACKOFF_HOLD = 12                 # samples to wait after the site pushed back
+BANDWIDTH_RECHECK = 30                     # seconds between bandwidth schedule checks
+THROTTLE_RE = re.compile(r"HTTP Error 4(29|03)|Too Many Requests|rate.?limit|throttl", re.I)
+
+ERROR_CLASSES = (                          # first match wins; anything else is permanent
+    ("throttled", re.compile(r"HTTP Error 429|Too Many Requests|rate.?limit|throttl", re.I)),
+    ("blocked", re.compile(r"HTTP Error 403|Forbidden|geo.?restrict|available in your (country|region)", re.I)),
+    ("transient", re.compile(r"timed? ?out|Connection (reset|refused|aborted)|Remote end closed|Temporary failure"
+                             r"|Name or service not known|getaddrinfo|IncompleteRead|bytes read|more expected"
+                             r"|Did not get any data|HTTP Error 5\d\d|Bad Gateway|Service Unavailable"
+                             r"|Network is unreachable|SSL|EOF occurred|download process exited", re.I)),
+)
+RETRY_MAX_DELAY = 15 * 60                  # cap for the doubling retry backoff
+RETRY_THROTTLE_DELAY = 60                  # shortest first wait after HTTP 429 / rate limiting
+BREAKER_MAX_COOLDOWN = 30 * 60             # cap for a site whose trial downloads keep failing
+
+PLAYLIST_BATCH = 25                        # child tasks handed to the UI per batch while expanding
+PLAYLIST_EXPAND_WORKERS = 2
+
+SEGMENT_MIN_FILE = 8 * 1024 * 1024         # smaller files are not worth extra connections
+SEGMENT_MIN_SPLIT = 1024 * 1024            # never split off less than this
+SEGMENT_CHUNK = 256 * 1024                 # read size per connection
+SEGMENT_RETRIES = 5                        # failed range requests before giving up
+
+FRAGMENT_MAX_WORKERS = 16                  # upper bound for fragments in flight per stream
+FRAGMENT_START_WORKERS = 4                 # adaptive starting point for a host not seen yet
+FRAGMENT_WINDOW = 2                        # reorder buffer, in multiples of fragments in flight
+FRAGMENT_CHUNK = 64 * 1024                 # read size per fragment request
+FRAGMENT_PLATEAU_HOLD = 4                  # rounds to wait after an extra fragment did not pay off
+FRAGMENT_RETRIES = 10                      # per fragment, yt-dlp's command-line default; the API has none
+
+CHECKPOINT_EXPIRY_MARGIN = 60              # treat signed URLs expiring within this many seconds as dead
+
+POSTPROCESS_NICE = 10                      # CPU niceness of post-processing threads (and ffmpeg on Linux)
+
+ABORT_KILL_GRACE = 2.0                     # seconds a child process gets after SIGTERM before it is killed
+ABORT_DEADLINE = 1.0                       # pause/cancel slower than this is logged as a warning
+
+YDL_POOL_IDLE = 4                          # warm YoutubeDL instances kept per option set
+YDL_TASK_OPTS = ("outtmpl", "format", "progress_hooks", "postprocessor_hooks", "logger")
+
+METADATA_CACHE_SIZE = 256          # info dicts kept in memory
+METADATA_CACHE_TTL = 30 * 60       # seconds; signed media URLs expire after a few hours
 
 DEFAULT_SETTINGS = {
     "download_folder": os.path.join(os.path.expanduser("~"), "Downloads"),
@@ -72,17 +167,46 @@ DEFAULT_SETTINGS = {
     "filename_template": "%(title)s.%(ext)s",
     "concurrent_downloads": 1,
     "clipboard_autofill": True,
-    "max_download_speed": 0,
+    "max_download_speed": 0,        # KB/s shared by all downloads, 0 = unlimited
+    "bandwidth_schedule": [],       # [{"start": "01:00", "end": "07:00", "limit": 0}, ...] KB/s
+    "per_task_share": 0,            # % of the limit one download may use, 0 = no cap
     "enable_playlist": False,
+    "ui_refresh_rate": 5,           # task-list repaints per second
+    "skip_downloaded": True,
+    "scheduler_policy": "fifo",     # fifo | priority | sjf
+    "scheduler_aging": 1.0,         # seconds of cost forgiven per second waited
+    "per_site_limit": 2,            # simultaneous downloads per site, 0 = no limit
+    "site_limits": {},              # per-site overrides, e.g. {"youtube": 3}
+    "adaptive_concurrency": False,  # tune active slots from measured throughput
+    "process_mode": False,          # run each download in its own process (no shared GIL)
+    "parallel_streams": True,       # fetch video and audio of a merged format at the same time
+    "segment_connections": 4,       # connections per file for multi-connection downloads
+    "segmented_hosts": [],          # sites that use them by default, "*" = every site
+    "fragment_concurrency": 0,      # HLS/DASH fragments fetched at once, 0 = adaptive
+    "fragment_hosts": {},           # per-site overrides, e.g. {"vimeo.com": 8}
+    "postprocess_workers": 1,       # ffmpeg jobs (merge, audio, subtitles) run side by side
+    "postprocess_nice": POSTPROCESS_NICE,
+    "retry_attempts": 3,            # automatic retries of a failed download, 0 = off
+    "retry_delay": 5,               # seconds before the first retry, doubled for each next one
+    "breaker_threshold": 3,         # failures in a row that pause a site, 0 = never
+    "breaker_cooldown": 120,        # seconds a paused site rests before one trial download
 }
 
 TASK_NEW = "NEW"
 TASK_QUEUED = "QUEUED"
 TASK_RUNNING = "RUNNING"
+TASK_PROCESSING = "PROCESSING"
 TASK_PAUSED = "PAUSED"
 TASK_DONE = "DONE"
 TASK_FAILED = "FAILED"
 TASK_CANCELED = "CANCELED"
+TASK_SKIPPED = "SKIPPED"
+TASK_STATUSES = (TASK_NEW, TASK_QUEUED, TASK_RUNNING, TASK_PROCESSING, TASK_PAUSED, TASK_DONE, TASK_FAILED, TASK_CANCELED,
+                 TASK_SKIPPED)
+
+ROW_HEIGHT = 60
+VIEW_HEADER_HEIGHT = 24
+THUMB_MEMORY_ROWS = 64     # PhotoImages kept beyond the visible window
 
 USER_CANCEL_SIGNAL = "__USER_CANCEL__"
 USER_PAUSE_SIGNAL = "__USER_PAUSE__"
@@ -94,6 +218,8 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(threadName)s: %(message)s",
 )
 logger = logging.getLogger(APP_NAME)
+if YTDLP_VERSION[:10] > YTDLP_TESTED_VERSION:
+    logger.warning("yt-dlp %s is newer than the last tested release (%s)", YTDLP_VERSION, YTDLP_TESTED_VERSION)
 
 def sanitize_filename(name: str) -> str:
     allowed = f"-_.()[] %s%s" % (string.ascii_letters, string.digits)
@@ -103,6 +229,1063 @@ YDL_URL_RE = re.compile(r"https?://")
 def is_valid_url(url: str) -> bool:
     return bool(YDL_URL_RE.match(url or ""))
 
+def url_host(url: str) -> str:
+    host = (urlsplit(url or "").hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "si", "feature", "ref", "ref_src"}
+# a YouTube channel URL without a tab, which yt-dlp lists as one playlist per tab
+YOUTUBE_CHANNEL_ROOT = re.compile(r"(?:www\.|m\.)?youtube\.com/(?:@[^/]+|(?:channel|c|user)/[^/]+)/?", re.I)
+def normalize_url(url: str) -> str:
+    """Cache key for a URL: lower-case scheme/host, no fragment, no tracking params."""
+    parts = urlsplit((url or "").strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in TRACKING_PARAMS and not k.startswith("utm_")
+    )
+    netloc = parts.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path.rstrip("/") or "/", urlencode(query), ""))
+
+def subscription_list_url(url: str) -> str:
+    """The list a subscription to ``url`` syncs: a bare YouTube channel means its videos tab."""
+    parts = urlsplit(url.strip())
+    if YOUTUBE_CHANNEL_ROOT.fullmatch(parts.netloc + parts.path):
+        return urlunsplit(parts._replace(path=parts.path.rstrip("/") + "/videos"))
+    return url
+
+def clone_info(info: dict) -> dict:
+    """Private copy of a cached info dict; yt-dlp mutates what it processes."""
+    try:
+        return copy.deepcopy(info)
+    except Exception:
+        return YoutubeDL.sanitize_info(info)
+
+SELECTION_KEYS = ("requested_formats", "requested_downloads", "requested_subtitles", "format_id", "format",
+                  "url", "ext", "protocol", "_filename", "filename")
+
+def unselected_info(info: dict) -> dict:
+    """
+    Private copy of a cached info dict with yt-dlp's format pick undone.
+    The cache holds the result of the default selection, whose chosen
+    format's fields sit at the top level; processing it again for another
+    format or audio-only would keep the stale ``url``, ``fragments`` etc.
+    """
+    info = clone_info(info)
+    def strip(entry):
+        if not isinstance(entry, dict):
+            return
+        for child in entry.get("entries") or ():
+            strip(child)
+        formats = entry.get("formats")
+        if not formats:
+            return      # single-format result: its url is the video itself
+        picked = set(SELECTION_KEYS)
+        for f in list(formats) + list(entry.get("requested_formats") or ()):
+            picked.update(f)
+        for key in picked:
+            entry.pop(key, None)
+    strip(info)
+    return info
+
+def partial_artifacts(path: str):
+    """Files yt-dlp may leave behind for an unfinished download of ``path``."""
+    yield path
+    yield path + ".part"
+    yield path + ".ytdl"
+    yield path + ".part.segments"
+    yield from glob.glob(glob.escape(path) + "-Frag*")
+
+def remove_partial_files(tasks):
+    """Delete every artifact the progress hooks recorded for ``tasks`` (local I/O only)."""
+    removed = 0
+    for task in tasks:
+        for recorded in list(task.partial_files):
+            for path in partial_artifacts(recorded):
+                try:
+                    if os.path.isfile(path):
+                        os.remove(path)
+                        removed += 1
+                        logger.info("Deleted partial file: %s", path)
+                except OSError as e:
+                    logger.warning("Could not delete partial file %s: %s", path, e)
+        task.partial_files.clear()
+    return removed
+
+@functools.lru_cache(maxsize=4096)
+def archive_id_for_url(url: str):
+    """``"<extractor> <id>"`` for a URL without any network access, or None."""
+    for ie in _extractor_classes():
+        if ie.suitable(url):
+            if ie.ie_key() == "Generic":
+                return None
+            video_id = ie.get_temp_id(url)
+            return f"{ie.ie_key().lower()} {video_id}" if video_id else None
+    return None
+
+@functools.lru_cache(maxsize=1)
+def _extractor_classes():
+    from yt_dlp.extractor import gen_extractor_classes
+    return gen_extractor_classes()
+
+def archive_id_for_info(info: dict):
+    """Same key yt-dlp writes to its download archive."""
+    extractor = info.get("extractor_key") or info.get("ie_key")
+    if not extractor or not info.get("id") or info.get("_type", "video") != "video":
+        return None
+    return f"{extractor.lower()} {info['id']}"
+
+def dedup_key_for(task) -> tuple:
+    """Tasks with the same key would produce the same file and can share one download."""
+    media = task.archive_id or archive_id_for_url(task.url) or normalize_url(task.url)
+    return media, task.format_id, bool(task.audio_only)
+
+def share_download(leader, follower, info=None):
+    """Give ``follower`` the leader's file, hardlinking when its output template differs."""
+    if not leader.filename or not follower.outtmpl or follower.outtmpl == leader.outtmpl or info is None:
+        return leader.filename
+    ext = os.path.splitext(leader.filename)[1]
+    with YDL_POOL.session({"quiet": True}, outtmpl=follower.outtmpl) as ydl:
+        base, _ = os.path.splitext(ydl.prepare_filename(dict(unselected_info(info), ext=ext[1:])))
+    target = base + ext
+    if os.path.abspath(target) == os.path.abspath(leader.filename) or os.path.exists(target):
+        return target
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    try:
+        os.link(leader.filename, target)
+    except OSError:
+        shutil.copy2(leader.filename, target)   # different volume or no hardlink support
+    return target
+
+def format_spec_for(task, audio_only=False) -> str:
+    """yt-dlp ``format`` for ``task``: its own pick, else best audio or best video+audio."""
+    return task.format_id or ("bestaudio/best" if task.audio_only or audio_only else "bestvideo+bestaudio/best")
+
+def pick_formats(info: dict, spec: str):
+    """
+    Formats of ``info`` that ``spec`` would download, for size estimates.
+    Understands format ids and best/bestvideo/bestaudio joined by ``+``
+    with ``/`` fallbacks; None when nothing matches.
+    """
+    formats = info.get("formats") or []     # sorted worst to best
+    by_id = {f.get("format_id"): f for f in formats}
+    kinds = {
+        "best": lambda f: f.get("vcodec") != "none" and f.get("acodec") != "none",
+        "bestvideo": lambda f: f.get("vcodec") != "none" and f.get("acodec") == "none",
+        "bestaudio": lambda f: f.get("vcodec") == "none" and f.get("acodec") != "none",
+    }
+    for alternative in spec.split("/"):
+        picked = []
+        for part in alternative.split("+"):
+            part = part.strip()
+            if part in by_id:
+                picked.append(by_id[part])
+            elif part in kinds:
+                match = [f for f in formats if kinds[part](f)]
+                if not match:
+                    break
+                picked.append(match[-1])
+            else:
+                break
+        else:
+            return picked
+    return None
+
+def estimate_size(info: dict, spec: str = None):
+    """Expected download size in bytes from (cached) metadata for format ``spec``, or None."""
+    formats = (spec and pick_formats(info, spec)) or info.get("requested_formats") or [info]
+    total = sum((f.get("filesize") or f.get("filesize_approx") or 0) for f in formats)
+    return total or None
+
+def downloaded_path(ydl, info: dict) -> str:
+    """Final path of a finished download, falling back to the output template."""
+    for d in reversed(info.get("requested_downloads") or []):
+        if d.get("filepath"):
+            return d["filepath"]
+    return info.get("filepath") or ydl.prepare_filename(info)
+
+class TaskIO:
+    """
+    Sockets and child processes opened on behalf of one task, so pause and
+    cancel can interrupt blocked I/O right away instead of waiting for
+    yt-dlp's next progress hook. A thread works for a task after
+    ``TaskIO.bind(task.io)``; ``carry_task_io`` hands that on to helper
+    threads. ``abort`` shuts the sockets down, terminates the processes
+    (killing them after ``ABORT_KILL_GRACE``), refuses new connections and
+    stops yt-dlp from retrying, so the task ends with the pause/cancel
+    signal instead of working through its retries.
+    """
+
+    _local = threading.local()
+
+    def __init__(self):
+        self.requested = None           # monotonic time of the first abort
+        self.signal = None              # USER_CANCEL_SIGNAL or USER_PAUSE_SIGNAL
+        self._sockets = weakref.WeakSet()
+        self._procs = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def current(cls):
+        return getattr(cls._local, "io", None)
+
+    @classmethod
+    def bind(cls, io):
+        """Make ``io`` the calling thread's TaskIO (``None`` unbinds); returns the previous one."""
+        prev = cls.current()
+        cls._local.io = io
+        return prev
+
+    def track(self, obj):
+        """Register a socket or process; once aborted, sockets are refused and processes terminated."""
+        with self._lock:
+            if self.requested is None:
+                (self._sockets if isinstance(obj, socket.socket) else self._procs).add(obj)
+                return
+        if isinstance(obj, socket.socket):
+            raise ConnectionAbortedError(self.signal)
+        self._terminate([obj])
+
+    def abort(self, signal: str):
+        with self._lock:
+            if self.requested is None:
+                self.requested, self.signal = time.monotonic(), signal
+            sockets, procs = list(self._sockets), list(self._procs)
+        for sock in sockets:
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)
+        self._terminate(procs)
+
+    def release(self):
+        """Forget everything tracked so far (pooled connections outlive the task)."""
+        with self._lock:
+            self._sockets.clear()
+            self._procs.clear()
+
+    @staticmethod
+    def _terminate(procs):
+        def alive(proc):
+            return proc.is_alive() if hasattr(proc, "is_alive") else proc.poll() is None
+        procs = [p for p in procs if alive(p)]
+        for proc in procs:
+            with contextlib.suppress(OSError):
+                proc.terminate()
+        if procs:
+            def kill():
+                for proc in procs:
+                    if alive(proc):
+                        with contextlib.suppress(OSError):
+                            proc.kill()
+            timer = threading.Timer(ABORT_KILL_GRACE, kill)
+            timer.daemon = True
+            timer.start()
+
+def carry_task_io(fn):
+    """Bind ``fn`` to the calling thread's ``TaskIO`` for whichever thread ends up running it."""
+    io = TaskIO.current()
+    if io is None:
+        return fn
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        prev = TaskIO.bind(io)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            TaskIO.bind(prev)
+    return wrapper
+
+def response_socket(response):
+    """The socket a yt-dlp ``Response`` reads from (through urllib3/http.client), or None."""
+    obj = response
+    for _ in range(8):
+        if isinstance(obj, socket.socket):
+            return obj
+        obj = next((getattr(obj, a) for a in ("fp", "_fp", "raw", "_sock") if getattr(obj, a, None) is not None), None)
+        if obj is None:
+            return None
+    return None
+
+_REQUESTING = threading.local()      # .io while this thread is inside a tracked ydl.urlopen
+
+def install_request_tracking(ydl):
+    """
+    Wrap ``ydl.urlopen`` so every request made for a task (extractors,
+    downloaders, segments) registers its socket with the thread's
+    ``TaskIO``: new connections through the ``socket.connect`` audit hook
+    of ``install_io_tracking``, reused ones through the response. Once the
+    task is aborted, requests fail like a dropped connection and yt-dlp's
+    retry raises the signal.
+    """
+    from yt_dlp.networking.exceptions import TransportError
+    urlopen = ydl.urlopen
+    def wrapper(req):
+        io = TaskIO.current()
+        if io is None:
+            return urlopen(req)
+        if io.requested is not None:
+            raise TransportError(cause=ConnectionAbortedError(io.signal))
+        _REQUESTING.io = io
+        try:
+            response = urlopen(req)
+        finally:
+            _REQUESTING.io = None
+        sock = response_socket(response)
+        if sock is not None:
+            try:
+                io.track(sock)
+            except ConnectionAbortedError as e:
+                response.close()
+                raise TransportError(cause=e) from e
+        return response
+    ydl.urlopen = wrapper
+
+_IO_TRACKING = threading.Lock()     # held for good once install_io_tracking has run
+
+def install_io_tracking():
+    """
+    Register the ffmpeg (and other helper) processes yt-dlp starts, and
+    the connections opened inside a tracked ``ydl.urlopen``, with the
+    current thread's ``TaskIO``. A downloader about to retry for an
+    aborted task raises its signal.
+
+    This is process-wide: it adds an audit hook, which cannot be removed,
+    and patches ``yt_dlp.utils.Popen`` and ``FileDownloader.report_retry``
+    for every YoutubeDL. Each of them returns straight to yt-dlp's own
+    behaviour unless the calling thread is bound to a TaskIO (the socket
+    hook only inside a pooled instance's ``urlopen``), so other YoutubeDL
+    instances are unaffected. Later calls do nothing.
+    """
+    if not _IO_TRACKING.acquire(blocking=False):
+        return
+    import yt_dlp
+    from yt_dlp.downloader.common import FileDownloader
+    from yt_dlp.utils import Popen
+    def connect_hook(event, args):
+        if event != "socket.connect":
+            return
+        io = getattr(_REQUESTING, "io", None)
+        if io is not None:
+            io.track(args[0])
+    sys.addaudithook(connect_hook)
+
+    popen_init = Popen.__init__
+    def tracked_popen(self, *args, **kwargs):
+        popen_init(self, *args, **kwargs)
+        io = TaskIO.current()
+        if io is not None:
+            io.track(self)
+    Popen.__init__ = tracked_popen
+
+    report_retry = FileDownloader.report_retry
+    def abortable_retry(self, *args, **kwargs):
+        io = TaskIO.current()
+        if io is not None and io.requested is not None:
+            raise yt_dlp.utils.DownloadError(io.signal)
+        return report_retry(self, *args, **kwargs)
+    FileDownloader.report_retry = abortable_retry
+
+def fetch_formats_in_parallel(ydl, info_dict):
+    """
+    Download every format of a ``bestvideo+bestaudio`` style selection at
+    once, to the ``<name>.f<format_id>.<ext>`` paths yt-dlp's merge step
+    uses. yt-dlp's own sequential loop then finds each file already in
+    place and goes straight to the merge. On any error other than a user
+    pause/cancel this just returns and yt-dlp fetches the rest itself.
+    """
+    from yt_dlp.downloader import get_suitable_downloader
+    formats = info_dict.get("requested_formats") or []
+    if len(formats) < 2 or ydl.params.get("simulate") or ydl.params.get("skip_download"):
+        return
+    if (info_dict.get("protocol") or info_dict.get("url")) and get_suitable_downloader(dict(info_dict), ydl.params):
+        return      # a single downloader (e.g. ffmpeg) fetches all formats itself
+    if ydl.in_download_archive(info_dict):
+        return
+    match_filter = ydl.params.get("match_filter")
+    if match_filter is not None:
+        # anything but a plain pass (a reason, an interactive prompt, a cancel)
+        # is left for process_info to act on
+        try:
+            if match_filter(info_dict, incomplete=False) is not None:
+                return
+        except Exception:
+            return
+    # mirror process_info so %(autonumber)s matches; there is no public counter
+    # for it, see YTDLP_MIN_VERSION
+    ydl._num_downloads += 1
+    try:
+        temp = ydl.prepare_filename(info_dict, "temp")
+        final = ydl.prepare_filename(info_dict)
+    finally:
+        ydl._num_downloads -= 1
+    if not temp or temp == "-":
+        return
+    ext = info_dict["ext"]
+    def without_ext(path):
+        root, real_ext = os.path.splitext(path)
+        return root if real_ext[1:] == ext else path
+    base = without_ext(temp)
+    if os.path.exists(f"{without_ext(final)}.{ext}") or os.path.exists(f"{base}.{ext}"):
+        return
+    os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+    jobs = []
+    for f in formats:
+        new_info = dict(info_dict)
+        del new_info["requested_formats"]
+        new_info.update(f)
+        jobs.append((f"{base}.f{f['format_id']}.{f['ext']}", new_info))
+    with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="Stream") as pool:
+        futures = [pool.submit(carry_task_io(ydl.dl), name, new_info) for name, new_info in jobs]
+    for future in futures:
+        try:
+            future.result()
+        except Exception as e:
+            if "__USER_" in str(e):
+                raise
+            logger.warning("Parallel stream fetch failed, continuing sequentially: %s", e)
+            return
+
+def install_parallel_formats(ydl, enabled=lambda: True):
+    """Wrap ``ydl.process_info`` so merged formats are fetched concurrently."""
+    process_info = ydl.process_info
+    def wrapper(info_dict):
+        if enabled():
+            fetch_formats_in_parallel(ydl, info_dict)
+        return process_info(info_dict)
+    ydl.process_info = wrapper
+
+def install_checkpointing(ydl, record=lambda: None):
+    """Wrap ``ydl.process_info`` so ``record()``, when set, gets a copy of each resolved info dict."""
+    process_info = ydl.process_info
+    def wrapper(info_dict):
+        callback = record()
+        if callback is not None:
+            callback(clone_info(info_dict))
+        return process_info(info_dict)
+    ydl.process_info = wrapper
+
+def media_urls_alive(ydl, info: dict) -> bool:
+    """
+    True if the media URLs of a resolved info dict still answer. Signed
+    URLs carrying an ``expire`` timestamp are judged without a request,
+    the rest with one ``Range: bytes=0-0`` GET per format. Network errors
+    count as alive and are left to the download's own retries.
+    """
+    from yt_dlp.networking import Request
+    from yt_dlp.networking.exceptions import HTTPError, RequestError
+    for f in info.get("requested_formats") or [info]:
+        url = f.get("url")
+        if not url:
+            return False
+        expire = dict(parse_qsl(urlsplit(url).query)).get("expire", "")
+        if expire.isdigit():
+            if int(expire) < time.time() + CHECKPOINT_EXPIRY_MARGIN:
+                return False
+            continue
+        try:
+            ydl.urlopen(Request(url, headers=dict(f.get("http_headers") or {}, Range="bytes=0-0"))).close()
+        except HTTPError as e:
+            if e.status in (401, 403, 404, 410):
+                return False
+        except RequestError:
+            pass
+    return True
+
+def install_deferred_postprocessing(ydl, jobs=lambda: None):
+    """
+    Wrap ``ydl.post_process`` so that, while ``jobs()`` returns a list, the
+    ``(filename, info, files_to_move)`` of each download is appended to it
+    instead of run inline. Returns the unwrapped method.
+
+    The job keeps its own copy of ``info``: yt-dlp strips the keys a format
+    shares with its parent from the live dict once we return. The download
+    archive is not written for deferred downloads; the post-processing
+    stage records each job once its ffmpeg work has succeeded.
+    """
+    post_process = ydl.post_process
+    def wrapper(filename, info, files_to_move=None):
+        pending = jobs()
+        if pending is None:
+            return post_process(filename, info, files_to_move)
+        info["filepath"] = filename
+        pending.append((filename, dict(info), files_to_move or {}))
+        return info
+    ydl.post_process = wrapper
+
+    record_download_archive = ydl.record_download_archive
+    def record(info):
+        if jobs() is None:
+            record_download_archive(info)
+    ydl.record_download_archive = record
+    return post_process
+
+def postprocessors_for(task, settings: dict) -> list:
+    """yt-dlp ``postprocessors`` for the audio and subtitle settings."""
+    if task.audio_only or settings.get("audio_only"):
+        return [{"key": "FFmpegExtractAudio", "preferredcodec": settings.get("audio_format", "mp3"),
+                 "preferredquality": "192"}]
+    if settings.get("burn_subtitles"):
+        return [{"key": "FFmpegEmbedSubtitle"}]
+    return []
+
+def lower_thread_priority(nice: int):
+    """Lower the calling thread's CPU priority; on Linux its child processes inherit it."""
+    try:
+        if os.name == "nt":
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            level = -2 if nice >= 10 else -1 if nice > 0 else 0    # LOWEST / BELOW_NORMAL / NORMAL
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), level)
+        else:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), nice)
+    except (OSError, AttributeError) as e:
+        logger.warning("Could not set post-processing priority to %s: %s", nice, e)
+
+def segmented_for(task, settings: dict) -> int:
+    """
+    Connections to use per file for ``task``, or 0 for yt-dlp's single
+    stream. Segmenting is off while a bandwidth limit is in force: the
+    parallel connections would only fight over the same token bucket.
+    """
+    if BANDWIDTH.rate:
+        return 0
+    enabled = task.segmented
+    if enabled is None:
+        hosts = settings.get("segmented_hosts") or []
+        enabled = "*" in hosts or any(task.host == h or task.host.endswith("." + h) for h in hosts)
+    return max(0, int(settings.get("segment_connections", 4))) if enabled else 0
+
+class SegmentedDownloader:
+    """
+    Multi-connection download of one progressive HTTP(S) file.
+
+    The ``.part`` file is preallocated to its full size and every
+    connection writes its byte range in place, so nothing is reassembled.
+    A connection that runs out of work splits the segment with the most
+    time left (remaining bytes / its speed) and takes the second half.
+    On pause or cancel the unfinished ranges are saved next to the
+    ``.part`` file and picked up on resume. ``run`` returns False when the
+    server does not honour Range requests, or when a ``.part`` without
+    saved ranges is left from a single-stream attempt, so the caller can
+    fall back to yt-dlp, which resumes it.
+    """
+
+    def __init__(self, ydl, info: dict, filename: str, connections: int):
+        self.ydl = ydl
+        self.info = info
+        self.url = info["url"]
+        self.headers = info.get("http_headers") or ydl._calc_headers(info)
+        self.filename = filename
+        self.tmp = filename + ".part"
+        self.state_file = self.tmp + ".segments"
+        self.connections = connections
+        self.total = None
+        self.segments = []          # dicts: start, pos, end, active, speed
+        self.failures = 0
+        self.error = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _open(self, start, end):
+        from yt_dlp.networking import Request
+        return self.ydl.urlopen(Request(self.url, headers=dict(self.headers, Range=f"bytes={start}-{end - 1}")))
+
+    def _probe(self):
+        try:
+            resp = self._open(0, 1)
+        except Exception as e:
+            logger.debug("Range probe failed for %s: %s", self.url, e)
+            return None
+        try:
+            m = re.fullmatch(r"bytes 0-0/(\d+)", resp.headers.get("Content-Range", "").strip())
+            return int(m.group(1)) if resp.status == 206 and m else None
+        finally:
+            resp.close()
+
+    def _restore(self) -> bool:
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state["total"] != self.total or os.path.getsize(self.tmp) != self.total:
+                return False
+        except (OSError, ValueError, KeyError):
+            return False
+        self.segments = [{"start": s, "pos": s, "end": e, "active": False, "speed": 0.0}
+                         for s, e in state["remaining"] if s < e]
+        return True
+
+    def _save_state(self):
+        remaining = [(s["pos"], s["end"]) for s in self.segments if s["pos"] < s["end"]]
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump({"url": self.url, "total": self.total, "remaining": remaining}, f)
+
+    def _next_segment(self):
+        with self._lock:
+            for seg in self.segments:
+                if not seg["active"] and seg["pos"] < seg["end"]:
+                    seg["active"] = True
+                    return seg
+            # work stealing: split the segment expected to finish last
+            busy = [s for s in self.segments if s["active"] and s["end"] - s["pos"] >= 2 * SEGMENT_MIN_SPLIT]
+            if not busy:
+                return None
+            victim = max(busy, key=lambda s: (s["end"] - s["pos"]) / max(s["speed"], 1.0))
+            mid = victim["pos"] + (victim["end"] - victim["pos"]) // 2
+            seg = {"start": mid, "pos": mid, "end": victim["end"], "active": True, "speed": 0.0}
+            victim["end"] = mid
+            self.segments.append(seg)
+            return seg
+
+    def _fetch(self, seg):
+        resp = self._open(seg["pos"], seg["end"])
+        fd = os.open(self.tmp, os.O_WRONLY | getattr(os, "O_BINARY", 0))
+        started, got = time.monotonic(), 0
+        try:
+            if resp.status != 206:
+                raise OSError(f"server answered {resp.status} to a Range request")
+            while not self._stop.is_set():
+                with self._lock:
+                    want = seg["end"] - seg["pos"]
+                if want <= 0:
+                    return
+                data = resp.read(min(SEGMENT_CHUNK, want))
+                if not data:
+                    raise OSError("connection closed before the end of its range")
+                with self._lock:
+                    # the segment may have been split while we were reading
+                    data = data[:max(0, seg["end"] - seg["pos"])]
+                    offset = seg["pos"]
+                    seg["pos"] += len(data)
+                if hasattr(os, "pwrite"):
+                    os.pwrite(fd, data, offset)
+                else:
+                    os.lseek(fd, offset, os.SEEK_SET)
+                    os.write(fd, data)
+                got += len(data)
+                seg["speed"] = got / max(time.monotonic() - started, 1e-3)
+        finally:
+            os.close(fd)
+            resp.close()
+
+    def _worker(self):
+        while not self._stop.is_set():
+            seg = self._next_segment()
+            if seg is None:
+                return
+            try:
+                self._fetch(seg)
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                    if self.failures > SEGMENT_RETRIES or "__USER_" in str(e):
+                        self.error = e
+                        self._stop.set()
+                logger.debug("Segment %s-%s of %s failed: %s", seg["pos"], seg["end"], self.url, e)
+            finally:
+                seg["active"] = False
+
+    def _report(self, status, downloaded, speed=None, eta=None):
+        d = {"status": status, "filename": self.filename, "tmpfilename": self.tmp,
+             "downloaded_bytes": downloaded, "total_bytes": self.total,
+             "speed": speed, "eta": eta, "info_dict": self.info}
+        for hook in self.ydl._progress_hooks:
+            hook(d)
+
+    def run(self) -> bool:
+        if not os.path.exists(self.state_file) and os.path.isfile(self.tmp) and os.path.getsize(self.tmp):
+            return False
+        self.total = self._probe()
+        if not self.total or self.total < SEGMENT_MIN_FILE:
+            return False
+        if not self._restore():
+            with open(self.tmp, "wb") as f:
+                f.truncate(self.total)
+            if hasattr(os, "posix_fallocate"):
+                fd = os.open(self.tmp, os.O_WRONLY)
+                try:
+                    os.posix_fallocate(fd, 0, self.total)
+                except OSError:
+                    pass    # sparse file is fine
+                finally:
+                    os.close(fd)
+            size = -(-self.total // self.connections)
+            self.segments = [{"start": s, "pos": s, "end": min(s + size, self.total), "active": False, "speed": 0.0}
+                             for s in range(0, self.total, size)]
+        threads = [threading.Thread(target=carry_task_io(self._worker), daemon=True, name=f"Segment-{i}")
+                   for i in range(self.connections)]
+        for t in threads:
+            t.start()
+        started = time.monotonic()
+        resumed_from = self.total - sum(s["end"] - s["pos"] for s in self.segments)
+        try:
+            while any(t.is_alive() for t in threads):
+                self._stop.wait(0.25)
+                with self._lock:
+                    downloaded = self.total - sum(s["end"] - s["pos"] for s in self.segments)
+                speed = (downloaded - resumed_from) / max(time.monotonic() - started, 1e-3)
+                self._report("downloading", downloaded, speed, (self.total - downloaded) / speed if speed else None)
+        except BaseException:
+            self._stop.set()
+            for t in threads:
+                t.join()
+            self._save_state()      # pause/cancel: resume these ranges later
+            raise
+        if self.error is not None or any(s["pos"] < s["end"] for s in self.segments):
+            self._save_state()
+            if "__USER_" in str(self.error):
+                raise self.error
+            raise OSError(f"segmented download failed: {self.error}")
+        os.replace(self.tmp, self.filename)
+        with contextlib.suppress(OSError):
+            os.remove(self.state_file)
+        self._report("finished", self.total)
+        logger.info("Segmented download of %s: %s in %.1fs over %d connections (%d segments)",
+                    os.path.basename(self.filename), human_bytes(self.total), time.monotonic() - started,
+                    self.connections, len(self.segments))
+        return True
+
+def install_segmented(ydl, connections=lambda: 0):
+    """Wrap ``ydl.dl`` so progressive HTTP formats use ``SegmentedDownloader``."""
+    from yt_dlp.utils import determine_protocol
+    dl = ydl.dl
+    def wrapper(name, info, subtitle=False, test=False):
+        n = connections()
+        state_file = name + ".part.segments"
+        if (n > 1 and not subtitle and not test and name != "-" and not os.path.exists(name)
+                and not BANDWIDTH.rate and determine_protocol(info) in ("http", "https")):
+            try:
+                if SegmentedDownloader(ydl, info, name, n).run():
+                    return True, True
+            except Exception as e:
+                if "__USER_" in str(e):
+                    raise
+                logger.warning("Segmented download failed, falling back to one connection: %s", e)
+                for path in (name + ".part", state_file):
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+        elif os.path.exists(state_file):
+            # a preallocated .part would look complete to yt-dlp's resume logic
+            for path in (name + ".part", state_file):
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+        return dl(name, info, subtitle, test)
+    ydl.dl = wrapper
+
+FRAGMENT_TUNING = {}    # host -> fragments in flight that the adaptive mode settled on
+
+def fragments_for(task, settings: dict) -> int:
+    """Fragments to fetch at once for ``task``'s HLS/DASH streams, 0 = adaptive."""
+    for host, n in (settings.get("fragment_hosts") or {}).items():
+        if task.host == host or task.host.endswith("." + host):
+            return max(0, int(n))
+    return max(0, int(settings.get("fragment_concurrency", 0)))
+
+class FragmentExecutor(ThreadPoolExecutor):
+    """
+    Ordered ``map`` for yt-dlp's fragment downloader with a bounded
+    reorder buffer: at most ``limit`` fragments are in flight and at most
+    ``FRAGMENT_WINDOW`` times that are held waiting for an earlier one.
+
+    When ``adaptive``, ``limit`` is tuned per round of ``limit`` fragments:
+    one more is probed and kept only if bytes/s rose by
+    ``ADAPTIVE_MIN_GAIN``; a fragment retry halves it.
+    """
+
+    def __init__(self, limit: int, adaptive: bool):
+        super().__init__(FRAGMENT_MAX_WORKERS if adaptive else max(1, limit), thread_name_prefix="Fragment")
+        self.limit = max(1, min(FRAGMENT_MAX_WORKERS, limit))
+        self.adaptive = adaptive
+        self.buffered = 0
+        self.abort = None               # user pause/cancel raised inside a fragment thread
+        self._bytes = 0
+        self._round = 0
+        self._probe = None              # (limit, rate) before the last increase
+        self._hold = 0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, n: int):
+        """Count a finished fragment of ``n`` bytes; adapts ``limit`` once per round."""
+        with self._lock:
+            self._bytes += n
+            self._round += 1
+            if not self.adaptive or self._round < self.limit:
+                return
+            now = time.monotonic()
+            rate = self._bytes / max(now - self._started, 1e-6)
+            self._bytes, self._round, self._started = 0, 0, now
+            if self._hold:
+                self._hold -= 1
+            elif self._probe is not None:
+                prev_limit, prev_rate = self._probe
+                self._probe = None
+                if rate < prev_rate * (1 + ADAPTIVE_MIN_GAIN):
+                    self.limit, self._hold = prev_limit, FRAGMENT_PLATEAU_HOLD
+            elif self.limit < FRAGMENT_MAX_WORKERS:
+                self._probe = (self.limit, rate)
+                self.limit += 1
+
+    def back_off(self):
+        with self._lock:
+            if self.adaptive:
+                self.limit = max(1, self.limit // 2)
+                self._probe, self._hold = None, FRAGMENT_PLATEAU_HOLD
+
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(carry_task_io(fn), *args, **kwargs)
+
+    def map(self, fn, *iterables, timeout=None, chunksize=1):
+        items = iter(iterables[0])
+        pending = deque()
+        exhausted = False
+        try:
+            while True:
+                while (not exhausted and len(pending) < self.limit * FRAGMENT_WINDOW
+                       and sum(not f.done() for f in pending) < self.limit):
+                    item = next(items, None)
+                    if item is None:
+                        exhausted = True
+                    else:
+                        pending.append(self.submit(fn, item))
+                if not pending:
+                    return
+                self.buffered = sum(f.done() for f in pending)
+                if pending[0].done():
+                    result = pending.popleft().result()
+                    if self.abort is not None:
+                        raise self.abort
+                    yield result
+                else:
+                    wait_futures([f for f in pending if not f.done()], return_when=FIRST_COMPLETED)
+        finally:
+            for f in pending:
+                f.cancel()
+
+class MemoryFragmentsMixin:
+    """
+    Fragment downloader that keeps fragments in memory instead of writing
+    ``-FragN`` files: they are fetched through a ``FragmentExecutor`` and
+    appended to the ``.part`` file in order, so the stream touches the
+    disk once. The ``.ytdl`` resume file is kept as yt-dlp writes it.
+
+    This overrides FragmentFD internals: ``_download_fragment``,
+    ``_read_fragment`` and ``_hook_progress`` (see ``YTDLP_MIN_VERSION``).
+    The bytes wait in ``ctx["fragment_buffers"]`` by fragment index.
+    yt-dlp's worker threads get shallow copies of ``ctx``, so they all
+    share that dict. Connection errors are raised as ``IncompleteRead``,
+    which yt-dlp's per-fragment retry loop catches.
+    """
+
+    fragment_limit = FRAGMENT_START_WORKERS
+    fragment_adaptive = True
+
+    def __init__(self, ydl, params):
+        super().__init__(ydl, params)
+        self._executors = []
+
+    def download_and_append_fragments(self, ctx, fragments, info_dict, **kwargs):
+        executor = FragmentExecutor(self.fragment_limit, self.fragment_adaptive)
+        self._executors.append(executor)
+        ctx["fragment_executor"] = executor
+        ctx["fragment_buffers"] = {}
+        kwargs["tpe"] = executor
+        try:
+            return super().download_and_append_fragments(ctx, fragments, info_dict, **kwargs)
+        finally:
+            self._executors.remove(executor)
+            self.fragment_limit = executor.limit
+
+    def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_data=None):
+        from yt_dlp.networking import Request
+        from yt_dlp.networking.exceptions import IncompleteRead, TransportError
+        from yt_dlp.utils import DownloadError
+        executor = ctx["fragment_executor"]
+        started = time.time()
+        chunks, got, expected = [], 0, 0
+        try:
+            request = Request(frag_url, data=request_data, headers=headers or info_dict.get("http_headers"))
+            with self.ydl.urlopen(request) as response:
+                expected = int(response.headers.get("Content-Length") or 0)
+                while True:
+                    chunk = response.read(FRAGMENT_CHUNK)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    got += len(chunk)
+                    self._report_fragment(ctx, "downloading", got, expected or None, started)
+                if expected and got < expected and not response.headers.get("Content-Encoding"):
+                    raise IncompleteRead(got, expected)
+            self._report_fragment(ctx, "finished", got, got, started)
+        except IncompleteRead:
+            raise
+        except TransportError as e:
+            # a reset connection; yt-dlp retries only HTTPError and IncompleteRead
+            raise IncompleteRead(got, expected or None, cause=e) from e
+        except DownloadError as e:
+            if "__USER_" in str(e):
+                for running in self._executors:
+                    running.abort = e
+            raise
+        executor.record(got)
+        ctx["fragment_buffers"][ctx["fragment_index"]] = b"".join(chunks)
+        # the name yt-dlp would have used; its append step finds no file there to delete
+        ctx["fragment_filename_sanitized"] = "%s-Frag%d" % (ctx["tmpfilename"], ctx["fragment_index"])
+        return True
+
+    def _report_fragment(self, ctx, status, downloaded, total, started):
+        ctx["dl"]._hook_progress({
+            "status": status,
+            "downloaded_bytes": downloaded,
+            "total_bytes": total,
+            "elapsed": time.time() - started,
+            "ctx_id": ctx.get("ctx_id"),
+        }, {"ctx_id": ctx.get("ctx_id")})
+
+    def _read_fragment(self, ctx):
+        content = ctx.get("fragment_buffers", {}).pop(ctx["fragment_index"], None)
+        return content if content is not None else super()._read_fragment(ctx)
+
+    def report_retry(self, *args, **kwargs):
+        for executor in self._executors:
+            executor.back_off()
+        return super().report_retry(*args, **kwargs)
+
+    def _hook_progress(self, status, info_dict):
+        if self._executors and "fragment_index" in status:
+            status["fragment_workers"] = sum(e.limit for e in self._executors)
+            status["fragment_buffered"] = sum(e.buffered for e in self._executors)
+        super()._hook_progress(status, info_dict)
+
+@functools.lru_cache(maxsize=None)
+def memory_fragment_fd(fd_cls):
+    return type(f"Memory{fd_cls.__name__}", (MemoryFragmentsMixin, fd_cls), {})
+
+def install_memory_fragments(ydl, workers=lambda: 0):
+    """
+    Wrap ``ydl.dl`` so HLS and DASH streams use ``MemoryFragmentsMixin``.
+    ``workers()`` is the fragment concurrency, 0 = adaptive per host; if the
+    in-memory path breaks, yt-dlp's own ``concurrent_fragment_downloads``
+    takes over and resumes from the same ``.part``.
+    """
+    from yt_dlp.downloader import get_suitable_downloader
+    from yt_dlp.downloader.hls import HlsFD
+    from yt_dlp.downloader.dash import DashSegmentsFD
+    from yt_dlp.utils import DownloadError
+    dl = ydl.dl
+    def wrapper(name, info, subtitle=False, test=False):
+        if subtitle or test or name == "-" or info.get("is_live") or not info.get("url"):
+            return dl(name, info, subtitle, test)
+        fd_cls = get_suitable_downloader(dict(info), ydl.params, to_stdout=False)
+        if fd_cls not in (HlsFD, DashSegmentsFD):
+            return dl(name, info, subtitle, test)
+        n = workers()
+        host = url_host(info.get("webpage_url") or info["url"])
+        params = dict(ydl.params, concurrent_fragment_downloads=FRAGMENT_MAX_WORKERS * 2)
+        if params.get("fragment_retries") is None:
+            params["fragment_retries"] = FRAGMENT_RETRIES
+        fd = memory_fragment_fd(fd_cls)(ydl, params)
+        fd.fragment_adaptive = not n
+        fd.fragment_limit = n or FRAGMENT_TUNING.get(host, FRAGMENT_START_WORKERS)
+        for ph in ydl._progress_hooks:
+            fd.add_progress_hook(ph)
+        new_info = ydl._copy_infodict(info)
+        if new_info.get("http_headers") is None:
+            new_info["http_headers"] = ydl._calc_headers(new_info)
+        try:
+            return fd.download(name, new_info, subtitle)
+        except DownloadError:
+            raise
+        except Exception as e:
+            logger.warning("In-memory fragment download failed, falling back to yt-dlp: %s", e)
+            ydl.params["concurrent_fragment_downloads"] = fd.fragment_limit
+            try:
+                return dl(name, info, subtitle, test)
+            finally:
+                ydl.params.pop("concurrent_fragment_downloads", None)
+        finally:
+            if not n:
+                FRAGMENT_TUNING[host] = fd.fragment_limit
+    ydl.dl = wrapper
+
+PROGRESS_KEYS = ("status", "filename", "tmpfilename", "downloaded_bytes",
+                 "total_bytes", "total_bytes_estimate", "speed", "eta",
+                 "fragment_index", "fragment_count", "fragment_workers")
+
+def download_in_child(conn, url, info, ydl_opts, parallel_streams=True, segments=0, fragments=0, resolved=False):
+    """
+    Entry point of a process-mode download (see ``DownloadWorker._run_in_process``).
+
+    Sends ``("progress", dict)`` and waits for an ack, so the parent can
+    apply the shared bandwidth limit; ``("pp", path)`` and ``("log", level,
+    msg)`` and ``("checkpoint", info)`` are fire-and-forget. ``resolved``
+    means ``info`` is a checkpoint that goes straight to ``process_info``.
+    Ends with ``("done", filename, error, jobs)``, where ``jobs`` is the post-processing left for the parent's
+    pool, with postprocessor objects replaced by their class names.
+    """
+    import pickle
+
+    def checkpoint(resolved_info):
+        try:
+            send(("checkpoint", resolved_info))
+        except Exception as e:
+            send(("log", logging.WARNING, f"No resume checkpoint: {e}"))
+    send_lock = threading.Lock()
+
+    def send(msg, ack=False):
+        with send_lock:
+            conn.send(msg)
+            if ack:
+                conn.recv()
+
+    class PipeLogger:
+        def debug(self, msg):
+            pass
+
+        def info(self, msg):
+            pass
+
+        def warning(self, msg):
+            send(("log", logging.WARNING, msg))
+
+        def error(self, msg):
+            send(("log", logging.ERROR, msg))
+
+    ydl_opts = dict(ydl_opts, logger=PipeLogger(),
+                    progress_hooks=[lambda d: send(("progress", {k: d.get(k) for k in PROGRESS_KEYS}), ack=True)],
+                    postprocessor_hooks=[lambda d: send(("pp", (d.get("info_dict") or {}).get("filepath")))])
+    try:
+        with YoutubeDL(ydl_opts) as ydl:
+            if parallel_streams:
+                install_parallel_formats(ydl)
+            install_segmented(ydl, lambda: segments)
+            install_memory_fragments(ydl, lambda: fragments)
+            install_checkpointing(ydl, lambda: checkpoint)
+            jobs = []
+            post_process = install_deferred_postprocessing(ydl, lambda: jobs)
+            if resolved:
+                ydl.process_info(info)
+                result = info
+            elif info is not None:
+                result = ydl.process_ie_result(info, download=True)
+            else:
+                result = ydl.extract_info(url, download=True)
+            handoff = []
+            for filename, job_info, files_to_move in jobs:
+                pps = job_info.pop("__postprocessors", None) or []
+                job_info["__postprocessor_names"] = [type(pp).__name__ for pp in pps]
+                try:
+                    pickle.dumps(job_info)
+                    handoff.append((filename, job_info, files_to_move))
+                except Exception:
+                    job_info["__postprocessors"] = pps
+                    del job_info["__postprocessor_names"]
+                    post_process(filename, job_info, files_to_move)
+            send(("done", downloaded_path(ydl, result or info or {}), None, handoff))
+    except Exception as e:
+        send(("done", None, str(e), []))
+    finally:
+        conn.close()
+
 def human_bytes(n):
     try:
         n = float(n)
@@ -130,6 +1313,266 @@ def notify(title, message):
         except Exception:
             pass
 
+class HistoryStore:
+    """
+    Append-only download history stored as JSON-lines files.
+
+    New entries go to ``segment-NNNNNN.jsonl`` as one line each, so an append
+    never rewrites existing data and is safe from any worker thread. A torn
+    last line left by a crash is skipped on read. ``compact`` folds all
+    closed segments into ``base-NNNNNN.jsonl`` (which covers every segment up
+    to NNNNNN) with write-to-temp + rename, so a crash at any point leaves a
+    consistent history.
+    """
+
+    def __init__(self, folder, legacy_file=None, segment_bytes=HISTORY_SEGMENT_BYTES):
+        self.folder = folder
+        self.legacy_file = legacy_file
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._fh = None
+        self._seq = 0
+        self._ready = False
+        self._listeners = []
+        self._appended = 0                      # appends so far, the sequence ``snapshot`` reports
+        self._recent = deque(maxlen=HISTORY_RECENT)
+
+    @staticmethod
+    def _seq_of(path):
+        return int(os.path.basename(path).split("-")[1].split(".")[0])
+
+    def _files(self, prefix):
+        return sorted(glob.glob(os.path.join(glob.escape(self.folder), prefix + "-*.jsonl")), key=self._seq_of)
+
+    def _ensure_ready(self):
+        if self._ready:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        segments, bases = self._files("segment"), self._files("base")
+        if not segments and not bases and self.legacy_file and os.path.isfile(self.legacy_file):
+            self._import_legacy()
+            bases = self._files("base")
+        self._seq = max([self._seq_of(p) for p in segments + bases] or [0])
+        self._ready = True
+
+    def _import_legacy(self):
+        with open(self.legacy_file, "r", encoding="utf-8") as f:
+            entries = json.load(f) or []
+        self._write_atomic(os.path.join(self.folder, "base-000000.jsonl"), entries)
+        os.replace(self.legacy_file, self.legacy_file + ".imported")
+        logger.info("Imported %d legacy history entries", len(entries))
+
+    @staticmethod
+    def _write_atomic(path, entries):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for e in entries:
+                f.write(json.dumps(e, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _tail(self):
+        if self._fh is not None and self._fh.tell() < self.segment_bytes:
+            return self._fh
+        if self._fh is not None:
+            self._fh.close()
+            self._seq += 1
+        elif self._seq == 0 or not os.path.isfile(self._segment_path(self._seq)):
+            self._seq += 1
+        path = self._segment_path(self._seq)
+        # repair a torn line from a crash so the next entry starts cleanly
+        if os.path.isfile(path) and os.path.getsize(path) > 0:
+            with open(path, "rb+") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.seek(0, os.SEEK_END)
+                    f.write(b"\n")
+        self._fh = open(path, "a", encoding="utf-8")
+        return self._fh
+
+    def _segment_path(self, seq):
+        return os.path.join(self.folder, f"segment-{seq:06d}.jsonl")
+
+    def append(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._ensure_ready()
+            fh = self._tail()
+            fh.write(line)
+            fh.flush()
+            os.fsync(fh.fileno())
+            self._appended += 1
+            self._recent.append(entry)
+            # under the lock, so every listener sees appends in file order
+            for fn in self._listeners:
+                fn(entry)
+
+    def _live_files(self):
+        bases = self._files("base")
+        covered = self._seq_of(bases[-1]) if bases else -1
+        files = bases[-1:] + [p for p in self._files("segment") if self._seq_of(p) > covered]
+        return files
+
+    @staticmethod
+    def _read_file(path, size=None):
+        """Entries in ``path``, or in its first ``size`` bytes."""
+        with open(path, "rb") as f:
+            data = f.read() if size is None else f.read(size)
+        entries = []
+        for line in data.decode("utf-8", errors="replace").splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries
+
+    def read(self):
+        with self._lock:
+            self._ensure_ready()
+            if self._fh is not None:
+                self._fh.flush()
+            files = self._live_files()
+        entries = []
+        for path in files:
+            try:
+                entries.extend(self._read_file(path))
+            except OSError as e:
+                logger.warning("Could not read history file %s: %s", path, e)
+        return entries
+
+    def snapshot(self):
+        """
+        The full history and the append sequence it ends at. Files are read
+        outside the append lock, only up to their size at the snapshot, so
+        appends keep going meanwhile; compaction waits.
+        """
+        with self._compact_lock:
+            with self._lock:
+                self._ensure_ready()
+                if self._fh is not None:
+                    self._fh.flush()
+                files = [(path, os.path.getsize(path)) for path in self._live_files()]
+                seq = self._appended
+            entries = []
+            for path, size in files:
+                entries.extend(self._read_file(path, size))
+        return entries, seq
+
+    def subscribe(self, listener, since):
+        """
+        Register ``listener`` for appends after sequence ``since`` (from
+        ``snapshot``), replaying the ones made in between first. Returns
+        False if those are no longer in memory; take a new snapshot then.
+        """
+        with self._lock:
+            missed = self._appended - since
+            if missed > len(self._recent):
+                return False
+            for entry in list(self._recent)[len(self._recent) - missed:]:
+                listener(entry)
+            self._listeners.append(listener)
+        return True
+
+    def segment_count(self):
+        with self._lock:
+            self._ensure_ready()
+            return len(self._live_files())
+
+    def compact(self):
+        """Fold every closed file into a single base file; appends keep going meanwhile."""
+        with self._compact_lock:
+            with self._lock:
+                self._ensure_ready()
+                if self._fh is not None:
+                    self._fh.close()
+                    self._fh = None
+                cover = self._seq
+                self._seq += 1          # new appends go past everything being compacted
+                files = self._live_files()
+            if len(files) <= 1:
+                return 0
+            entries = []
+            for path in files:
+                entries.extend(self._read_file(path))
+            self._write_atomic(os.path.join(self.folder, f"base-{cover:06d}.jsonl"), entries)
+            for path in files:
+                if self._seq_of(path) <= cover and not path.endswith(f"base-{cover:06d}.jsonl"):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            logger.info("Compacted %d history files (%d entries)", len(files), len(entries))
+            return len(entries)
+
+    def maybe_compact(self):
+        if self.segment_count() >= HISTORY_COMPACT_SEGMENTS:
+            self.compact()
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+HISTORY = HistoryStore(HISTORY_DIR, legacy_file=HISTORY_FILE)
+
+SEARCH_TOKEN_RE = re.compile(r"\w+")
+
+class HistoryIndex:
+    """
+    Token index behind the History window search box.
+
+    Date, title, URL and file of every entry are split into lower-case word
+    tokens; each token maps to the positions of the entries containing it.
+    Every query token matches as a prefix (bisect over the sorted vocabulary)
+    and the per-token matches are intersected smallest first.
+    """
+
+    COLUMNS = ("when", "title", "url", "file")
+
+    def __init__(self):
+        self.rows = []          # display tuple per entry, in append order
+        self._postings = {}     # token -> list of row positions
+        self._vocab = None      # sorted tokens, rebuilt lazily after adds
+        self._lock = threading.Lock()
+
+    def add(self, entry: dict):
+        dt = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.get("when", time.time())))
+        row = (dt, entry.get("title", "-"), entry.get("url", "-"), entry.get("file", "-"))
+        with self._lock:
+            pos = len(self.rows)
+            self.rows.append(row)
+            for tok in set(SEARCH_TOKEN_RE.findall(" ".join(map(str, row)).lower())):
+                self._postings.setdefault(tok, []).append(pos)
+            self._vocab = None
+
+    def _prefix_matches(self, prefix):
+        if self._vocab is None:
+            self._vocab = sorted(self._postings)
+        i = bisect.bisect_left(self._vocab, prefix)
+        matches = set()
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix):
+            matches.update(self._postings[self._vocab[i]])
+            i += 1
+        return matches
+
+    def search(self, text, sort_col=None, reverse=False):
+        """Row positions matching every token of ``text``, newest first unless sorted."""
+        tokens = SEARCH_TOKEN_RE.findall((text or "").lower())
+        with self._lock:
+            if not tokens:
+                result = list(range(len(self.rows) - 1, -1, -1))
+            else:
+                sets = sorted((self._prefix_matches(t) for t in set(tokens)), key=len)
+                found = sets[0].intersection(*sets[1:])
+                result = sorted(found, reverse=True)
+            if sort_col is not None:
+                col = self.COLUMNS.index(sort_col)
+                result.sort(key=lambda pos: str(self.rows[pos][col]).lower(), reverse=reverse)
+            return result
+
 class Persistence:
     @staticmethod
     def load_settings():
@@ -153,26 +1596,1174 @@ class Persistence:
     @staticmethod
     def append_history(entry: dict):
         try:
-            history = []
-            if os.path.exists(HISTORY_FILE):
-                with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                    history = json.load(f)
-            history.append(entry)
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump(history[-1000:], f, indent=2)
+            HISTORY.append(entry)
         except Exception as e:
             logger.exception("Failed to write history: %s", e)
 
     @staticmethod
     def read_history():
         try:
-            if os.path.exists(HISTORY_FILE):
-                with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                    return json.load(f)
+            return HISTORY.read()
         except Exception as e:
             logger.exception("Failed to read history: %s", e)
         return []
 
+def connection_counts(ydl):
+    """``(connections opened, requests sent)`` over a YoutubeDL's urllib3 pools."""
+    conns = reqs = 0
+    for handler in ydl._request_director.handlers.values():
+        for _, session in getattr(handler, "_InstanceStoreMixin__instances", []):
+            for adapter in getattr(session, "adapters", {}).values():
+                pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+                for key in (pools.keys() if pools is not None else ()):
+                    pool = pools.get(key)
+                    conns += getattr(pool, "num_connections", 0)
+                    reqs += getattr(pool, "num_requests", 0)
+    return conns, reqs
+
+class PooledYDL:
+    """
+    A long-lived YoutubeDL. Its hooks are installed once and forward to
+    whichever task currently holds it, because postprocessors copy the
+    hook list when they are created. ``bind`` resets the per-run state
+    yt-dlp keeps on the instance (see ``YTDLP_MIN_VERSION``).
+    """
+
+    def __init__(self, params: dict):
+        started = time.perf_counter()
+        self.progress_hook = None
+        self.postprocessor_hook = None
+        self.parallel_streams = False
+        self.segments = 0
+        self.fragments = 0
+        self.jobs = None                # post-processing handed to POSTPROCESS instead of run inline
+        self.checkpoint = None          # callback for the resolved info dict of each download
+        self._selectors = {}
+        self.ydl = YoutubeDL(dict(params, logger=YDLLogger(),
+                                  progress_hooks=[self._on_progress],
+                                  postprocessor_hooks=[self._on_postprocessor]))
+        install_parallel_formats(self.ydl, lambda: self.parallel_streams)
+        install_checkpointing(self.ydl, lambda: self.checkpoint)
+        install_segmented(self.ydl, lambda: self.segments)
+        install_memory_fragments(self.ydl, lambda: self.fragments)
+        install_deferred_postprocessing(self.ydl, lambda: self.jobs)
+        install_request_tracking(self.ydl)
+        self.build_time = time.perf_counter() - started
+        self.counted = (0, 0)
+
+    def _on_progress(self, d):
+        if self.progress_hook is not None:
+            self.progress_hook(d)
+
+    def _on_postprocessor(self, d):
+        if self.postprocessor_hook is not None:
+            self.postprocessor_hook(d)
+
+    def bind(self, outtmpl=None, fmt=None, progress_hook=None, postprocessor_hook=None,
+             parallel_streams=False, segments=0, fragments=0, jobs=None, checkpoint=None):
+        """Apply per-task options without rebuilding the instance."""
+        ydl = self.ydl
+        ydl.params["outtmpl"] = {"default": outtmpl} if outtmpl else {}
+        ydl._parse_outtmpl()
+        ydl._num_downloads = 0          # %(autonumber)s counts within one task
+        if fmt:
+            if fmt not in self._selectors:
+                self._selectors[fmt] = ydl.build_format_selector(fmt)
+            ydl.params["format"], ydl.format_selector = fmt, self._selectors[fmt]
+        else:
+            ydl.params.pop("format", None)
+            ydl.format_selector = None
+        self.progress_hook, self.postprocessor_hook = progress_hook, postprocessor_hook
+        self.parallel_streams = parallel_streams
+        self.segments = segments
+        self.fragments = fragments
+        self.jobs = jobs
+        self.checkpoint = checkpoint
+
+    def unbind(self):
+        self.progress_hook = self.postprocessor_hook = None
+        self.parallel_streams = False
+        self.segments = 0
+        self.fragments = 0
+        self.jobs = None
+        self.checkpoint = None
+
+class YDLPool:
+    """
+    Warm YoutubeDL instances keyed by their option set (minus
+    ``YDL_TASK_OPTS``), so extractor setup, cookie loading and HTTP
+    keep-alive connections are reused across tasks. An instance is used
+    by one thread at a time and is dropped after a failed or cancelled run.
+    """
+
+    def __init__(self, max_idle=YDL_POOL_IDLE):
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.build_seconds = 0.0
+        self.connections = 0
+        self.requests = 0
+
+    @staticmethod
+    def _key(params: dict) -> str:
+        base = {k: v for k, v in params.items() if k not in YDL_TASK_OPTS}
+        return json.dumps(base, sort_keys=True, default=lambda o: f"<{type(o).__name__} {id(o)}>")
+
+    @contextlib.contextmanager
+    def session(self, params: dict, outtmpl=None, fmt=None, progress_hook=None, postprocessor_hook=None,
+                parallel_streams=False, segments=0, fragments=0, jobs=None, checkpoint=None):
+        key = self._key(params)
+        with self._lock:
+            idle = self._idle.get(key)
+            pooled = idle.pop() if idle else None
+        if pooled is None:
+            pooled = PooledYDL({k: v for k, v in params.items() if k not in YDL_TASK_OPTS})
+            with self._lock:
+                self.created += 1
+                self.build_seconds += pooled.build_time
+        else:
+            with self._lock:
+                self.reused += 1
+        pooled.bind(outtmpl, fmt, progress_hook, postprocessor_hook, parallel_streams, segments, fragments, jobs,
+                    checkpoint)
+        healthy = False
+        try:
+            yield pooled.ydl
+            healthy = True
+        finally:
+            pooled.unbind()
+            # before another task can take it, this one must stop tracking its kept-alive sockets
+            io = TaskIO.current()
+            if io is not None:
+                io.release()
+            self._account(pooled)
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                keep = healthy and len(idle) < self.max_idle
+                if keep:
+                    idle.append(pooled)
+            if not keep:
+                pooled.ydl.close()
+
+    def _account(self, pooled: PooledYDL):
+        try:
+            counts = connection_counts(pooled.ydl)
+        except Exception:
+            return
+        with self._lock:
+            self.connections += counts[0] - pooled.counted[0]
+            self.requests += counts[1] - pooled.counted[1]
+        pooled.counted = counts
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg = self.build_seconds / self.created if self.created else 0.0
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "setup_saved": self.reused * avg,
+                "connections": self.connections,
+                "requests": self.requests,
+                "connection_reuse": 1 - self.connections / self.requests if self.requests else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for instances in idle.values():
+            for pooled in instances:
+                pooled.ydl.close()
+
+YDL_POOL = YDLPool()
+
+class MetadataCache:
+    """
+    Process-wide cache of yt-dlp info dicts keyed by normalized URL.
+
+    Entries expire after ``ttl`` seconds and the least recently used one is
+    evicted once ``max_entries`` is reached. Concurrent misses for the same
+    URL are collapsed so only one caller runs ``extract_info``.
+    """
+
+    def __init__(self, max_entries=METADATA_CACHE_SIZE, ttl=METADATA_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (expires_at, info)
+        self._inflight = {}             # key -> threading.Event
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url, playlist):
+        return normalize_url(url), bool(playlist)
+
+    def peek(self, url, playlist=False):
+        """Return the cached info dict or None, never touching the network."""
+        key = self._key(url, playlist)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        return None
+
+    def get(self, url, playlist=False):
+        """Return the info dict for ``url``, extracting it on a miss."""
+        key = self._key(url, playlist)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._entries.pop(key, None)
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # someone else is extracting the same URL; wait and re-check
+            pending.wait()
+
+        try:
+            with YDL_POOL.session({"quiet": True, "noplaylist": not playlist}) as ydl:
+                info = ydl.extract_info(url, download=False)
+            self.put(url, info, playlist)
+            return info
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set()
+
+    def put(self, url, info, playlist=False):
+        key = self._key(url, playlist)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, info)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url, playlist=False):
+        with self._lock:
+            self._entries.pop(self._key(url, playlist), None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+METADATA_CACHE = MetadataCache()
+
+class ThumbnailService:
+    """
+    Fetches row thumbnails on a small thread pool.
+
+    Metadata comes from METADATA_CACHE and images go through one keep-alive
+    ``requests.Session``. JPEGs are decoded at reduced scale before the
+    resize, and the on-disk folder is kept under ``max_bytes`` by evicting
+    the least recently used files. Results are queued as ``(task_id, path)``
+    for the GUI thread to collect in batches.
+    """
+
+    def __init__(self, folder, max_bytes=THUMB_CACHE_MAX_BYTES, workers=THUMB_WORKERS):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.results = queue.Queue()
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "Mozilla/5.0"
+        adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Thumb")
+        self._lock = threading.Lock()
+        self._files = OrderedDict()     # path -> size, least recently used first
+        self._total = 0
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for e in os.scandir(self.folder):
+            if e.is_file() and e.name.endswith(".jpg"):
+                st = e.stat()
+                entries.append((st.st_mtime, e.path, st.st_size))
+        for _, path, size in sorted(entries):
+            self._files[path] = size
+            self._total += size
+
+    def request(self, task_id, url):
+        self._pool.submit(self._run, task_id, url)
+
+    def _run(self, task_id, url):
+        path = None
+        try:
+            path = self.fetch(url)
+        except Exception as e:
+            logger.debug("Thumbnail fetch failed: %s", e)
+        self.results.put((task_id, path))
+
+    def fetch(self, url):
+        path = os.path.join(self.folder, hashlib.md5(url.encode()).hexdigest() + ".jpg")
+        if os.path.isfile(path):
+            self._touch(path)
+            return path
+
+        thumb_url = METADATA_CACHE.get(url).get("thumbnail")
+        if not thumb_url:
+            return None
+        resp = self.session.get(thumb_url, timeout=8)
+        resp.raise_for_status()
+
+        img = Image.open(BytesIO(resp.content))
+        # JPEG only: let the decoder scale down by 1/2..1/8 instead of decoding full size
+        img.draft("RGB", (THUMB_SIZE[0] * 2, THUMB_SIZE[1] * 2))
+        img = img.convert("RGB").resize(THUMB_SIZE, Image.LANCZOS)
+        tmp = path + ".tmp"
+        img.save(tmp, "JPEG", quality=90)
+        os.replace(tmp, path)
+        self._add(path, os.path.getsize(path))
+        return path
+
+    def _touch(self, path):
+        with self._lock:
+            if path in self._files:
+                self._files.move_to_end(path)
+        try:
+            os.utime(path)      # keeps the LRU order across restarts
+        except OSError:
+            pass
+
+    def _add(self, path, size):
+        with self._lock:
+            self._total += size - self._files.pop(path, 0)
+            self._files[path] = size
+            while self._total > self.max_bytes and len(self._files) > 1:
+                old, old_size = self._files.popitem(last=False)
+                self._total -= old_size
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+class BloomFilter:
+    """Bloom filter over strings: a bytearray plus double hashing from one blake2b digest."""
+
+    def __init__(self, capacity, error_rate=ARCHIVE_BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+class DownloadArchive:
+    """
+    "Already downloaded" index keyed like yt-dlp's download archive
+    (``"<extractor> <id>"``), persisted to ARCHIVE_FILE in the same format.
+
+    Lookups go through a Bloom filter first, so the common "new link" case
+    never touches the exact key set. yt-dlp accepts any set-like object as
+    ``download_archive``, so the worker passes this index straight in and
+    playlist entries are checked and recorded as well.
+    """
+
+    def __init__(self, path, capacity=ARCHIVE_BLOOM_CAPACITY):
+        self.path = path
+        self.lookups = 0
+        self.bloom_negatives = 0
+        self._keys = set()
+        self._bloom = BloomFilter(capacity)
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+
+    def load(self, history_entries=()):
+        """
+        Read the archive file; seed it from history the first time it is
+        created. Lookups are answered as soon as the file is read, even if
+        that failed. History entries without a stored ``archive_id`` need
+        their URL matched against every extractor, so they are added
+        afterwards on a background thread and count as not archived until
+        then.
+        """
+        pending = []
+        try:
+            if os.path.isfile(self.path):
+                # a stray non-UTF-8 line must not cost the rest of the archive
+                with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                    keys = [line.strip() for line in f if line.strip()]
+                with self._lock:
+                    for key in keys:
+                        self._add_locked(key)
+            else:
+                open(self.path, "a", encoding="utf-8").close()
+                history_entries = list(history_entries)
+                self._extend(e["archive_id"] for e in history_entries if e.get("archive_id"))
+                pending = [e["url"] for e in history_entries if not e.get("archive_id") and e.get("url")]
+        except Exception as e:
+            logger.warning("Could not load download archive, continuing with %d entries: %s", len(self._keys), e)
+        finally:
+            self._loaded.set()
+        logger.info("Download archive loaded: %d entries", len(self._keys))
+        if pending:
+            threading.Thread(target=self._seed, args=(pending,), daemon=True, name="ArchiveSeed").start()
+
+    def _seed(self, urls, batch=500):
+        try:
+            for i in range(0, len(urls), batch):
+                self._extend(filter(None, map(archive_id_for_url, urls[i:i + batch])))
+        except Exception as e:
+            logger.warning("Could not seed download archive from history: %s", e)
+        else:
+            logger.info("Download archive seeded from history: %d entries", len(self._keys))
+
+    def _extend(self, keys):
+        """Add several keys with a single write to the archive file."""
+        keys = list(keys)   # may be lazy and slow; not under the lock
+        with self._lock:
+            added = [key for key in keys if self._add_locked(key)]
+            if not added:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(key + "\n" for key in added))
+            except OSError as e:
+                logger.warning("Could not write download archive: %s", e)
+
+    def _add_locked(self, key):
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        if len(self._keys) > self._bloom.capacity:
+            # keep the false-positive rate bounded as the archive grows
+            self._bloom = BloomFilter(self._bloom.capacity * 2)
+            for k in self._keys:
+                self._bloom.add(k)
+        else:
+            self._bloom.add(key)
+        return True
+
+    def add(self, key):
+        self._extend((key,))
+
+    def is_loaded(self):
+        return self._loaded.is_set()
+
+    def __contains__(self, key):
+        if not key:
+            return False
+        self._loaded.wait()
+        self.lookups += 1
+        if key not in self._bloom:
+            self.bloom_negatives += 1
+            return False
+        with self._lock:
+            return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __bool__(self):
+        # yt-dlp skips archive checks entirely when the archive is falsy
+        return True
+
+DOWNLOAD_ARCHIVE = DownloadArchive(ARCHIVE_FILE)
+
+class InflightRegistry:
+    """
+    Single-flight table for downloads: one leader task per dedup key.
+
+    Identical tasks attach to the leader as followers; they are never
+    downloaded themselves, mirror the leader's progress and finish with its
+    file when it completes.
+    """
+
+    def __init__(self):
+        self._leaders = {}
+        self._lock = threading.Lock()
+
+    def attach(self, task):
+        """Register ``task`` as leader for its key, or attach it and return the existing leader."""
+        with self._lock:
+            leader = self._leaders.get(task.dedup_key)
+            if leader is None or leader is task or leader.status in (TASK_CANCELED, TASK_FAILED, TASK_DONE):
+                self._leaders[task.dedup_key] = task
+                return None
+            task.leader = leader
+            leader.followers.append(task)
+            return leader
+
+    def detach(self, task):
+        with self._lock:
+            if task.leader is not None and task in task.leader.followers:
+                task.leader.followers.remove(task)
+            task.leader = None
+
+    def release(self, leader):
+        """Drop ``leader`` from the table and hand back its followers."""
+        with self._lock:
+            if self._leaders.get(leader.dedup_key) is leader:
+                del self._leaders[leader.dedup_key]
+            followers, leader.followers = leader.followers, []
+            for f in followers:
+                f.leader = None
+            return followers
+
+INFLIGHT = InflightRegistry()
+
+def entry_date(entry: dict):
+    """``YYYYMMDD`` of a flat playlist entry, or None when the site did not say."""
+    if entry.get("upload_date"):
+        return str(entry["upload_date"])
+    stamp = entry.get("timestamp") or entry.get("release_timestamp")
+    return time.strftime("%Y%m%d", time.gmtime(stamp)) if stamp else None
+
+class SubscriptionStore:
+    """
+    Per channel/playlist sync state: the ids of every entry downloaded
+    through it and the newest upload date seen. ``entry_is_known`` lets a sync stop paging as
+    soon as it reaches entries from the previous run. That is only safe
+    for lists ordered newest-first (channels); ``newest_first`` is learned
+    from entry dates on a sync and lists in the other order are scanned in
+    full, still queueing only unseen entries.
+
+    A sync only marks the entries it queued as ``pending``; they move to
+    ``seen`` once their download finishes, so an entry whose download
+    failed or never ran is queued again by the next sync. Those moves are
+    appended to a JSON-lines journal next to the file and folded into it
+    on the next full save, so a finished download never rewrites the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.journal = os.path.splitext(path)[0] + ".seen.jsonl"
+        self._subs = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._subs is None:
+            self._subs = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._subs = json.load(f) or {}
+                except Exception as e:
+                    logger.exception("Failed to load subscriptions: %s", e)
+            if os.path.exists(self.journal):
+                with open(self.journal, "r", encoding="utf-8", errors="replace") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue    # torn last line from a crash
+                        sub = self._subs.get(record.get("key"))
+                        if sub is not None:
+                            self._mark_seen(sub, record.get("id"))
+        return self._subs
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._subs, f, indent=2)
+            os.replace(tmp, self.path)
+            if os.path.exists(self.journal):
+                os.remove(self.journal)     # folded into the file just written
+        except Exception as e:
+            logger.exception("Failed to save subscriptions: %s", e)
+
+    @staticmethod
+    def _mark_seen(sub, entry_id):
+        if entry_id in (sub.get("pending") or ()):
+            sub["pending"] = [i for i in sub["pending"] if i != entry_id]
+        if entry_id not in sub["seen"]:
+            sub["seen"].append(entry_id)
+
+    def all(self) -> list:
+        with self._lock:
+            return [dict(sub) for sub in self._load().values()]
+
+    def get(self, url):
+        with self._lock:
+            sub = self._load().get(normalize_url(url))
+            return dict(sub) if sub else None
+
+    def add(self, url):
+        with self._lock:
+            self._load().setdefault(normalize_url(url), {
+                "url": url, "title": url, "seen": [], "high_water": None, "last_sync": None,
+                "newest_first": True,
+            })
+            self._save()
+
+    def remove(self, url):
+        with self._lock:
+            if self._load().pop(normalize_url(url), None) is not None:
+                self._save()
+
+    @staticmethod
+    def entry_is_known(sub: dict, seen: set, entry: dict) -> bool:
+        if entry.get("id") in seen:
+            return True
+        if entry.get("id") in (sub.get("pending") or ()):
+            return False
+        date = entry_date(entry)
+        return bool(date and sub.get("high_water") and date < sub["high_water"])
+
+    def record_sync(self, url, title, new_ids, newest, newest_first=None):
+        with self._lock:
+            sub = self._load().setdefault(normalize_url(url), {"url": url, "seen": [], "high_water": None})
+            sub["title"] = title or sub.get("title") or url
+            if newest_first is not None:
+                sub["newest_first"] = newest_first
+            pending = sub.get("pending") or []
+            sub["pending"] = list(new_ids) + [i for i in pending if i not in set(new_ids)]
+            if newest and (not sub.get("high_water") or newest > sub["high_water"]):
+                sub["high_water"] = newest
+            sub["last_sync"] = time.time()
+            self._save()
+
+    def record_downloaded(self, url, entry_id):
+        """Mark an entry a sync queued as downloaded, so later syncs treat it as known."""
+        key = normalize_url(url)
+        with self._lock:
+            sub = self._load().get(key)
+            if sub is None:
+                return
+            self._mark_seen(sub, entry_id)
+            try:
+                with open(self.journal, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"key": key, "id": entry_id}) + "\n")
+            except OSError as e:
+                logger.warning("Could not record subscription entry: %s", e)
+
+SUBSCRIPTIONS = SubscriptionStore(SUBSCRIPTIONS_FILE)
+
+class ConcurrencyController:
+    """
+    AIMD tuning of the number of active download slots.
+
+    Workers report bytes from their progress hooks and throttling errors
+    (HTTP 429/403, "rate limit") from the yt-dlp logger. Every
+    ``ADAPTIVE_INTERVAL`` seconds ``sample`` turns that into bytes/s and:
+
+      * halves the slots after throttling, then holds for a while;
+      * otherwise, when every slot is busy, probes one more slot and keeps
+        it only if throughput rose by ``ADAPTIVE_MIN_GAIN``.
+    """
+
+    def __init__(self, max_slots=ADAPTIVE_MAX_SLOTS):
+        self.max_slots = max_slots
+        self.slots = 1
+        self.rate = 0.0
+        self.history = deque(maxlen=120)    # (when, slots, bytes/s, decision)
+        self._bytes = 0
+        self._throttled = 0
+        self._probe = None                  # (slots, rate) before the last increase
+        self._hold = 0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record_bytes(self, n: int):
+        with self._lock:
+            self._bytes += n
+
+    def record_throttle(self, message: str):
+        with self._lock:
+            self._throttled += 1
+        logger.warning("Throttled by site: %s", message)
+
+    def reset(self, slots: int):
+        with self._lock:
+            self.slots = max(1, min(self.max_slots, slots))
+            self._probe, self._hold = None, 0
+
+    def sample(self, busy: int) -> int:
+        """Take a throughput sample; ``busy`` is how many slots are in use."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = max(now - self._last, 1e-6)
+            rate = self._bytes / elapsed
+            throttled = self._throttled
+            self._bytes, self._throttled, self._last = 0, 0, now
+
+            if throttled:
+                self.slots = max(1, self.slots // 2)
+                self._probe, self._hold = None, ADAPTIVE_BACKOFF_HOLD
+                decision = f"back off ({throttled} throttled)"
+            elif self._hold:
+                self._hold -= 1
+                decision = "hold"
+            elif self._probe is not None:
+                prev_slots, prev_rate = self._probe
+                self._probe = None
+                if rate < prev_rate * (1 + ADAPTIVE_MIN_GAIN):
+                    self.slots = prev_slots
+                    self._hold = ADAPTIVE_PLATEAU_HOLD
+                    decision = "no gain, step back"
+                else:
+                    decision = "gain, keep"
+            elif busy >= self.slots and self.slots < self.max_slots:
+                self._probe = (self.slots, rate)
+                self.slots += 1
+                decision = "probe"
+            else:
+                decision = "steady"
+            self.rate = rate
+            self.history.append((time.time(), self.slots, rate, decision))
+            return self.slots
+
+CONCURRENCY = ConcurrencyController()
+
+def parse_bandwidth_schedule(text: str) -> list:
+    """``"01:00-07:00=0, 09:00-17:00=2048"`` -> list of window dicts (limit in KB/s)."""
+    windows = []
+    for item in (text or "").split(","):
+        m = re.fullmatch(r"\s*(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})\s*=\s*(\d+)\s*", item)
+        if m:
+            windows.append({"start": m.group(1), "end": m.group(2), "limit": int(m.group(3))})
+    return windows
+
+def format_bandwidth_schedule(windows: list) -> str:
+    return ", ".join(f"{w['start']}-{w['end']}={w['limit']}" for w in windows)
+
+def scheduled_limit(default_kbps: int, windows: list, now=None) -> int:
+    """KB/s in force at ``now``: the first matching window, else ``default_kbps``."""
+    t = time.localtime(now)
+    minute = t.tm_hour * 60 + t.tm_min
+    for w in windows:
+        try:
+            sh, sm = map(int, w["start"].split(":"))
+            eh, em = map(int, w["end"].split(":"))
+        except (KeyError, ValueError):
+            continue
+        start, end = sh * 60 + sm, eh * 60 + em
+        inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+        if inside:
+            return int(w.get("limit", 0))
+    return int(default_kbps)
+
+class TokenBucket:
+    """Bytes/s bucket that may go into debt; ``reserve`` returns how long to wait."""
+
+    def __init__(self, rate=0.0):
+        self.rate = float(rate)
+        self.tokens = self.rate
+        self.stamp = time.monotonic()
+
+    def set_rate(self, rate):
+        self.rate = float(rate)
+        self.tokens = min(self.tokens, self.rate)
+
+    def reserve(self, n: int) -> float:
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.stamp) * self.rate)    # 1 s burst
+        self.stamp = now
+        self.tokens -= n
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+class BandwidthGovernor:
+    """
+    One token bucket shared by every download in the process, so
+    ``max_download_speed`` caps the total rather than each worker.
+
+    Progress hooks call ``throttle`` with the bytes just received; the
+    worker thread sleeps off any debt, which slows its socket reads.
+    ``configure`` applies a new limit at once and ``rate`` re-reads the
+    schedule, so edits apply to running tasks before their next byte.
+    An optional per-task share caps one download at a percentage of the
+    limit, and a schedule of time windows can override the limit.
+    """
+
+    def __init__(self):
+        self.default_kbps = 0
+        self.schedule = []
+        self.share = 0
+        self.bucket = TokenBucket()
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, settings: dict):
+        with self._lock:
+            self.default_kbps = max(0, int(settings.get("max_download_speed", 0)))
+            self.schedule = list(settings.get("bandwidth_schedule") or [])
+            self.share = max(0, min(100, int(settings.get("per_task_share", 0))))
+            self._checked = 0.0
+            self._refresh()
+
+    @property
+    def rate(self) -> float:
+        """Current limit in bytes/s, 0 = unlimited."""
+        with self._lock:
+            self._refresh()
+            return self.bucket.rate
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked >= BANDWIDTH_RECHECK:
+            self._checked = now
+            rate = scheduled_limit(self.default_kbps, self.schedule) * 1024
+            if rate != self.bucket.rate:
+                logger.info("Bandwidth limit now %s", f"{human_bytes(rate)}/s" if rate else "unlimited")
+                self.bucket.set_rate(rate)
+
+    def throttle(self, task, n: int):
+        with self._lock:
+            self._refresh()
+            wait = self.bucket.reserve(n)
+            if self.share and self.bucket.rate:
+                if task.bandwidth is None:
+                    task.bandwidth = TokenBucket()
+                task.bandwidth.set_rate(self.bucket.rate * self.share / 100)
+                wait = max(wait, task.bandwidth.reserve(n))
+        deadline = time.monotonic() + wait
+        while not (task.cancel_flag.is_set() or task.pause_flag.is_set()):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            task.cancel_flag.wait(min(remaining, 0.2))
+
+BANDWIDTH = BandwidthGovernor()
+
+class YDLLogger:
+    """Routes yt-dlp output to our log and reports throttling to ``CONCURRENCY``."""
+
+    def debug(self, msg):
+        logger.debug(msg)
+
+    def info(self, msg):
+        logger.info(msg)
+
+    def warning(self, msg):
+        if THROTTLE_RE.search(msg):
+            CONCURRENCY.record_throttle(msg)
+        logger.warning(msg)
+
+    def error(self, msg):
+        if THROTTLE_RE.search(msg):
+            CONCURRENCY.record_throttle(msg)
+        logger.error(msg)
+
+def site_key(task) -> str:
+    """Quota bucket for a task: the extractor when known, otherwise the host."""
+    if task.archive_id:
+        return task.archive_id.split(" ", 1)[0]
+    return task.host or "-"
+
+def classify_error(message: str) -> str:
+    """``throttled``, ``blocked`` (HTTP 403, geo), ``transient`` or ``permanent`` for a download error."""
+    for kind, pattern in ERROR_CLASSES:
+        if pattern.search(message or ""):
+            return kind
+    return "permanent"
+
+def retry_delay(kind: str, attempt: int, base: float) -> float:
+    """Seconds before retry number ``attempt``: doubling from ``base``, capped, with equal jitter."""
+    first = max(base, RETRY_THROTTLE_DELAY) if kind == "throttled" else base
+    ceiling = min(RETRY_MAX_DELAY, first * 2 ** (attempt - 1))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+class TaskScheduler:
+    """
+    Drop-in replacement for the FIFO ``queue.Queue`` workers pull from.
+
+    Policies:
+      * ``fifo``     - explicit priority first, then arrival order.
+      * ``priority`` - explicit priority, with aging so low-priority tasks
+                       are not starved.
+      * ``sjf``      - shortest job first from ``filesize``/``filesize_approx``
+                       in cached metadata, plus priority and aging.
+
+    Waiting time lowers every task's cost at the same rate, so the aged
+    key ``cost + aging * enqueued_at`` never changes while a task waits and
+    a plain heap keeps the order. Re-keyed tasks get a new heap entry; stale
+    ones are skipped on pop.
+
+    Tasks are kept in one heap per site (see ``site_key``). ``get`` only
+    hands out work from sites below their concurrency limit and picks the
+    site whose head task has the lowest key, so size and aging count
+    across sites too; under ``fifo`` only the explicit priority does, and
+    it rotates between sites instead, so one large batch cannot take every
+    worker. Ties go to the least busy site, then the one served longest
+    ago. The slot is held until the worker calls ``task_done(task)``.
+
+    ``put(task, delay=...)`` keeps a retry out of sight until its backoff
+    has passed, so no worker holds a slot while it waits. Each site also
+    has a circuit breaker fed by ``record_outcome``: after
+    ``breaker_threshold`` failures in a row its tasks stay queued for
+    ``breaker_cooldown`` seconds, then one trial task is let through. A
+    success closes the circuit; a failed trial reopens it for twice as long.
+    """
+
+    def __init__(self, policy="fifo", aging=1.0, per_site_limit=0, site_limits=None):
+        self.policy = policy if policy in SCHEDULER_POLICIES else "fifo"
+        self.global_limit = 0     # total tasks handed out at once, set by WorkerPool
+        self.aging = float(aging)
+        self.per_site_limit = int(per_site_limit)
+        self.site_limits = dict(site_limits or {})
+        self._heaps = {}          # site -> heap of (key, seq, version, task)
+        self._active = {}         # site -> tasks handed out and not yet done
+        self._served = {}         # site -> tick of the last dispatch, for round robin
+        self._delayed = []        # heap of (visible_at, seq, task) for retries in backoff
+        self._circuits = {}       # site -> {"failures", "open_until", "cooldown", "trial"}
+        self.breaker_threshold = 0
+        self.breaker_cooldown = 0
+        self._tick = 0
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def _key(self, task):
+        if self.policy == "fifo":
+            return (-task.priority, task.enqueued_at)
+        cost = -task.priority * PRIORITY_STEP
+        if self.policy == "sjf":
+            if task.est_bytes is None:
+                info = METADATA_CACHE.peek(task.url)
+                task.est_bytes = info and estimate_size(info, format_spec_for(task))
+            cost += (task.est_bytes or SJF_UNKNOWN_BYTES) / SJF_REFERENCE_RATE
+        return (cost + self.aging * task.enqueued_at,)
+
+    def _push(self, task):
+        self._seq += 1
+        task.sched_version += 1
+        heap = self._heaps.setdefault(site_key(task), [])
+        heapq.heappush(heap, (self._key(task), self._seq, task.sched_version, task))
+
+    def limit_for(self, site):
+        return int(self.site_limits.get(site, self.per_site_limit))
+
+    def put(self, task, block=True, timeout=None, delay=0):
+        with self._cond:
+            if task.enqueued_at is None:
+                task.enqueued_at = time.monotonic()    # resumed tasks keep their place
+            if delay > 0:
+                self._seq += 1
+                heapq.heappush(self._delayed, (time.monotonic() + delay, self._seq, task))
+                self._cond.notify()     # a waiting get shortens its timeout
+                return
+            task.sched_queued = True
+            self._push(task)
+            self._cond.notify()
+
+    def put_nowait(self, task):
+        self.put(task, block=False)
+
+    def update(self, task):
+        """Re-key a waiting task after its priority, size estimate or site changed."""
+        with self._cond:
+            if task.sched_queued:
+                self._push(task)
+                self._cond.notify()
+
+    def _waiting(self):
+        return [e[3] for heap in self._heaps.values() for e in heap
+                if e[3].sched_queued and e[2] == e[3].sched_version]
+
+    def set_policy(self, policy, aging=None):
+        with self._cond:
+            self.policy = policy if policy in SCHEDULER_POLICIES else "fifo"
+            if aging is not None:
+                self.aging = float(aging)
+            waiting = self._waiting()
+            self._heaps = {}
+            for task in waiting:
+                self._push(task)
+
+    def set_limits(self, per_site_limit, site_limits=None):
+        with self._cond:
+            self.per_site_limit = int(per_site_limit)
+            self.site_limits = dict(site_limits or {})
+            self._cond.notify_all()
+
+    def set_breaker(self, threshold, cooldown):
+        with self._cond:
+            self.breaker_threshold = max(0, int(threshold))
+            self.breaker_cooldown = max(1, int(cooldown))
+            if not self.breaker_threshold:
+                self._circuits.clear()
+            self._cond.notify_all()
+
+    def record_outcome(self, task, failed: bool):
+        """Feed ``task``'s site breaker: ``failed`` for a retryable error, False for a finished download."""
+        site = task.slot or site_key(task)
+        with self._cond:
+            circuit = self._circuits.get(site)
+            if not failed:
+                if circuit is not None:
+                    del self._circuits[site]
+                    if circuit["open_until"] is not None:
+                        logger.info("Circuit for %s closed again", site)
+                    self._cond.notify_all()
+                return
+            if not self.breaker_threshold:
+                return
+            if circuit is None:
+                circuit = self._circuits[site] = {"failures": 0, "open_until": None,
+                                                  "cooldown": self.breaker_cooldown, "trial": None}
+            circuit["failures"] += 1
+            if circuit["trial"] is task:
+                circuit["trial"] = None
+                circuit["cooldown"] = min(BREAKER_MAX_COOLDOWN, circuit["cooldown"] * 2)
+            elif circuit["open_until"] is not None or circuit["failures"] < self.breaker_threshold:
+                return
+            circuit["open_until"] = time.monotonic() + circuit["cooldown"]
+            logger.warning("Circuit for %s open after %d failures, holding its tasks for %ds",
+                           site, circuit["failures"], circuit["cooldown"])
+
+    def open_circuits(self) -> dict:
+        """``{site: seconds until its next trial}`` for sites held back by the breaker."""
+        now = time.monotonic()
+        with self._cond:
+            return {site: c["open_until"] - now for site, c in self._circuits.items()
+                    if c["open_until"] is not None and c["open_until"] > now}
+
+    def set_global_limit(self, limit):
+        with self._cond:
+            self.global_limit = int(limit)
+            self._cond.notify_all()
+
+    def busy(self):
+        with self._cond:
+            return sum(self._active.values())
+
+    def _head(self, site):
+        heap = self._heaps[site]
+        while heap:
+            _, _, version, task = heap[0]
+            if task.sched_queued and version == task.sched_version:
+                return task
+            heapq.heappop(heap)
+        del self._heaps[site]
+        return None
+
+    def _pop_ready(self):
+        if self.global_limit and sum(self._active.values()) >= self.global_limit:
+            return None
+        best = None
+        for site in list(self._heaps):
+            task = self._head(site)
+            if task is None:
+                continue
+            active, limit = self._active.get(site, 0), self.limit_for(site)
+            if limit and active >= limit:
+                continue
+            circuit = self._circuits.get(site)
+            if circuit is not None and circuit["open_until"] is not None and (
+                    circuit["open_until"] > time.monotonic() or circuit["trial"] is not None):
+                continue    # open, or half-open with its trial task still out
+            key = self._heaps[site][0][0]
+            if self.policy == "fifo":
+                key = key[:1]   # arrival order only within a site; sites take turns
+            rank = (key, active, self._served.get(site, 0))
+            if best is None or rank < best[0]:
+                best = (rank, site)
+        if best is None:
+            return None
+        site = best[1]
+        task = heapq.heappop(self._heaps[site])[3]
+        task.sched_queued = False
+        task.slot = site
+        circuit = self._circuits.get(site)
+        if circuit is not None and circuit["open_until"] is not None:
+            circuit["trial"] = task
+        self._active[site] = self._active.get(site, 0) + 1
+        self._tick += 1
+        self._served[site] = self._tick
+        return task
+
+    def _release_delayed(self):
+        """Move retries whose backoff has passed into the site heaps; returns when the next one is due."""
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            task = heapq.heappop(self._delayed)[2]
+            task.sched_queued = True
+            self._push(task)
+        due = [self._delayed[0][0]] if self._delayed else []
+        due += [c["open_until"] for site, c in self._circuits.items()
+                if c["open_until"] is not None and c["open_until"] > now and site in self._heaps]
+        return min(due, default=None)
+
+    def wake(self):
+        """Wake every blocked ``get`` so it re-checks its stop event."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def get(self, block=True, timeout=None, stop=None):
+        """
+        Next task, blocking without polling. Returns None once ``stop``
+        (a ``threading.Event``) is set; call ``wake`` after setting it.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if stop is not None and stop.is_set():
+                    return None
+                due = self._release_delayed()
+                task = self._pop_ready()
+                if task is not None:
+                    return task
+                now = time.monotonic()
+                remaining = None if deadline is None else deadline - now
+                if not block or (remaining is not None and remaining <= 0):
+                    raise queue.Empty
+                if due is not None:
+                    remaining = due - now if remaining is None else min(remaining, due - now)
+                self._cond.wait(remaining)
+
+    def task_done(self, task=None):
+        """Free the site slot ``task`` held since ``get``."""
+        if task is None or task.slot is None:
+            return
+        with self._cond:
+            site, task.slot = task.slot, None
+            circuit = self._circuits.get(site)
+            if circuit is not None and circuit["trial"] is task:
+                circuit["trial"] = None     # paused or canceled: let another task try
+            self._active[site] -= 1
+            if not self._active[site]:
+                del self._active[site]
+            self._cond.notify_all()
+
+    def qsize(self):
+        with self._cond:
+            return len(self._waiting()) + len(self._delayed)
+
+    def slot_usage(self):
+        """``{site: (running, limit, waiting)}`` for the status bar."""
+        with self._cond:
+            waiting = {}
+            for task in self._waiting():
+                site = site_key(task)
+                waiting[site] = waiting.get(site, 0) + 1
+            return {site: (self._active.get(site, 0), self.limit_for(site), waiting.get(site, 0))
+                    for site in set(self._active) | set(waiting)}
+
 class DownloadTask:
     _id_counter = 0
 
@@ -180,8 +2771,39 @@ class DownloadTask:
         DownloadTask._id_counter += 1
         self.id = DownloadTask._id_counter
         self.url = url.strip()
+        self.host = url_host(self.url)
         self.audio_only = bool(audio_only)
         self.format_id = format_id
+        self.priority = 0               # higher runs earlier; changed by Move Up/Down
+        self.est_bytes = None           # size estimate for shortest-job-first
+        self.enqueued_at = None
+        self.sched_queued = False
+        self.sched_version = 0
+        self.bytes_seen = {}            # filename -> downloaded_bytes last reported
+        self.streams = {}               # filename -> [downloaded, total, speed] for combined progress
+        self.fragments = ""             # "frag 12/300 x6" while an HLS/DASH stream downloads
+        self.checkpoint = None          # {"info": resolved info, "parts": {file: offsets}} for resume
+        self.segmented = None           # multi-connection: None = follow the per-site setting
+        self.bandwidth = None           # per-task TokenBucket when a share is set
+        self.process = None             # child process in process mode
+        self.parent = None              # playlist task this entry was expanded from
+        self.subscription = None        # subscription URL of a sync task and of the entries it queued
+        self.entry_id = None            # playlist entry id, recorded with the subscription once downloaded
+        self.children = None            # list of entry tasks once a playlist is expanded
+        self.expanding = False
+        self.playlist_title = None
+        self.expand_pending = False     # playlist mode: expand before queueing
+        self.speed_bps = 0
+        self.eta_seconds = None         # numeric twin of ``eta`` for sorting
+        self.downloaded_bytes = 0
+        self.total_bytes = 0
+        self.slot = None                # site slot held while a worker owns the task
+        self.force = False              # download even if the archive says we have it
+        self.archive_id = None
+        self.dedup_key = None
+        self.outtmpl = None             # output template captured when the task was added
+        self.leader = None              # in-flight task this one is waiting on
+        self.followers = []             # identical tasks sharing this download
         self.title = "-"
         self.filename = None
         self.status = TASK_NEW
@@ -191,85 +2813,129 @@ class DownloadTask:
         self.size = "-"
         self.error = None
         self.thumb_path = None          
+        self.thumb_requested = False
+        self.partial_files = set()      # filled by the progress hook, used by cancel cleanup
         self.created = time.time()
         self.cancel_flag = threading.Event()
         self.pause_flag = threading.Event()
+        self.io = TaskIO()              # sockets and ffmpeg processes of the current attempt
+        self.lock = threading.Lock()    # status + flags, between the UI and a worker picking the task up
         self.retry_count = 0
 
+    def interrupt(self, signal: str = USER_CANCEL_SIGNAL, status: str = None):
+        """
+        Set the cancel (or pause) flag, and ``status`` if given, then abort
+        whatever I/O the task is blocked on. Flag and status change together,
+        so a worker picking the task up sees either both or neither.
+        """
+        with self.lock:
+            if status is not None:
+                self.status = status
+            (self.pause_flag if signal == USER_PAUSE_SIGNAL else self.cancel_flag).set()
+            io = self.io
+        io.abort(signal)
+
+    def start_attempt(self) -> bool:
+        """Reset the flags and I/O for a new attempt; False if it was canceled or skipped meanwhile."""
+        with self.lock:
+            if self.status in (TASK_CANCELED, TASK_SKIPPED):
+                return False
+            self.pause_flag.clear()
+            self.cancel_flag.clear()
+            self.io = TaskIO()
+            return True
+
 class DownloadWorker(threading.Thread):
-    def __init__(self, task_queue: queue.Queue, gui_callback, settings_provider):
+    def __init__(self, task_queue: "TaskScheduler", gui_callback, settings_provider):
         super().__init__(daemon=True, name=f"Downloader-{threading.get_ident()}")
         self.task_queue = task_queue
         self.gui_callback = gui_callback
         self.settings_provider = settings_provider
-        self._stop = threading.Event()
+        self._stop_event = threading.Event()
         self.current_task = None
 
     def stop(self):
-        self._stop.set()
-        try:
-            self.task_queue.put_nowait(None)
-        except Exception:
-            pass
+        """Exit after the current task (if any) finishes."""
+        self._stop_event.set()
+        self.task_queue.wake()
+
+    @property
+    def retiring(self):
+        return self._stop_event.is_set()
 
     def run(self):
         """Download using yt-dlp *in-process* (no subprocess)."""
         import yt_dlp
 
-        while not self._stop.is_set():
-            try:
-                task: DownloadTask = self.task_queue.get(timeout=0.2)
-            except queue.Empty:
-                continue
+        while not self._stop_event.is_set():
+            task: DownloadTask = self.task_queue.get(stop=self._stop_event)
             if task is None:
                 break
-            if getattr(task, "status", None) == TASK_CANCELED:
-                self.task_queue.task_done()
+            if not task.start_attempt():
+                self.task_queue.task_done(task)
+                continue
+
+            # single-flight: an identical download is already queued or running
+            if task.dedup_key is None:
+                task.dedup_key = dedup_key_for(task)
+            if task.leader is not None or INFLIGHT.attach(task) is not None:
+                logger.info("#%s follows #%s", task.id, task.leader.id)
+                self.task_queue.task_done(task)
                 continue
 
             self.current_task = task
             settings = self.settings_provider()
+            TaskIO.bind(task.io)
 
-            # fetch title (non-blocking)
+            # fetch metadata once; the download and the history entry reuse it
+            playlist = settings.get("enable_playlist", False) and task.parent is None
+            info = None
+            resume_info = task.checkpoint["info"] if task.checkpoint is not None and not playlist else None
             try:
-                with yt_dlp.YoutubeDL({"quiet": True}) as ydl:
-                    info = ydl.extract_info(task.url, download=False)
-                    task.title = info.get("title", "-")
+                # a paused download already knows its formats and URLs
+                info = resume_info or METADATA_CACHE.get(task.url, playlist)
+                task.title = info.get("title", "-")
             except Exception as e:
                 logger.warning("Could not fetch metadata for %s: %s", task.url, e)
 
-            task.status = TASK_RUNNING
-            task.pause_flag.clear()
-            task.cancel_flag.clear()
+            skip_downloaded = settings.get("skip_downloaded", True) and not task.force
+            if info is not None:
+                task.archive_id = archive_id_for_info(info) or task.archive_id
+            if skip_downloaded and task.archive_id in DOWNLOAD_ARCHIVE:
+                task.status = TASK_SKIPPED
+                logger.info("Skipping #%s, already downloaded (%s)", task.id, task.archive_id)
+                self._record_subscription_entry(task)
+                self.gui_callback("update_task", task)
+                self._finish_followers(task, info)
+                TaskIO.bind(None)
+                self.task_queue.task_done(task)
+                continue
+
+            with task.lock:
+                if not task.cancel_flag.is_set():    # canceled during metadata: the download bails out below
+                    task.status = TASK_RUNNING
+            task.error = None
             self.gui_callback("update_task", task)
 
             # -----------------------------------------------------------------
             # Build yt-dlp options
             # -----------------------------------------------------------------
-            outtmpl = os.path.abspath(
+            outtmpl = task.outtmpl or os.path.abspath(
                 os.path.join(settings["download_folder"], settings["filename_template"])
             )
+            task.outtmpl = outtmpl
 
             ydl_opts = {
                 "outtmpl": outtmpl,
-                "noplaylist": not settings.get("enable_playlist", False),
-                "writesubtitles": settings.get("enable_subtitles", False),
+                "noplaylist": not playlist,
+                "writesubtitles": settings.get("enable_subtitles", False) or settings.get("burn_subtitles", False),
                 "subtitleslangs": settings.get("subtitle_langs") or ["en"],
-                "embedsubtitles": settings.get("burn_subtitles", False),
-                "format": task.format_id or ("bestaudio/best"
-                                             if (task.audio_only or settings.get("audio_only"))
-                                             else "bestvideo+bestaudio/best"),
+                "format": format_spec_for(task, settings.get("audio_only")),
+                "postprocessors": postprocessors_for(task, settings),
             }
 
-            if settings.get("max_download_speed", 0) > 0:
-                ydl_opts["ratelimit"] = settings["max_download_speed"] * 1024  # KB→bytes
-
-            if task.audio_only or settings.get("audio_only"):
-                ydl_opts.update({
-                    "extractaudio": True,
-                    "audioformat": settings.get("audio_format", "mp3"),
-                    "audioquality": "192K",
-                })
+            if skip_downloaded:
+                ydl_opts["download_archive"] = DOWNLOAD_ARCHIVE
 
             # -----------------------------------------------------------------
             # Progress / cancel / pause handling
@@ -280,78 +2946,549 @@ class DownloadWorker(threading.Thread):
                 if task.pause_flag.is_set():
                     raise yt_dlp.utils.DownloadError("__USER_PAUSE__")
 
+                for key in ("filename", "tmpfilename"):
+                    if d.get(key):
+                        task.partial_files.add(d[key])
+
+                if task.checkpoint is not None and d["status"] == "downloading":
+                    task.checkpoint["parts"][d.get("filename")] = {
+                        "tmpfilename": d.get("tmpfilename"),
+                        "downloaded_bytes": d.get("downloaded_bytes"),
+                        "fragment_index": d.get("fragment_index"),
+                    }
+
+                if d["status"] == "finished" and d.get("filename") in task.streams:
+                    size = d.get("total_bytes") or d.get("downloaded_bytes") or task.streams[d["filename"]][0]
+                    task.streams[d["filename"]] = [size, size, 0]
+
                 if d["status"] == "downloading":
                     # extract numeric values
                     total        = d.get("total_bytes") or d.get("total_bytes_estimate", 0)
-                    downloaded   = d.get("downloaded_bytes", 0)
+                    downloaded   = d.get("downloaded_bytes", 0) or 0
                     speed_bps    = d.get("speed", 0) or 0
                     eta_seconds  = d.get("eta", None)
 
+                    # video and audio may download side by side: report them combined
+                    name = d.get("filename")
+                    task.streams[name] = [downloaded, total or 0, speed_bps]
+                    if len(task.streams) > 1:
+                        downloaded = sum(s[0] for s in task.streams.values())
+                        total = sum(s[1] for s in task.streams.values())
+                        speed_bps = sum(s[2] for s in task.streams.values())
+                        eta_seconds = (total - downloaded) / speed_bps if speed_bps and total > downloaded else None
+
+                    delta = task.streams[name][0] - task.bytes_seen.get(name, 0)
+                    task.bytes_seen[name] = task.streams[name][0]
+                    if delta > 0:
+                        CONCURRENCY.record_bytes(delta)
+                        BANDWIDTH.throttle(task, delta)
+
                     if total:
                         task.progress = min(100.0, downloaded * 100.0 / total)
                     else:
                         task.progress = 0.0
 
+                    task.speed_bps, task.downloaded_bytes, task.total_bytes = speed_bps, downloaded, total or 0
+                    if d.get("fragment_count"):
+                        task.fragments = f"frag {d.get('fragment_index') or 0}/{d['fragment_count']}"
+                        if d.get("fragment_workers"):
+                            task.fragments += f" x{d['fragment_workers']}"
                     task.speed = human_bytes(speed_bps) + "/s" if speed_bps else "-"
                     task.eta   = human_eta(eta_seconds) if eta_seconds else "-"
+                    task.eta_seconds = eta_seconds or None
 
                     self.gui_callback("update_task", task)
+                    self._sync_followers(task)
+
+            def postprocessor_hook(d):
+                if task.cancel_flag.is_set():
+                    raise yt_dlp.utils.DownloadError("__USER_CANCEL__")
+                path = (d.get("info_dict") or {}).get("filepath")
+                if path:
+                    task.partial_files.add(path)
+
+            def record_checkpoint(resolved_info):
+                task.checkpoint = {"info": resolved_info, "parts": {}}
 
+            ydl_opts["logger"] = YDLLogger()
             ydl_opts["progress_hooks"] = [progress_hook]
+            ydl_opts["postprocessor_hooks"] = [postprocessor_hook]
+            if resume_info is not None and resume_info.get("format_id"):
+                # re-extraction must pick the same formats to reuse the .part files
+                ydl_opts["format"] = f"{resume_info['format_id']}/{ydl_opts['format']}"
 
             # -----------------------------------------------------------------
             # Do the download
             # -----------------------------------------------------------------
+            jobs = []
+            handoff = None
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([task.url])
-                task.status = TASK_DONE
-                Persistence.append_history({
-                    "title": task.title,
-                    "url": task.url,
-                    "file": ydl.prepare_filename(ydl.extract_info(task.url, download=False)),
-                    "when": time.time(),
-                    "audio_only": task.audio_only or settings.get("audio_only"),
-                    "subs": settings.get("enable_subtitles"),
-                })
+                if task.io.requested is not None:
+                    raise yt_dlp.utils.DownloadError(task.io.signal)    # interrupted while fetching metadata
+                if resume_info is not None:
+                    with YDL_POOL.session(ydl_opts, outtmpl) as probe:
+                        alive = media_urls_alive(probe, resume_info)
+                    if alive:
+                        logger.info("Resuming #%s at %s without re-extraction", task.id, human_bytes(
+                            sum(p["downloaded_bytes"] or 0 for p in task.checkpoint["parts"].values())))
+                    else:
+                        logger.info("Media URL of #%s expired, extracting again", task.id)
+                        resume_info = None
+                        METADATA_CACHE.invalidate(task.url, playlist)
+                        info = METADATA_CACHE.get(task.url, playlist)
+                if settings.get("process_mode", False):
+                    task.filename = self._run_in_process(task, resume_info or info, ydl_opts,
+                                                         settings.get("parallel_streams", True),
+                                                         segmented_for(task, settings),
+                                                         fragments_for(task, settings), jobs,
+                                                         resolved=resume_info is not None)
+                else:
+                    with YDL_POOL.session(ydl_opts, outtmpl, ydl_opts["format"], progress_hook,
+                                          postprocessor_hook, settings.get("parallel_streams", True),
+                                          segmented_for(task, settings), fragments_for(task, settings),
+                                          jobs, None if playlist else record_checkpoint) as ydl:
+                        if resume_info is not None:
+                            result = clone_info(resume_info)
+                            ydl.process_info(result)
+                        elif info is not None:
+                            result = ydl.process_ie_result(unselected_info(info), download=True)
+                        else:
+                            result = ydl.extract_info(task.url, download=True)
+                        task.filename = downloaded_path(ydl, result or info or {})
+                if jobs:
+                    # ffmpeg work goes to the post-processing pool; this slot is free again
+                    task.status = TASK_PROCESSING
+                    task.progress, task.speed, task.eta, task.fragments = 0.0, "-", "-", ""
+                    task.speed_bps, task.eta_seconds = 0, None
+                    handoff = functools.partial(self._postprocess, task, info, jobs, ydl_opts, settings)
+                else:
+                    self._complete(task, settings)
             except yt_dlp.utils.DownloadError as e:
-                if "__USER_CANCEL__" in str(e):
+                # after an abort the error may just be the closed socket or killed ffmpeg
+                if "__USER_CANCEL__" in str(e) or task.cancel_flag.is_set():
                     task.status = TASK_CANCELED
-                elif "__USER_PAUSE__" in str(e):
+                elif "__USER_PAUSE__" in str(e) or task.pause_flag.is_set():
                     task.status = TASK_PAUSED
                 else:
                     task.status = TASK_FAILED
                     task.error = str(e)
+                    if THROTTLE_RE.search(task.error):
+                        CONCURRENCY.record_throttle(task.error)
             except Exception as e:
-                task.status = TASK_FAILED
-                task.error = str(e)
+                if task.cancel_flag.is_set():
+                    task.status = TASK_CANCELED
+                elif task.pause_flag.is_set():
+                    task.status = TASK_PAUSED
+                else:
+                    task.status = TASK_FAILED
+                    task.error = str(e)
             finally:
-                # remove partial file on cancel
+                TaskIO.bind(None)
+                task.io.release()
+                self._log_interrupt(task)
+                # remove partial files on cancel (paths recorded by the hooks)
                 if task.status == TASK_CANCELED:
-                    try:
-                        with yt_dlp.YoutubeDL({"quiet": True}) as ydl:
-                            info = ydl.extract_info(task.url, download=False)
-                        real_path = ydl.prepare_filename(info)
-                        if task.audio_only or settings.get("audio_only"):
-                            base, _ = os.path.splitext(real_path)
-                            real_path = base + "." + settings.get("audio_format", "mp3")
-                        if os.path.isfile(real_path):
-                            os.remove(real_path)
-                            logger.info("Deleted partial file: %s", real_path)
-                    except Exception as e:
-                        logger.warning("Could not delete partial file: %s", e)
+                    remove_partial_files([task])
+                elif task.status == TASK_DONE:
+                    task.partial_files.clear()
+                if task.status in (TASK_DONE, TASK_PROCESSING, TASK_CANCELED):
+                    task.checkpoint = None
+                retry_in = None
+                if task.status == TASK_FAILED:
+                    retry_in = self._plan_retry(task, settings, playlist)
+                elif task.status in (TASK_DONE, TASK_PROCESSING):
+                    task.retry_count = 0
+                    self.task_queue.record_outcome(task, failed=False)
 
                 self.gui_callback("update_task", task)
-                self.task_queue.task_done()
+                if handoff is not None:
+                    POSTPROCESS.submit(task, handoff)
+                elif task.status not in (TASK_PAUSED, TASK_QUEUED):
+                    self._finish_followers(task, info)
+                self.current_task = None
+                self.task_queue.task_done(task)
+                if retry_in is not None:
+                    self.task_queue.put(task, delay=retry_in)
+
+    def _plan_retry(self, task: DownloadTask, settings: dict, playlist: bool):
+        """
+        Decide whether a failed download is tried again. Returns the backoff
+        in seconds and marks the task queued, or None to leave it failed.
+        Network errors and rate limits get ``retry_attempts`` tries, a 403 or
+        geo block one try with fresh metadata, anything else none.
+        """
+        kind = classify_error(task.error)
+        self.task_queue.record_outcome(task, failed=kind != "permanent")
+        attempts = max(0, int(settings.get("retry_attempts", 3)))
+        if kind == "blocked":
+            attempts = min(attempts, 1)
+        elif kind == "permanent":
+            attempts = 0
+        if task.retry_count >= attempts:
+            if attempts:
+                logger.info("Giving up on #%s after %d retries", task.id, task.retry_count)
+            return None
+        task.retry_count += 1
+        if kind == "blocked":
+            # signed URLs may have gone stale: extract again instead of reusing them
+            METADATA_CACHE.invalidate(task.url, playlist)
+            task.checkpoint = None
+        delay = retry_delay(kind, task.retry_count, max(1, int(settings.get("retry_delay", 5))))
+        logger.info("Retrying #%s in %.0fs (%s error, retry %d/%d): %s",
+                    task.id, delay, kind, task.retry_count, attempts, task.error)
+        task.status = TASK_QUEUED
+        task.speed, task.speed_bps = "-", 0
+        task.eta, task.eta_seconds = f"retry {task.retry_count}/{attempts} in {human_eta(delay)}", delay
+        return delay
+
+    def _complete(self, task: DownloadTask, settings: dict):
+        """Mark a download finished and record it in the archive, history and its subscription."""
+        task.status = TASK_DONE
+        if task.archive_id:
+            DOWNLOAD_ARCHIVE.add(task.archive_id)
+        self._record_subscription_entry(task)
+        Persistence.append_history({
+            "title": task.title,
+            "url": task.url,
+            "archive_id": task.archive_id,
+            "file": task.filename,
+            "when": time.time(),
+            "audio_only": task.audio_only or settings.get("audio_only"),
+            "subs": settings.get("enable_subtitles"),
+        })
+
+    @staticmethod
+    def _record_subscription_entry(task: DownloadTask):
+        if task.subscription and task.entry_id:
+            SUBSCRIPTIONS.record_downloaded(task.subscription, task.entry_id)
+
+    def _postprocess(self, task: DownloadTask, info, jobs, ydl_opts, settings):
+        """
+        Second pipeline stage, run on a ``POSTPROCESS`` thread: the
+        postprocessors yt-dlp queued for each downloaded file, on a pooled
+        YoutubeDL with the same options. Progress counts finished steps.
+        """
+        import yt_dlp
+        steps = [0, sum(len(job_info.get("__postprocessors") or job_info.get("__postprocessor_names") or []) + 1
+                        for _, job_info, _ in jobs)]
+
+        def postprocessor_hook(d):
+            if task.cancel_flag.is_set():
+                raise yt_dlp.utils.DownloadError("__USER_CANCEL__")
+            path = (d.get("info_dict") or {}).get("filepath")
+            if path:
+                task.partial_files.add(path)
+            if d["status"] == "started":
+                task.speed, task.speed_bps = d.get("postprocessor") or "-", 0
+            elif d["status"] == "finished":
+                steps[0] += 1
+                task.progress = min(100.0, steps[0] * 100.0 / steps[1])
+            self.gui_callback("update_task", task)
+
+        TaskIO.bind(task.io)
+        try:
+            if task.cancel_flag.is_set():
+                raise yt_dlp.utils.DownloadError("__USER_CANCEL__")
+            with YDL_POOL.session(ydl_opts, task.outtmpl, ydl_opts["format"], None, postprocessor_hook) as ydl:
+                steps[1] += len(jobs) * (len(ydl._pps["post_process"]) + len(ydl._pps["after_move"]))
+                for filename, job_info, files_to_move in jobs:
+                    names = job_info.pop("__postprocessor_names", None)
+                    if names is not None:
+                        job_info["__postprocessors"] = [getattr(yt_dlp.postprocessor, n)(ydl) for n in names]
+                    else:
+                        for pp in job_info.get("__postprocessors") or []:
+                            pp._progress_hooks = [pp.report_progress]   # drop the downloading instance's hooks
+                            pp.set_downloader(ydl)
+                    result = ydl.post_process(filename, job_info, files_to_move)
+                    ydl.record_download_archive(result)
+                    task.filename = downloaded_path(ydl, result)
+            self._complete(task, settings)
+        except Exception as e:
+            # a killed ffmpeg surfaces as a postprocessor error
+            if "__USER_CANCEL__" in str(e) or task.cancel_flag.is_set():
+                task.status = TASK_CANCELED
+            else:
+                task.status = TASK_FAILED
+                task.error = str(e)
+        finally:
+            TaskIO.bind(None)
+            task.io.release()
+            self._log_interrupt(task)
+            if task.status == TASK_CANCELED:
+                remove_partial_files([task])
+            elif task.status == TASK_DONE:
+                task.partial_files.clear()
+            task.speed, task.speed_bps = "-", 0
+            self.gui_callback("update_task", task)
+            self._finish_followers(task, info)
+
+    def _log_interrupt(self, task: DownloadTask):
+        """Log how long a pause or cancel took to take effect."""
+        if task.io.requested is None or task.status not in (TASK_CANCELED, TASK_PAUSED):
+            return
+        latency = time.monotonic() - task.io.requested
+        (logger.warning if latency > ABORT_DEADLINE else logger.info)(
+            "%s #%s in %.2fs", "Canceled" if task.status == TASK_CANCELED else "Paused", task.id, latency)
+
+    def _run_in_process(self, task: DownloadTask, info, ydl_opts, parallel_streams=True, segments=0,
+                        fragments=0, jobs=None, resolved=False) -> str:
+        """
+        Run one download in a spawned process so extraction and format
+        sorting do not compete for this process's GIL. Progress comes back
+        over a pipe and goes through the same hooks as a threaded download;
+        pause and cancel terminate the child (yt-dlp resumes from ``.part``).
+        ``resolved`` passes a checkpoint's info dict, which must keep its
+        requested formats.
+        """
+        import yt_dlp
+        progress_hook, = ydl_opts["progress_hooks"]
+        postprocessor_hook, = ydl_opts["postprocessor_hooks"]
+        child_opts = {k: v for k, v in ydl_opts.items()
+                      if k not in ("progress_hooks", "postprocessor_hooks", "logger", "download_archive")}
+        if info is not None:
+            info = YoutubeDL.sanitize_info(clone_info(info) if resolved else unselected_info(info),
+                                           remove_private_keys=not resolved)
+
+        ctx = multiprocessing.get_context("spawn")
+        conn, child_conn = ctx.Pipe()
+        proc = ctx.Process(target=download_in_child, args=(child_conn, task.url, info, child_opts, parallel_streams, segments,
+                                                            fragments, resolved),
+                           name=f"Download-{task.id}", daemon=True)
+        proc.start()
+        child_conn.close()
+        task.process = proc
+        ydl_logger = ydl_opts["logger"]
+        finished = False
+        try:
+            task.io.track(proc)     # pause/cancel terminate the child at once
+            while True:
+                if task.cancel_flag.is_set() or task.pause_flag.is_set():
+                    raise yt_dlp.utils.DownloadError(
+                        "__USER_CANCEL__" if task.cancel_flag.is_set() else "__USER_PAUSE__")
+                if not wait_connections([conn, proc.sentinel], timeout=0.2):
+                    continue
+                try:
+                    msg = conn.recv()
+                except EOFError:
+                    raise yt_dlp.utils.DownloadError(f"download process exited with code {proc.exitcode}")
+                kind = msg[0]
+                if kind == "progress":
+                    try:
+                        progress_hook(msg[1])    # may sleep for the bandwidth limit
+                    finally:
+                        conn.send(True)
+                elif kind == "pp":
+                    postprocessor_hook({"info_dict": {"filepath": msg[1]}})
+                elif kind == "checkpoint":
+                    task.checkpoint = {"info": msg[1], "parts": {}}
+                elif kind == "log":
+                    (ydl_logger.warning if msg[1] == logging.WARNING else ydl_logger.error)(msg[2])
+                elif kind == "done":
+                    finished = True
+                    if msg[2] is not None:
+                        raise yt_dlp.utils.DownloadError(msg[2])
+                    if jobs is not None:
+                        jobs.extend(msg[3])
+                    return msg[1]
+        finally:
+            if not finished:
+                proc.terminate()
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.kill()
+            conn.close()
+            task.process = None
+
+    def _sync_followers(self, task: DownloadTask):
+        for f in list(task.followers):
+            f.status = task.status
+            f.progress, f.speed, f.eta, f.title = task.progress, task.speed, task.eta, task.title
+            f.speed_bps, f.eta_seconds = task.speed_bps, task.eta_seconds
+            self.gui_callback("update_task", f)
+
+    def _finish_followers(self, task: DownloadTask, info):
+        """Hand the leader's outcome to its followers, or promote one if it was canceled."""
+        followers = [f for f in INFLIGHT.release(task) if f.status != TASK_CANCELED]
+        if not followers:
+            return
+        if task.status == TASK_CANCELED:
+            heir = followers.pop(0)
+            heir.status = TASK_QUEUED
+            for f in followers:
+                f.dedup_key = heir.dedup_key
+            INFLIGHT.attach(heir)
+            for f in followers:
+                INFLIGHT.attach(f)
+            self.task_queue.put(heir)
+            self.gui_callback("update_task", heir)
+            return
+        for f in followers:
+            f.title, f.progress, f.error = task.title, task.progress, task.error
+            f.speed, f.eta = "-", "-"
+            f.speed_bps, f.eta_seconds = 0, None
+            f.status = task.status
+            if task.status == TASK_DONE:
+                try:
+                    f.filename = share_download(task, f, info)
+                except OSError as e:
+                    f.status, f.error = TASK_FAILED, str(e)
+                    logger.warning("Could not link %s for #%s: %s", task.filename, f.id, e)
+            if f.status in (TASK_DONE, TASK_SKIPPED):
+                self._record_subscription_entry(f)
+            self.gui_callback("update_task", f)
+
+class PostProcessPool:
+    """
+    Second stage of the download pipeline. Download workers hand over the
+    ffmpeg work yt-dlp queued (merging, fixups, audio extraction, subtitle
+    embedding) and go back to the network, so CPU and downloads overlap.
+
+    Jobs run highest task priority first, then in arrival order, on
+    ``size`` threads that lower their own CPU priority to ``nice``.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.nice = POSTPROCESS_NICE
+        self.running = 0
+        self._heap = []
+        self._seq = 0
+        self._threads = []
+        self._cond = threading.Condition()
+
+    def configure(self, settings: dict):
+        with self._cond:
+            self.size = max(1, int(settings.get("postprocess_workers", 1)))
+            self.nice = max(0, int(settings.get("postprocess_nice", POSTPROCESS_NICE)))
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for _ in range(self.size - len(self._threads)):
+                thread = threading.Thread(target=self._run, daemon=True,
+                                          name=f"PostProcess-{len(self._threads) + 1}")
+                thread.start()
+                self._threads.append(thread)
+            self._cond.notify_all()
+
+    def submit(self, task, job):
+        with self._cond:
+            heapq.heappush(self._heap, (-task.priority, self._seq, job))
+            self._seq += 1
+            self._cond.notify()
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def _run(self):
+        me = threading.current_thread()
+        applied = None
+        while True:
+            with self._cond:
+                while True:
+                    if self._threads.index(me) >= self.size:
+                        self._threads.remove(me)    # shrunk: retire once idle
+                        return
+                    if self._heap:
+                        break
+                    self._cond.wait()
+                _, _, job = heapq.heappop(self._heap)
+                nice = self.nice
+                self.running += 1
+            if nice != applied:
+                lower_thread_priority(nice)
+                applied = nice
+            try:
+                job()
+            except Exception:
+                logger.exception("Post-processing job failed")
+            finally:
+                with self._cond:
+                    self.running -= 1
+
+POSTPROCESS = PostProcessPool()
+
+class WorkerPool:
+    """
+    Download threads that can be resized while tasks are running.
+
+    ``resize`` sets the scheduler's global limit first, so the number of
+    tasks handed out never exceeds the target, then starts threads or
+    asks surplus ones to retire. Idle threads are retired before busy
+    ones; a busy one finishes its task and then exits.
+    """
+
+    def __init__(self, task_queue: TaskScheduler, gui_callback, settings_provider):
+        self.task_queue = task_queue
+        self.gui_callback = gui_callback
+        self.settings_provider = settings_provider
+        self.target = 0
+        self._workers = []
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self):
+        """Live threads, including retiring ones still finishing a task."""
+        with self._lock:
+            self._workers = [w for w in self._workers if w.is_alive()]
+            return list(self._workers)
+
+    def resize(self, target: int):
+        with self._lock:
+            self.target = max(0, int(target))
+            self.task_queue.set_global_limit(self.target)
+            self._workers = [w for w in self._workers if w.is_alive()]
+            active = [w for w in self._workers if not w.retiring]
+            for _ in range(self.target - len(active)):
+                worker = DownloadWorker(self.task_queue, self.gui_callback, self.settings_provider)
+                worker.start()
+                self._workers.append(worker)
+            surplus = len(active) - self.target
+            if surplus > 0:
+                active.sort(key=lambda w: w.current_task is not None)    # idle ones first
+                for worker in active[:surplus]:
+                    worker.stop()
+        logger.info("Worker pool resized to %s", self.target)
+
+    def stop_all(self):
+        self.resize(0)
+
+VIEW_SORT_KEYS = {
+    "id": lambda t: t.id,
+    "title": lambda t: t.title.lower(),
+    "url": lambda t: t.url,
+    "status": lambda t: t.status,
+    "progress": lambda t: t.progress,
+    "speed": lambda t: t.speed_bps,
+    "eta": lambda t: math.inf if t.eta_seconds is None else t.eta_seconds,
+}
+VIEW_VOLATILE_SORTS = ("progress", "speed", "eta")  # change for many rows in every render tick
 
 class App:
     def __init__(self):
         self.settings = Persistence.load_settings()
-        self.task_queue = queue.Queue()
+        install_io_tracking()
+        BANDWIDTH.configure(self.settings)
+        POSTPROCESS.configure(self.settings)
+        self.task_queue = TaskScheduler(self.settings.get("scheduler_policy", "fifo"),
+                                        self.settings.get("scheduler_aging", 1.0),
+                                        self.settings.get("per_site_limit", 2),
+                                        self.settings.get("site_limits", {}))
+        self.task_queue.set_breaker(self.settings.get("breaker_threshold", 3),
+                                    self.settings.get("breaker_cooldown", 120))
         self.tasks = {}
-        self.workers = []
+        self.pool = WorkerPool(self.task_queue, self.gui_callback, self.get_settings)
         self.clipboard_cache = ""
-        self._thumb_cache = {}     
+        self._thumb_cache = OrderedDict()   # task id -> PhotoImage, only rows near the window
+        self._cleanup_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Cleanup")
+        self._hist_index = None
+        self._prefilter_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Prefilter")
+        self._prefilter_pool.submit(lambda: DOWNLOAD_ARCHIVE.load(Persistence.read_history()))
+        self._expand_pool = ThreadPoolExecutor(max_workers=PLAYLIST_EXPAND_WORKERS, thread_name_prefix="Playlist")
+        self._hist_index_lock = threading.Lock()
+        self.thumbs = ThumbnailService(self._thumb_folder()) if PIL_AVAILABLE else None
+        self._dirty = set()        # task ids whose row needs a repaint
+        self._dirty_lock = threading.Lock()
+        self._new_children = []    # (playlist task, entries) waiting to become rows
+        self.render_stats = {"requested": 0, "merged": 0, "painted": 0}
 
         if DND_AVAILABLE and TkinterDnD is not None:
             self.root = TkinterDnD.Tk()
@@ -384,6 +3521,16 @@ class App:
         if self.settings.get("clipboard_autofill", True):
             self.root.after(800, self.clipboard_watcher)
 
+        self._thumb_placeholder = tk.PhotoImage(width=THUMB_SIZE[0], height=THUMB_SIZE[1])
+        self._thumb_placeholder.put("#808080", to=(0, 0, THUMB_SIZE[0], THUMB_SIZE[1]))
+        if self.thumbs is not None:
+            self.root.after(150, self._drain_thumbnails)
+        self.root.after(self._render_interval(), self._render_dirty)
+        self.root.after(5000, self._compact_history)
+        self.root.after(ADAPTIVE_INTERVAL * 1000, self._adapt_concurrency)
+        # warm the history search index in the background
+        self._hist_index_future = self._cleanup_pool.submit(self._history_index)
+
         self.update_folder_label()
 
     def save_settings(self):
@@ -395,83 +3542,79 @@ class App:
         os.makedirs(f, exist_ok=True)
         return f
 
-    def _fetch_thumbnail(self, url):
-        if not PIL_AVAILABLE:
-            return None
-        try:
-            with YoutubeDL({"quiet": True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-            thumb_url = info.get("thumbnail")
-            if not thumb_url:
-                return None
-
-            fname = hashlib.md5(url.encode()).hexdigest() + ".jpg"
-            path = os.path.join(self._thumb_folder(), fname)
-
-            if os.path.isfile(path):
-                return path
-
-            resp = requests.get(thumb_url, timeout=8, headers={"User-Agent": "Mozilla/5.0"})
-            resp.raise_for_status()
-            img = Image.open(BytesIO(resp.content)).convert("RGB").resize((90, 50), Image.LANCZOS)
-            img.save(path, "JPEG", quality=90)
-            return path
-        except Exception as e:
-            logger.debug("Thumbnail fetch failed: %s", e)
-            return None
+    def _drain_thumbnails(self):
+        """Attach finished thumbnails in one batch per tick."""
+        for _ in range(64):
+            try:
+                task_id, path = self.thumbs.results.get_nowait()
+            except queue.Empty:
+                break
+            task = self.tasks.get(task_id)
+            if task is None or not path:
+                continue
+            task.thumb_path = path
+            try:
+                self._set_thumb(task_id, path)
+            except Exception as e:
+                logger.debug("Thumbnail attach failed: %s", e)
+        self.root.after(150, self._drain_thumbnails)
 
     def _set_thumb(self, task_id, path):
-        """Insert image into tree cell."""
-        if not os.path.isfile(path):
+        """Insert image into tree cell (only if the row is materialized)."""
+        if not os.path.isfile(path) or not self.tree.exists(str(task_id)):
             return
-        if str(task_id) not in self._thumb_cache:
-            self._thumb_cache[str(task_id)] = ImageTk.PhotoImage(file=path)
-        self.tree.set(str(task_id), "thumb", "")
-        self.tree.item(str(task_id), image=self._thumb_cache[str(task_id)])
+        self._thumb_cache.pop(str(task_id), None)
+        self.tree.item(str(task_id), image=self._row_image(self.tasks[task_id]))
+
+    def _row_image(self, task: DownloadTask):
+        """PhotoImage for a visible row; asks the thumbnail service on first sight."""
+        iid = str(task.id)
+        img = self._thumb_cache.get(iid)
+        if img is not None:
+            self._thumb_cache.move_to_end(iid)
+            return img
+        if PIL_AVAILABLE and task.thumb_path and os.path.isfile(task.thumb_path):
+            img = self._thumb_cache[iid] = ImageTk.PhotoImage(file=task.thumb_path)
+            return img
+        if self.thumbs is not None and not task.thumb_requested:
+            task.thumb_requested = True
+            self.thumbs.request(task.id, task.url)
+        return self._thumb_placeholder
+
+    def _trim_thumb_cache(self, visible):
+        limit = max(THUMB_MEMORY_ROWS, len(visible) * 3)
+        for iid in list(self._thumb_cache):
+            if len(self._thumb_cache) <= limit:
+                break
+            if iid not in visible:
+                del self._thumb_cache[iid]
 
     def cancel_all(self):
-        """Cancel every task and delete its partial file."""
+        """Cancel every queued, running or paused task and delete its partial files."""
         killed = 0
+        idle = []
 
         for task in self.tasks.values():
-            if task.status in (TASK_RUNNING, TASK_PAUSED, TASK_QUEUED, TASK_FAILED):
-                task.cancel_flag.set()
+            if task.status in (TASK_RUNNING, TASK_PROCESSING, TASK_PAUSED, TASK_QUEUED):
+                # running tasks are cleaned up by their worker once it stops
+                if task.status not in (TASK_RUNNING, TASK_PROCESSING):
+                    idle.append(task)
+                    task.checkpoint = None
+                task.interrupt(USER_CANCEL_SIGNAL, TASK_CANCELED)
                 killed += 1
+                self._update_task_row(task)
 
-        for w in self.workers:
-            task = w.current_task
-            if task and task.status == TASK_RUNNING and hasattr(task, "_proc"):
-                try:
-                    task._proc.kill()
-                    task._proc.wait(timeout=2)
-                except Exception:
-                    pass
-
-        settings = self.get_settings()
-        outtmpl = os.path.join(
-            settings["download_folder"],
-            settings["filename_template"]
-        )
-        for task in list(self.tasks.values()):
-            try:
-                from yt_dlp import YoutubeDL
-                ydl = YoutubeDL({"outtmpl": outtmpl, "quiet": True})
-                info = ydl.extract_info(task.url, download=False)
-                real_path = ydl.prepare_filename(info)
-                if task.audio_only or settings.get("audio_only"):
-                    base, _ = os.path.splitext(real_path)
-                    real_path = base + "." + settings.get("audio_format", "mp3")
-                if os.path.isfile(real_path):
-                    os.remove(real_path)
-                    logger.info("Deleted: %s", real_path)
-            except Exception as e:
-                logger.warning("Could not delete file for task %s: %s", task.id, e)
-
-            task.status = TASK_CANCELED
-            self._update_task_row(task)
+        # one batch of local deletes, off the Tk thread
+        if idle:
+            self._cleanup_pool.submit(remove_partial_files, idle)
 
         self.status(f"Cancelled {killed} task(s) and deleted partial files.")
 
+    def _compact_history(self):
+        """Periodically fold history segments together on the cleanup thread."""
+        self._cleanup_pool.submit(HISTORY.maybe_compact)
+        self.root.after(HISTORY_COMPACT_INTERVAL * 1000, self._compact_history)
+
     def status(self, text):
         self.status_var.set(str(text))
         
@@ -490,8 +3633,7 @@ class App:
         task = self.tasks[task_id]
 
         if task.status == TASK_RUNNING:
-            task.pause_flag.set()
-            task.status = TASK_PAUSED
+            task.interrupt(USER_PAUSE_SIGNAL, TASK_PAUSED)
             self.status(f"Paused #{task_id}")
         elif task.status == TASK_PAUSED:
             task.pause_flag.clear()
@@ -504,10 +3646,10 @@ class App:
 
     def init_workers(self):
         num_workers = self.settings.get("concurrent_downloads", 1)
-        for i in range(num_workers):
-            worker = DownloadWorker(self.task_queue, self.gui_callback, self.get_settings)
-            worker.start()
-            self.workers.append(worker)
+        if self.settings.get("adaptive_concurrency", False):
+            CONCURRENCY.reset(num_workers)
+            num_workers = CONCURRENCY.slots
+        self.pool.resize(num_workers)
 
     def build_menu(self):
         menubar = tk.Menu(self.root)
@@ -522,6 +3664,11 @@ class App:
         toolsm.add_command(label="Check for Update", command=self.check_update)
         toolsm.add_command(label="View History", command=self.show_history)
         toolsm.add_command(label="Open Log File", command=lambda: self.open_path(LOG_FILE))
+        toolsm.add_command(label="Performance Stats", command=self.show_stats)
+        toolsm.add_separator()
+        toolsm.add_command(label="Subscribe to URL in Entry", command=self.subscribe_entry_url)
+        toolsm.add_command(label="Sync Subscriptions", command=self.sync_all_subscriptions)
+        toolsm.add_command(label="Manage Subscriptions…", command=self.show_subscriptions)
         menubar.add_cascade(label="Tools", menu=toolsm)
 
         settingsm = tk.Menu(menubar, tearoff=0)
@@ -531,6 +3678,9 @@ class App:
         self.var_audio_global = tk.BooleanVar(value=self.settings.get("audio_only", False))
         self.var_clipboard = tk.BooleanVar(value=self.settings.get("clipboard_autofill", True))
         self.var_enable_playlist = tk.BooleanVar(value=self.settings.get("enable_playlist", False))
+        self.var_skip_downloaded = tk.BooleanVar(value=self.settings.get("skip_downloaded", True))
+        self.var_adaptive = tk.BooleanVar(value=self.settings.get("adaptive_concurrency", False))
+        self.var_process_mode = tk.BooleanVar(value=self.settings.get("process_mode", False))
 
         settingsm.add_checkbutton(label="Dark Mode", command=self.toggle_theme, variable=self.var_dark)
         settingsm.add_checkbutton(label="Enable Subtitles", command=self.toggle_subtitles, variable=self.var_enable_subs)
@@ -538,12 +3688,22 @@ class App:
         settingsm.add_checkbutton(label="Audio Only (global)", command=self.toggle_audio_only, variable=self.var_audio_global)
         settingsm.add_checkbutton(label="Clipboard Autofill", command=self.toggle_clipboard_autofill, variable=self.var_clipboard)
         settingsm.add_checkbutton(label="Enable Playlist Download", command=self.toggle_playlist, variable=self.var_enable_playlist)
+        settingsm.add_checkbutton(label="Skip Already Downloaded", command=self.toggle_skip_downloaded, variable=self.var_skip_downloaded)
+        settingsm.add_checkbutton(label="Auto Concurrency", command=self.toggle_adaptive_concurrency, variable=self.var_adaptive)
+        settingsm.add_checkbutton(label="Download in Separate Processes", command=self.toggle_process_mode, variable=self.var_process_mode)
         settingsm.add_separator()
         settingsm.add_command(label="Subtitle Languages…", command=self.edit_subtitle_langs)
         settingsm.add_command(label="Filename Template…", command=self.edit_filename_template)
         settingsm.add_command(label="Audio Format…", command=self.edit_audio_format)
         settingsm.add_command(label="Download Speed Limit…", command=self.edit_speed_limit)
         settingsm.add_command(label="Concurrent Downloads…", command=self.edit_concurrent_downloads)
+        settingsm.add_command(label="UI Refresh Rate…", command=self.edit_refresh_rate)
+        settingsm.add_command(label="Queue Order…", command=self.edit_scheduler)
+        settingsm.add_command(label="Per-Site Limits…", command=self.edit_site_limits)
+        settingsm.add_command(label="Multi-Connection Downloads…", command=self.edit_segmented)
+        settingsm.add_command(label="HLS/DASH Fragments…", command=self.edit_fragments)
+        settingsm.add_command(label="Post-Processing…", command=self.edit_postprocessing)
+        settingsm.add_command(label="Retries…", command=self.edit_retries)
         menubar.add_cascade(label="Settings", menu=settingsm)
 
         helpm = tk.Menu(menubar, tearoff=0)
@@ -575,6 +3735,31 @@ class App:
 
 
     def build_task_list(self):
+        # The tree only holds the rows currently on screen; the full list lives
+        # in self.tasks and self._view_ids (filtered + sorted task ids).
+        self._view_ids = []
+        self._view_top = 0
+        self._view_rows = 8
+        self._view_refresh_pending = False
+        self._view_rebuild_pending = False
+        self._sort_col = None
+        self._sort_reverse = False
+        self._selected_id = None
+
+        filters = ttk.Frame(self.root)
+        filters.pack(fill="x", padx=10, pady=(0, 2))
+        ttk.Label(filters, text="Show:").pack(side="left")
+        self.filter_status_var = tk.StringVar(value="All")
+        ttk.Combobox(filters, textvariable=self.filter_status_var, values=("All",) + TASK_STATUSES,
+                     state="readonly", width=12).pack(side="left", padx=(6, 0))
+        ttk.Label(filters, text="Host:").pack(side="left", padx=(12, 0))
+        self.filter_host_var = tk.StringVar()
+        ttk.Entry(filters, textvariable=self.filter_host_var, width=24).pack(side="left", padx=(6, 0))
+        self.view_count_label = ttk.Label(filters, text="")
+        self.view_count_label.pack(side="right")
+        self.filter_status_var.trace_add("write", self._on_filter_change)
+        self.filter_host_var.trace_add("write", self._on_filter_change)
+
         container = ttk.Frame(self.root)
         container.pack(fill="both", expand=True, padx=10, pady=6)
 
@@ -588,12 +3773,11 @@ class App:
         )
 
         style = ttk.Style(self.root)
-        style.configure("Treeview", rowheight=60) 
+        style.configure("Treeview", rowheight=ROW_HEIGHT) 
         self.tree["displaycolumns"] = ("id", "title", "url", "status","progress", "speed", "eta", "actions")
         self.tree.column("#0", width=120, stretch=False)
         self.tree.heading("#0", text="")
-        vsb = ttk.Scrollbar(container, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vsb.set)
+        vsb = self.vsb = ttk.Scrollbar(container, orient="vertical", command=self._on_view_scroll)
 
         self.tree.heading("id", text="ID")
         self.tree.column("id", width=40, stretch=False)
@@ -608,7 +3792,7 @@ class App:
         self.tree.column("status", width=90, stretch=False)
 
         self.tree.heading("progress", text="Progress")
-        self.tree.column("progress", width=100, stretch=False)
+        self.tree.column("progress", width=150, stretch=False)
 
         self.tree.heading("speed", text="Speed")
         self.tree.column("speed", width=90, stretch=False)
@@ -619,39 +3803,165 @@ class App:
         self.tree.heading("actions", text="Actions")
         self.tree.column("actions", width=120, stretch=False)
 
+        for col in VIEW_SORT_KEYS:
+            self.tree.heading(col, command=lambda c=col: self._sort_view(c))
+
         self.tree.pack(side="left", fill="both", expand=True)
         vsb.pack(side="right", fill="y")
         self.tree.bind("<Double-1>", self._on_tree_dclick)
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", self._on_view_configure)
+        self.tree.bind("<MouseWheel>", self._on_view_wheel)
+        self.tree.bind("<Button-4>", self._on_view_wheel)
+        self.tree.bind("<Button-5>", self._on_view_wheel)
+
+    def _row_values(self, task: DownloadTask):
+        return (task.id, task.title, task.url,
+                task.status, f"{task.progress:.1f}%" + (
+                    f" {task.fragments}" if task.fragments and task.status == TASK_RUNNING else ""),
+                task.speed, task.eta, f"priority {task.priority:+d}" if task.priority else "")
+
+    def _task_visible_in_view(self, task: DownloadTask):
+        status = self.filter_status_var.get()
+        host = self.filter_host_var.get().strip().lower()
+        return (status == "All" or task.status == status) and (not host or host in task.host)
+
+    def _view_depends_on_state(self):
+        """True when a status change can move a task in or out of the view, or reorder it."""
+        return self.filter_status_var.get() != "All" or self._sort_col in ("status", "progress", "speed", "eta")
+
+    def _rebuild_view(self):
+        self._view_rebuild_pending = False
+        ids = [tid for tid, t in self.tasks.items() if self._task_visible_in_view(t)]
+        if self._sort_col:
+            key = VIEW_SORT_KEYS[self._sort_col]
+            ids.sort(key=lambda tid: key(self.tasks[tid]), reverse=self._sort_reverse)
+        self._view_ids = ids
+        self._refresh_view()
+
+    def _reslot_in_view(self, task: DownloadTask):
+        """
+        Move one changed task to where it now belongs in the filtered and
+        sorted view (or out of it) with a binary search, instead of
+        filtering and sorting every task again. The search trusts every
+        other row to be in place, so this is only used while the sort key
+        of the other rows cannot have changed too (see ``_update_task_row``).
+        """
+        if self._view_rebuild_pending:
+            return      # the rebuild places it anyway
+        ids = self._view_ids
+        with contextlib.suppress(ValueError):
+            ids.remove(task.id)
+        if self._task_visible_in_view(task):
+            if self._sort_col:
+                key = VIEW_SORT_KEYS[self._sort_col]
+                k = key(task)
+                lo, hi = 0, len(ids)
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    other = key(self.tasks[ids[mid]])
+                    if (other > k) if self._sort_reverse else (other <= k):
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                ids.insert(lo, task.id)
+            else:
+                bisect.insort(ids, task.id)
+        self._schedule_view_refresh()
+
+    def _schedule_view_rebuild(self):
+        if not self._view_rebuild_pending:
+            self._view_rebuild_pending = True
+            self.root.after_idle(self._rebuild_view)
+
+    def _schedule_view_refresh(self):
+        if not self._view_refresh_pending:
+            self._view_refresh_pending = True
+            self.root.after_idle(self._refresh_view)
+
+    def _refresh_view(self):
+        """Materialize exactly the rows inside the scroll window."""
+        self._view_refresh_pending = False
+        total = len(self._view_ids)
+        rows = self._view_rows
+        self._view_top = max(0, min(self._view_top, total - rows))
+        visible = self._view_ids[self._view_top:self._view_top + rows]
+        wanted = {str(tid) for tid in visible}
+
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+        for index, tid in enumerate(visible):
+            task = self.tasks[tid]
+            iid = str(tid)
+            if self.tree.exists(iid):
+                self.tree.move(iid, "", index)
+                self.tree.item(iid, values=self._row_values(task))
+            else:
+                self.tree.insert("", index, iid=iid, image=self._row_image(task),
+                                 values=self._row_values(task))
+        self._trim_thumb_cache(wanted)
+
+        if self._selected_id is not None and str(self._selected_id) in wanted:
+            self.tree.selection_set(str(self._selected_id))
+        if total:
+            self.vsb.set(self._view_top / total, min(1.0, (self._view_top + rows) / total))
+        else:
+            self.vsb.set(0.0, 1.0)
+        self.view_count_label.config(text=f"{total} of {len(self.tasks)} tasks")
 
+    def _on_filter_change(self, *_):
+        self._view_top = 0
+        self._rebuild_view()
 
+    def _sort_view(self, col):
+        if self._sort_col == col:
+            self._sort_reverse = not self._sort_reverse
+        else:
+            self._sort_col, self._sort_reverse = col, False
+        self._rebuild_view()
 
-    def _add_row_for_task(self, task: DownloadTask):
-
-        self.tree.insert(
-            "", "end", iid=str(task.id),
-            values=(task.id, task.title, task.url,
-                    task.status, f"{task.progress:.1f}%",
-                    task.speed, task.eta, "")
-        )
-
-        task.thumb_path = self._fetch_thumbnail(task.url)
+    def _on_view_scroll(self, *args):
+        total = len(self._view_ids)
+        if args[0] == "moveto":
+            top = int(float(args[1]) * total)
+        else:
+            step = int(args[1])
+            top = self._view_top + (step * self._view_rows if args[2] == "pages" else step)
+        self._view_top = max(0, min(top, total - self._view_rows))
+        self._refresh_view()
+
+    def _on_view_wheel(self, event):
+        up = event.num == 4 or event.delta > 0
+        self._on_view_scroll("scroll", -3 if up else 3, "units")
+        return "break"
+
+    def _on_view_configure(self, event):
+        rows = max(1, (event.height - VIEW_HEADER_HEIGHT) // ROW_HEIGHT)
+        if rows != self._view_rows:
+            self._view_rows = rows
+            self._schedule_view_refresh()
+
+    def _on_tree_select(self, event):
+        sel = self.tree.selection()
+        if sel:
+            self._selected_id = int(sel[0])
 
-        if task.thumb_path and os.path.isfile(task.thumb_path):
-            try:
-                img = ImageTk.PhotoImage(file=task.thumb_path)
-                self._thumb_cache[str(task.id)] = img  
-                self.tree.item(str(task.id), image=img)
-            except Exception as e:
-                logger.debug("Thumbnail attach failed: %s", e)
+    def _add_row_for_task(self, task: DownloadTask):
+        if self._sort_col is None and self._task_visible_in_view(task):
+            self._view_ids.append(task.id)
+            self._schedule_view_refresh()
+        else:
+            self._schedule_view_rebuild()
 
     def _update_task_row(self, task: DownloadTask):
-        if str(task.id) in self.tree.get_children():
-            self.tree.item(
-                str(task.id),
-                values=(task.id, task.title, task.url,
-                        task.status, f"{task.progress:.1f}%",
-                        task.speed, task.eta, "")
-            )
+        if self._sort_col in VIEW_VOLATILE_SORTS:
+            # other rows' keys moved in the same tick; sort them all once when it ends
+            self._schedule_view_rebuild()
+        elif self._view_depends_on_state():
+            self._reslot_in_view(task)
+        if self.tree.exists(str(task.id)):
+            self.tree.item(str(task.id), values=self._row_values(task))
 
 
  
@@ -664,7 +3974,7 @@ class App:
         task = self.tasks[task_id]
 
         if task.status == TASK_RUNNING:
-            task.pause_flag.set()
+            task.interrupt(USER_PAUSE_SIGNAL)
             self.status(f"Pausing #{task_id}")
         elif task.status == TASK_PAUSED:
             task.pause_flag.clear()
@@ -687,10 +3997,17 @@ class App:
         ttk.Button(bottom, text="Pause All", command=self.pause_all).grid(row=0, column=4, padx=(10, 0))
         ttk.Button(bottom, text="Resume All", command=self.resume_all).grid(row=0, column=5, padx=(10, 0))
         ttk.Button(bottom, text="Pause / Resume Selected", command=self.toggle_selected).grid(row=0, column=6, padx=(10, 0))
+        ttk.Button(bottom, text="Download Again", command=self.redownload_selected).grid(row=0, column=8, padx=(10, 0))
+        ttk.Button(bottom, text="Move Up", command=lambda: self.move_selected(1)).grid(row=1, column=1, padx=(10, 0), pady=(6, 0))
+        ttk.Button(bottom, text="Move Down", command=lambda: self.move_selected(-1)).grid(row=1, column=2, padx=(10, 0), pady=(6, 0))
+        ttk.Button(bottom, text="Retry Failed", command=self.retry_failed).grid(row=1, column=3, padx=(10, 0), pady=(6, 0))
+        ttk.Button(bottom, text="Multi-Connection On/Off", command=self.toggle_segmented_selected).grid(row=1, column=4, padx=(10, 0), pady=(6, 0))
 
         self.status_var = tk.StringVar(value="Ready.")
         self.status_label = ttk.Label(self.root, textvariable=self.status_var)
         self.status_label.pack(anchor="w", padx=12, pady=(0, 10))
+        self.slots_var = tk.StringVar(value="")
+        ttk.Label(self.root, textvariable=self.slots_var).pack(anchor="w", padx=12, pady=(0, 10))
 
     def apply_theme(self, dark: bool):
         self.settings["dark_mode"] = bool(dark)
@@ -759,6 +4076,22 @@ class App:
         self.var_enable_playlist.set(self.settings["enable_playlist"])
         self.save_settings()
 
+    def toggle_skip_downloaded(self):
+        self.settings["skip_downloaded"] = not self.settings.get("skip_downloaded", True)
+        self.var_skip_downloaded.set(self.settings["skip_downloaded"])
+        self.save_settings()
+
+    def toggle_adaptive_concurrency(self):
+        self.settings["adaptive_concurrency"] = not self.settings.get("adaptive_concurrency", False)
+        self.var_adaptive.set(self.settings["adaptive_concurrency"])
+        self.save_settings()
+        self.init_workers()
+
+    def toggle_process_mode(self):
+        self.settings["process_mode"] = not self.settings.get("process_mode", False)
+        self.var_process_mode.set(self.settings["process_mode"])
+        self.save_settings()
+
     def edit_subtitle_langs(self):
         win = tk.Toplevel(self.root)
         win.title("Subtitle Languages")
@@ -800,12 +4133,21 @@ class App:
     def edit_speed_limit(self):
         win = tk.Toplevel(self.root)
         win.title("Download Speed Limit")
-        ttk.Label(win, text="Max KB/s (0 = unlimited)").pack(padx=10, pady=10)
+        ttk.Label(win, text="Max KB/s for all downloads together (0 = unlimited)").pack(padx=10, pady=10)
         speed = tk.IntVar(value=self.settings.get("max_download_speed", 0))
         tk.Entry(win, textvariable=speed, width=20).pack(padx=10, pady=(0, 10))
+        ttk.Label(win, text="Max share for a single download, % (0 = no cap)").pack(padx=10)
+        share = tk.IntVar(value=self.settings.get("per_task_share", 0))
+        ttk.Spinbox(win, textvariable=share, from_=0, to=100, width=5).pack(padx=10, pady=(0, 10))
+        ttk.Label(win, text="Schedule, e.g. 01:00-07:00=0, 09:00-17:00=2048 (KB/s, 0 = unlimited)").pack(padx=10)
+        schedule = tk.StringVar(value=format_bandwidth_schedule(self.settings.get("bandwidth_schedule", [])))
+        tk.Entry(win, textvariable=schedule, width=50).pack(padx=10, pady=(0, 10))
         def save():
             self.settings["max_download_speed"] = max(0, speed.get())
+            self.settings["per_task_share"] = max(0, min(100, share.get()))
+            self.settings["bandwidth_schedule"] = parse_bandwidth_schedule(schedule.get())
             Persistence.save_settings(self.settings)
+            BANDWIDTH.configure(self.settings)    # running downloads pick this up immediately
             win.destroy()
         ttk.Button(win, text="Save", command=save).pack(pady=10)
 
@@ -819,10 +4161,140 @@ class App:
             new_count = max(1, min(5, concurrent.get()))
             self.settings["concurrent_downloads"] = new_count
             Persistence.save_settings(self.settings)
-            for w in self.workers:
-                w.stop()
-            self.workers = []
-            self.init_workers()
+            self.pool.resize(new_count)    # surplus workers finish their task, then exit
+            win.destroy()
+        ttk.Button(win, text="Save", command=save).pack(pady=10)
+
+    def edit_refresh_rate(self):
+        win = tk.Toplevel(self.root)
+        win.title("UI Refresh Rate")
+        ttk.Label(win, text="Task list repaints per second (1-30)").pack(padx=10, pady=10)
+        rate = tk.IntVar(value=self.settings.get("ui_refresh_rate", 5))
+        ttk.Spinbox(win, textvariable=rate, from_=1, to=30, width=5).pack(padx=10, pady=(0, 10))
+        def save():
+            self.settings["ui_refresh_rate"] = max(1, min(30, rate.get()))
+            Persistence.save_settings(self.settings)
+            win.destroy()
+        ttk.Button(win, text="Save", command=save).pack(pady=10)
+
+    def edit_scheduler(self):
+        win = tk.Toplevel(self.root)
+        win.title("Queue Order")
+        ttk.Label(win, text="fifo = arrival order, priority = Move Up/Down with aging,\n"
+                            "sjf = smallest files first (uses file sizes from metadata)").pack(padx=10, pady=10)
+        policy = tk.StringVar(value=self.settings.get("scheduler_policy", "fifo"))
+        ttk.Combobox(win, textvariable=policy, values=SCHEDULER_POLICIES, state="readonly", width=10).pack(padx=10)
+        ttk.Label(win, text="Aging (seconds of cost forgiven per second waited)").pack(padx=10, pady=(10, 0))
+        aging = tk.DoubleVar(value=self.settings.get("scheduler_aging", 1.0))
+        tk.Entry(win, textvariable=aging, width=10).pack(padx=10, pady=(0, 10))
+        def save():
+            self.settings["scheduler_policy"] = policy.get()
+            self.settings["scheduler_aging"] = max(0.0, aging.get())
+            Persistence.save_settings(self.settings)
+            self.task_queue.set_policy(self.settings["scheduler_policy"], self.settings["scheduler_aging"])
+            win.destroy()
+        ttk.Button(win, text="Save", command=save).pack(pady=10)
+
+    def edit_segmented(self):
+        win = tk.Toplevel(self.root)
+        win.title("Multi-Connection Downloads")
+        ttk.Label(win, text="Connections per file (2-16)").pack(padx=10, pady=10)
+        conns = tk.IntVar(value=self.settings.get("segment_connections", 4))
+        ttk.Spinbox(win, textvariable=conns, from_=2, to=16, width=5).pack(padx=10, pady=(0, 10))
+        ttk.Label(win, text="Sites that use it by default, e.g. example.com, archive.org (* = all)").pack(padx=10)
+        hosts = tk.StringVar(value=", ".join(self.settings.get("segmented_hosts", [])))
+        tk.Entry(win, textvariable=hosts, width=40).pack(padx=10, pady=(0, 10))
+        def save():
+            self.settings["segment_connections"] = max(2, min(16, conns.get()))
+            self.settings["segmented_hosts"] = [h.strip().lower() for h in hosts.get().split(",") if h.strip()]
+            Persistence.save_settings(self.settings)
+            win.destroy()
+        ttk.Button(win, text="Save", command=save).pack(pady=10)
+
+    def edit_fragments(self):
+        win = tk.Toplevel(self.root)
+        win.title("HLS/DASH Fragments")
+        ttk.Label(win, text=f"Fragments fetched at once (0 = adaptive, up to {FRAGMENT_MAX_WORKERS})").pack(padx=10, pady=10)
+        conc = tk.IntVar(value=self.settings.get("fragment_concurrency", 0))
+        ttk.Spinbox(win, textvariable=conc, from_=0, to=FRAGMENT_MAX_WORKERS, width=5).pack(padx=10, pady=(0, 10))
+        ttk.Label(win, text="Overrides, e.g. vimeo.com=8, example.com=2").pack(padx=10)
+        overrides = tk.StringVar(value=", ".join(
+            f"{k}={v}" for k, v in self.settings.get("fragment_hosts", {}).items()))
+        tk.Entry(win, textvariable=overrides, width=40).pack(padx=10, pady=(0, 10))
+        def save():
+            fragment_hosts = {}
+            for item in overrides.get().split(","):
+                name, sep, value = item.partition("=")
+                if sep and name.strip() and value.strip().isdigit():
+                    fragment_hosts[name.strip().lower()] = min(FRAGMENT_MAX_WORKERS, int(value))
+            self.settings["fragment_concurrency"] = max(0, min(FRAGMENT_MAX_WORKERS, conc.get()))
+            self.settings["fragment_hosts"] = fragment_hosts
+            Persistence.save_settings(self.settings)
+            win.destroy()
+        ttk.Button(win, text="Save", command=save).pack(pady=10)
+
+    def edit_postprocessing(self):
+        win = tk.Toplevel(self.root)
+        win.title("Post-Processing")
+        ttk.Label(win, text="ffmpeg jobs at once (merging, audio extraction, subtitles)").pack(padx=10, pady=10)
+        workers = tk.IntVar(value=self.settings.get("postprocess_workers", 1))
+        ttk.Spinbox(win, textvariable=workers, from_=1, to=8, width=5).pack(padx=10, pady=(0, 10))
+        ttk.Label(win, text="CPU niceness (0 = normal, 19 = lowest)").pack(padx=10)
+        nice = tk.IntVar(value=self.settings.get("postprocess_nice", POSTPROCESS_NICE))
+        ttk.Spinbox(win, textvariable=nice, from_=0, to=19, width=5).pack(padx=10, pady=(0, 10))
+        def save():
+            self.settings["postprocess_workers"] = max(1, min(8, workers.get()))
+            self.settings["postprocess_nice"] = max(0, min(19, nice.get()))
+            Persistence.save_settings(self.settings)
+            POSTPROCESS.configure(self.settings)
+            win.destroy()
+        ttk.Button(win, text="Save", command=save).pack(pady=10)
+
+    def edit_retries(self):
+        win = tk.Toplevel(self.root)
+        win.title("Retries")
+        ttk.Label(win, text="Automatic retries of a failed download (0 = off)").pack(padx=10, pady=10)
+        attempts = tk.IntVar(value=self.settings.get("retry_attempts", 3))
+        ttk.Spinbox(win, textvariable=attempts, from_=0, to=10, width=5).pack(padx=10, pady=(0, 10))
+        ttk.Label(win, text="Seconds before the first retry (doubled for each next one)").pack(padx=10)
+        delay = tk.IntVar(value=self.settings.get("retry_delay", 5))
+        ttk.Spinbox(win, textvariable=delay, from_=1, to=600, width=5).pack(padx=10, pady=(0, 10))
+        ttk.Label(win, text="Failures in a row that pause a site (0 = never)").pack(padx=10)
+        threshold = tk.IntVar(value=self.settings.get("breaker_threshold", 3))
+        ttk.Spinbox(win, textvariable=threshold, from_=0, to=20, width=5).pack(padx=10, pady=(0, 10))
+        ttk.Label(win, text="Seconds a paused site rests before trying again").pack(padx=10)
+        cooldown = tk.IntVar(value=self.settings.get("breaker_cooldown", 120))
+        ttk.Spinbox(win, textvariable=cooldown, from_=10, to=3600, width=5).pack(padx=10, pady=(0, 10))
+        def save():
+            self.settings["retry_attempts"] = max(0, min(10, attempts.get()))
+            self.settings["retry_delay"] = max(1, min(600, delay.get()))
+            self.settings["breaker_threshold"] = max(0, min(20, threshold.get()))
+            self.settings["breaker_cooldown"] = max(10, min(3600, cooldown.get()))
+            Persistence.save_settings(self.settings)
+            self.task_queue.set_breaker(self.settings["breaker_threshold"], self.settings["breaker_cooldown"])
+            win.destroy()
+        ttk.Button(win, text="Save", command=save).pack(pady=10)
+
+    def edit_site_limits(self):
+        win = tk.Toplevel(self.root)
+        win.title("Per-Site Limits")
+        ttk.Label(win, text="Simultaneous downloads per site (0 = no limit)").pack(padx=10, pady=10)
+        limit = tk.IntVar(value=self.settings.get("per_site_limit", 2))
+        ttk.Spinbox(win, textvariable=limit, from_=0, to=5, width=5).pack(padx=10, pady=(0, 10))
+        ttk.Label(win, text="Overrides, e.g. youtube=3, vimeo=1").pack(padx=10)
+        overrides = tk.StringVar(value=", ".join(
+            f"{k}={v}" for k, v in self.settings.get("site_limits", {}).items()))
+        tk.Entry(win, textvariable=overrides, width=40).pack(padx=10, pady=(0, 10))
+        def save():
+            site_limits = {}
+            for item in overrides.get().split(","):
+                name, sep, value = item.partition("=")
+                if sep and name.strip() and value.strip().isdigit():
+                    site_limits[name.strip().lower()] = int(value)
+            self.settings["per_site_limit"] = max(0, limit.get())
+            self.settings["site_limits"] = site_limits
+            Persistence.save_settings(self.settings)
+            self.task_queue.set_limits(self.settings["per_site_limit"], site_limits)
             win.destroy()
         ttk.Button(win, text="Save", command=save).pack(pady=10)
 
@@ -929,39 +4401,129 @@ class App:
             # Fail silently at startup (don’t annoy the user with errors)
             print("Update check failed:", e)        
 
+    def _history_index(self):
+        """Build the search index once; later appends are added by the store."""
+        with self._hist_index_lock:
+            while self._hist_index is None:
+                entries, seq = HISTORY.snapshot()
+                index = HistoryIndex()
+                for e in entries:
+                    index.add(e)
+                if HISTORY.subscribe(index.add, seq):
+                    self._hist_index = index
+            return self._hist_index
+
     def show_history(self):
-        hist = Persistence.read_history()
         win = tk.Toplevel(self.root)
         win.title("Download History")
         win.geometry("900x450")
 
         search_var = tk.StringVar()
+        count_var = tk.StringVar()
         search_frame = ttk.Frame(win)
         search_frame.pack(fill="x", padx=6, pady=6)
         ttk.Label(search_frame, text="Search:").pack(side="left")
+        ttk.Label(search_frame, textvariable=count_var).pack(side="right", padx=(6, 0))
         tk.Entry(search_frame, textvariable=search_var).pack(fill="x", padx=(6, 0), expand=True)
 
-        cols = ("when", "title", "url", "file")
+        cols = HistoryIndex.COLUMNS
         tree = ttk.Treeview(win, columns=cols, show="headings")
         for c in cols:
-            tree.heading(c, text=c.title())
+            tree.heading(c, text=c.title(), command=lambda c=c: sort_by(c))
             tree.column(c, width=220 if c == "file" else 180)
         vsb = ttk.Scrollbar(win, orient="vertical", command=tree.yview)
-        tree.configure(yscroll=vsb.set)
         tree.pack(fill="both", expand=True)
         vsb.pack(side="right", fill="y")
 
-        def populate(filter_text=""):
-            for item in tree.get_children():
-                tree.delete(item)
-            for e in reversed(hist):
-                if filter_text.lower() not in json.dumps(e).lower():
-                    continue
-                dt = time.strftime("%Y-%m-%d %H:%M", time.localtime(e.get("when", time.time())))
-                tree.insert("", "end", values=(dt, e.get("title", "-"), e.get("url", "-"), e.get("file", "-")))
+        state = {"results": [], "shown": 0, "sort": None, "reverse": False, "after": None, "loading": False,
+                 "index": None}
+
+        def load_more():
+            """Append the next page of results to the tree."""
+            state["loading"] = False
+            start = state["shown"]
+            for pos in state["results"][start:start + HISTORY_PAGE_SIZE]:
+                tree.insert("", "end", values=state["index"].rows[pos])
+            state["shown"] = min(len(state["results"]), start + HISTORY_PAGE_SIZE)
+            count_var.set(f"{state['shown']} of {len(state['results'])}")
+
+        def run_query():
+            state["after"] = None
+            if state["index"] is None:
+                return      # wait_for_index runs it once the index is built
+            state["results"] = state["index"].search(search_var.get(), state["sort"], state["reverse"])
+            state["shown"] = 0
+            tree.delete(*tree.get_children())
+            load_more()
+
+        def on_search(*_):
+            if state["after"] is not None:
+                win.after_cancel(state["after"])
+            state["after"] = win.after(HISTORY_SEARCH_DEBOUNCE_MS, run_query)
+
+        def on_scroll(first, last):
+            vsb.set(first, last)
+            if float(last) >= 0.95 and state["shown"] < len(state["results"]) and not state["loading"]:
+                state["loading"] = True
+                win.after_idle(load_more)
+
+        def sort_by(col):
+            if state["sort"] == col:
+                state["reverse"] = not state["reverse"]
+            else:
+                state["sort"], state["reverse"] = col, False
+            run_query()
 
-        search_var.trace_add("write", lambda *_: populate(search_var.get().lower()))
-        populate()
+        def wait_for_index():
+            """Poll the background build instead of blocking the Tk thread on it."""
+            if not win.winfo_exists():
+                return
+            future = self._hist_index_future
+            if not future.done():
+                count_var.set("Loading history…")
+                win.after(100, wait_for_index)
+                return
+            try:
+                state["index"] = future.result()
+            except Exception as e:
+                logger.exception("Could not build the history index: %s", e)
+                self._hist_index_future = self._cleanup_pool.submit(self._history_index)
+                count_var.set(f"Could not load history: {e}")
+                return
+            run_query()
+
+        tree.configure(yscrollcommand=on_scroll)
+        search_var.trace_add("write", on_search)
+        wait_for_index()
+
+    def show_stats(self):
+        cache = METADATA_CACHE.stats()
+        pool = YDL_POOL.stats()
+        lines = [
+            "Metadata cache",
+            f"  entries: {cache['entries']}",
+            f"  hits: {cache['hits']}   misses: {cache['misses']}   hit rate: {cache['hit_rate']:.0%}",
+            "",
+            "Task list updates",
+            f"  requested: {self.render_stats['requested']}   merged: {self.render_stats['merged']}"
+            f"   rows painted: {self.render_stats['painted']}",
+            "",
+            "Download archive",
+            f"  entries: {len(DOWNLOAD_ARCHIVE)}   lookups: {DOWNLOAD_ARCHIVE.lookups}"
+            f"   answered by Bloom filter: {DOWNLOAD_ARCHIVE.bloom_negatives}",
+            "",
+            "Warm YoutubeDL instances",
+            f"  built: {pool['created']}   reused: {pool['reused']}"
+            f"   setup time saved: ~{pool['setup_saved']:.1f}s",
+            f"  HTTP requests: {pool['requests']}   new connections: {pool['connections']}"
+            f"   connection reuse: {pool['connection_reuse']:.0%}",
+            "",
+            "Auto concurrency (recent samples)",
+        ]
+        for when, slots, rate, decision in list(CONCURRENCY.history)[-10:]:
+            lines.append(f"  {time.strftime('%H:%M:%S', time.localtime(when))}  "
+                         f"{slots} slots  {human_bytes(rate)}/s  {decision}")
+        messagebox.showinfo("Performance Stats", "\n".join(lines))
 
     def show_about(self):
         messagebox.showinfo("About", f"{APP_NAME} {APP_VERSION}\n\n~ A video downloader that can download any video by inserting URL's and for MORE info go to Viora Documentation ...")
@@ -975,12 +4537,13 @@ class App:
         - Audio extraction (MP3, WAV, AAC, FLAC, OPUS)
         - Subtitles download + burn-in
         - Quality selection per task
-        - Concurrent downloads (1-5)
+        - Concurrent downloads (1-5), or Auto to tune from measured speed
         - Pause / Resume / Cancel via double-click
         - Drag & Drop, clipboard autofill
         - Dark / Light theme
         - Persistent history with search
-        - Auto-retry failed downloads (3×)
+        - Auto-retry of network errors and rate limits (3× by default, with backoff;
+          a site that keeps failing is paused for a while)
         - Real-time progress notifications
         - Thumbnail preview in quality picker
 
@@ -1070,8 +4633,7 @@ class App:
             url = tv.set(item, "URL")
 
             try:
-                with YoutubeDL({}) as ydl:
-                    info = ydl.extract_info(url, download=False)
+                info = METADATA_CACHE.get(url)
             except Exception as e:
                 messagebox.showerror("Error", f"Could not fetch formats: {e}")
                 return
@@ -1154,65 +4716,369 @@ class App:
     def enqueue_url(self, url, audio_only=False, format_id=None):
         task = DownloadTask(url, audio_only=audio_only, format_id=format_id)
         task.status = TASK_QUEUED
+        task.outtmpl = os.path.abspath(
+            os.path.join(self.settings["download_folder"], self.settings["filename_template"])
+        )
         self.tasks[task.id] = task
         self._add_row_for_task(task)
-        self.task_queue.put(task)
+        if self.settings.get("enable_playlist", False):
+            task.expand_pending = True
+            self._expand_pool.submit(self._expand_or_queue, task)
+        else:
+            self.task_queue.put(task)
+            self._prefilter_pool.submit(self._prefilter_task, task)
+        return task
 
-    def start_queue(self):
-        self.status("Queue is running…")
+    def _expand_or_queue(self, task: DownloadTask):
+        """Playlist mode: fan a playlist out into entry tasks, or queue the URL as-is."""
+        try:
+            if self._expand_playlist(task):
+                return
+        except Exception as e:
+            logger.warning("Could not expand %s as a playlist: %s", task.url, e)
+            if task.children:
+                return      # the entries found so far are queued; the parent would fetch them all again
+            task.children = None
+        task.expand_pending = False
+        if task.status == TASK_QUEUED:
+            self.task_queue.put(task)
+            self._prefilter_task(task)
 
-    def cancel_current(self):
+    def _expand_playlist(self, task: DownloadTask, entry_filter=None) -> bool:
         """
-        Cancel the currently-running task, terminate its process,
-        and delete any partially-downloaded file.
+        Flat-extract ``task.url`` and stream its entries to the UI in batches.
+        ``lazy_playlist`` with ``process=False`` keeps the entries a generator,
+        so pages are fetched as we iterate and children start downloading
+        before the whole list is known. ``entry_filter(entry)`` may return
+        False to skip an entry or None to stop paging.
+
+        A URL that turns out to be a single video is not expanded; its
+        result is resolved and cached so the worker does not extract again.
         """
-        for w in self.workers:
-            task = w.current_task
-            if task and task.status == TASK_RUNNING:
+        opts = {"quiet": True, "extract_flat": "in_playlist", "lazy_playlist": True, "noplaylist": False}
+        with YDL_POOL.session(opts) as ydl:
+            info = ydl.extract_info(task.url, download=False, process=False)
+            if not info:
+                return False
+            if info.get("_type", "video") == "video":
+                METADATA_CACHE.put(task.url, ydl.process_ie_result(info, download=False), playlist=True)
+                return False
+            if info.get("_type") not in ("playlist", "multi_video"):
+                return False
+            task.expand_pending = False
+            task.children, task.expanding = [], True
+            task.playlist_title = info.get("title") or task.url
+            self.gui_callback("update_task", task)
+            batch = []
+            try:
+                for entry in info.get("entries") or ():
+                    if task.cancel_flag.is_set():
+                        break
+                    url = entry and (entry.get("url") or entry.get("webpage_url"))
+                    verdict = True if entry_filter is None or not url else entry_filter(entry)
+                    if verdict is None:
+                        break
+                    if url and verdict:
+                        batch.append((url, entry.get("title"), entry.get("filesize_approx"), entry.get("id")))
+                    if len(batch) >= PLAYLIST_BATCH:
+                        self._post_children(task, batch)
+                        batch = []
+            finally:
+                self._post_children(task, batch)
+                task.expanding = False
+                self.gui_callback("update_task", task)
+        logger.info("Expanded playlist %s", task.url)
+        return True
 
-                task.cancel_flag.set()
+    def subscribe_entry_url(self):
+        url = self.url_var.get().strip()
+        if not url:
+            messagebox.showwarning("Subscribe", "Enter a channel or playlist URL in the entry first.")
+            return
+        SUBSCRIPTIONS.add(url)
+        self.url_var.set("")
+        self.sync_subscription(url)
 
-                if hasattr(task, "_proc") and task._proc and task._proc.poll() is None:
-                    try:
-                        task._proc.kill()
-                        task._proc.wait(timeout=2)
-                    except Exception:
-                        pass
+    def sync_all_subscriptions(self):
+        subs = SUBSCRIPTIONS.all()
+        if not subs:
+            messagebox.showinfo("Subscriptions", "No subscriptions yet. Use Tools > Subscribe to URL in Entry.")
+            return
+        for sub in subs:
+            self.sync_subscription(sub["url"])
 
-                settings = self.get_settings()
-                outtmpl = os.path.join(
-                    settings["download_folder"],
-                    settings["filename_template"]
-                )
+    def sync_subscription(self, url):
+        task = DownloadTask(subscription_list_url(url), audio_only=self.audio_only_var.get())
+        task.status = TASK_QUEUED
+        task.title = f"Sync: {url}"
+        task.subscription = url
+        task.outtmpl = os.path.abspath(
+            os.path.join(self.settings["download_folder"], self.settings["filename_template"])
+        )
+        self.tasks[task.id] = task
+        self._add_row_for_task(task)
+        self._expand_pool.submit(self._sync_subscription, task)
 
-                try:
-                    from yt_dlp import YoutubeDL
-                    ydl = YoutubeDL({"outtmpl": outtmpl, "quiet": True})
-                    info = ydl.extract_info(task.url, download=False)
-                    real_path = ydl.prepare_filename(info)
-
-                    if task.audio_only or settings.get("audio_only"):
-                        base, _ = os.path.splitext(real_path)
-                        real_path = base + "." + settings.get("audio_format", "mp3")
-
-                    if os.path.isfile(real_path):
-                        os.remove(real_path)
-                        logger.info("Deleted partial file: %s", real_path)
-                except Exception as e:
-                    logger.warning("Could not remove partial file: %s", e)
+    def _sync_subscription(self, task: DownloadTask):
+        """
+        Page through the remote list newest-first and queue entries until
+        ``SYNC_KNOWN_STREAK`` known ones in a row (or anything older than
+        the high-water mark) show up; older pages are never fetched.
+        """
+        sub = SUBSCRIPTIONS.get(task.subscription) or {"seen": [], "high_water": None}
+        seen = set(sub["seen"])
+        early_stop = sub.get("newest_first", True)
+        new_ids, dates, streak, scanned = [], [], 0, 0
+        started = time.perf_counter()
+
+        def entry_filter(entry):
+            nonlocal streak, scanned
+            scanned += 1
+            date = entry_date(entry)
+            if date:
+                dates.append(date)
+            if SubscriptionStore.entry_is_known(sub, seen, entry):
+                streak += 1
+                return None if early_stop and streak >= SYNC_KNOWN_STREAK else False
+            streak = 0
+            if entry.get("id"):
+                new_ids.append(entry["id"])
+            return True
 
-                task.status = TASK_CANCELED
-                self._update_task_row(task)
-                self.status(f"Cancelled and deleted #{task.id}")
-                return
+        try:
+            if not self._expand_playlist(task, entry_filter):
+                raise ValueError("not a channel or playlist URL")
+        except Exception as e:
+            task.status, task.error = TASK_FAILED, str(e)
+            self.gui_callback("update_task", task)
+            logger.warning("Sync of %s failed: %s", task.url, e)
+            return
+        title, task.playlist_title = task.playlist_title, f"Sync: {task.playlist_title}"
+        if not task.cancel_flag.is_set():
+            newest_first = dates[0] >= dates[-1] if len(dates) > 1 and dates[0] != dates[-1] else None
+            SUBSCRIPTIONS.record_sync(task.subscription, title, new_ids, max(dates, default=None), newest_first)
+        self.gui_callback("update_task", task)
+        logger.info("Synced %s: %d new of %d entries checked in %.1fs",
+                    task.url, len(new_ids), scanned, time.perf_counter() - started)
+
+    def show_subscriptions(self):
+        win = tk.Toplevel(self.root)
+        win.title("Subscriptions")
+        lb = tk.Listbox(win, width=90, height=12)
+        lb.pack(fill="both", expand=True, padx=10, pady=10)
+        def refresh():
+            lb.delete(0, "end")
+            for sub in SUBSCRIPTIONS.all():
+                last = time.strftime("%Y-%m-%d %H:%M", time.localtime(sub["last_sync"])) if sub.get("last_sync") else "never"
+                lb.insert("end", f"{sub['title']}  —  last sync {last}  —  {sub['url']}")
+        def selected_url():
+            sel = lb.curselection()
+            return SUBSCRIPTIONS.all()[sel[0]]["url"] if sel else None
+        def sync_selected():
+            url = selected_url()
+            if url:
+                self.sync_subscription(url)
+        def remove_selected():
+            url = selected_url()
+            if url:
+                SUBSCRIPTIONS.remove(url)
+                refresh()
+        buttons = ttk.Frame(win)
+        buttons.pack(pady=(0, 10))
+        ttk.Button(buttons, text="Sync Selected", command=sync_selected).pack(side="left", padx=5)
+        ttk.Button(buttons, text="Sync All", command=self.sync_all_subscriptions).pack(side="left", padx=5)
+        ttk.Button(buttons, text="Remove", command=remove_selected).pack(side="left", padx=5)
+        refresh()
+
+    def _post_children(self, parent: DownloadTask, entries):
+        if entries:
+            with self._dirty_lock:
+                self._new_children.append((parent, entries))
+
+    def _add_children(self, parent: DownloadTask, entries):
+        """Create entry tasks on the Tk thread; they run in parallel like any other task."""
+        for url, title, size, entry_id in entries:
+            child = DownloadTask(url, audio_only=parent.audio_only, format_id=parent.format_id)
+            child.title = title or url
+            child.parent = parent
+            child.subscription, child.entry_id = parent.subscription, entry_id
+            child.status = TASK_QUEUED
+            child.outtmpl = parent.outtmpl
+            child.priority = parent.priority
+            child.est_bytes = size
+            parent.children.append(child)
+            self.tasks[child.id] = child
+            self._add_row_for_task(child)
+            self.task_queue.put(child)
+            self._prefilter_pool.submit(self._prefilter_task, child)
+
+    def _aggregate_playlist(self, parent: DownloadTask):
+        """Roll the entry tasks up into the playlist row: progress, speed, ETA and status."""
+        children = parent.children
+        counts = {}
+        for c in children:
+            counts[c.status] = counts.get(c.status, 0) + 1
+        finished = counts.get(TASK_DONE, 0) + counts.get(TASK_SKIPPED, 0)
+        failed = counts.get(TASK_FAILED, 0)
+        n = len(children)
+        parent.progress = sum(100.0 if c.status in (TASK_DONE, TASK_SKIPPED) else c.progress
+                              for c in children) / n if n else 0.0
+        speed = sum(c.speed_bps for c in children if c.status == TASK_RUNNING)
+        known = [c.total_bytes for c in children if c.total_bytes]
+        typical = sum(known) / len(known) if known else 0
+        remaining = sum((c.total_bytes or typical) - c.downloaded_bytes for c in children
+                        if c.status in (TASK_QUEUED, TASK_RUNNING))
+        parent.speed = human_bytes(speed) + "/s" if speed else "-"
+        parent.eta = human_eta(remaining / speed) if speed and remaining > 0 else "-"
+        parent.speed_bps, parent.eta_seconds = speed, remaining / speed if speed and remaining > 0 else None
+        if counts.get(TASK_RUNNING) or counts.get(TASK_PROCESSING):
+            parent.status = TASK_RUNNING
+        elif parent.expanding or counts.get(TASK_QUEUED):
+            parent.status = TASK_QUEUED
+        elif not n:
+            parent.status = TASK_DONE
+        elif failed:
+            parent.status = TASK_FAILED
+        elif finished == n:
+            parent.status = TASK_DONE
+        else:
+            parent.status = max(counts, key=counts.get)
+        more = "+" if parent.expanding else ""
+        parent.title = f"{parent.playlist_title} [{finished}/{n}{more}" + (f", {failed} failed]" if failed else "]")
+
+    def toggle_segmented_selected(self):
+        """Override the per-site multi-connection setting for the selected task."""
+        sel = self.tree.selection()
+        if not sel:
+            messagebox.showinfo("Nothing selected", "Please click a task first.")
+            return
+        task = self.tasks[int(sel[0])]
+        task.segmented = not segmented_for(task, self.settings)
+        self.status(f"Multi-connection download {'on' if task.segmented else 'off'} for #{task.id}"
+                    + (" (applies from its next start)" if task.status == TASK_RUNNING else "."))
 
-        self.status("No running task to cancel.")
+    def retry_failed(self):
+        """Queue the selected failed task again, or every failed entry of a selected playlist."""
+        sel = self.tree.selection()
+        if not sel:
+            messagebox.showinfo("Nothing selected", "Please click a task first.")
+            return
+        task = self.tasks[int(sel[0])]
+        targets = task.children if task.children is not None else [task]
+        retried = 0
+        for t in targets:
+            if t.status in (TASK_FAILED, TASK_CANCELED):
+                t.status, t.error, t.progress = TASK_QUEUED, None, 0.0
+                t.retry_count = 0
+                t.cancel_flag.clear()
+                self.task_queue.put(t)
+                self.gui_callback("update_task", t)
+                retried += 1
+        if task.children is not None:
+            self.gui_callback("update_task", task)
+        self.status(f"Retrying {retried} task(s).")
+
+    def _prefilter_task(self, task: DownloadTask):
+        """
+        Canonicalize a new task offline: skip it if the archive already has
+        it, or attach it to an identical queued/running download.
+        """
+        task.archive_id = archive_id_for_url(task.url)
+        task.dedup_key = dedup_key_for(task)
+        self.task_queue.update(task)    # file it under its extractor for per-site limits
+        if task.status != TASK_QUEUED:
+            return
+        if (self.settings.get("skip_downloaded", True) and task.archive_id and not task.force
+                and task.archive_id in DOWNLOAD_ARCHIVE):
+            task.status = TASK_SKIPPED
+            DownloadWorker._record_subscription_entry(task)
+            self.gui_callback("update_task", task)
+            return
+        leader = INFLIGHT.attach(task)
+        if leader is not None:
+            task.title = leader.title
+            self.gui_callback("update_task", task)
+        elif self.task_queue.policy == "sjf":
+            # shortest-job-first needs sizes; fetch metadata here, off the Tk thread
+            try:
+                task.est_bytes = estimate_size(METADATA_CACHE.get(task.url),
+                                               format_spec_for(task, self.settings.get("audio_only")))
+                self.task_queue.update(task)
+            except Exception as e:
+                logger.debug("No size estimate for %s: %s", task.url, e)
+
+    def move_selected(self, delta):
+        """Raise or lower the selected task's priority in the scheduler."""
+        sel = self.tree.selection()
+        if not sel:
+            messagebox.showinfo("Nothing selected", "Please click a task first.")
+            return
+        task = self.tasks[int(sel[0])]
+        task.priority += delta
+        self.task_queue.update(task)
+        self._update_task_row(task)
+        self.status(f"Priority of #{task.id} is now {task.priority:+d}.")
+
+    def redownload_selected(self):
+        """Override the archive for the selected task and queue it again."""
+        sel = self.tree.selection()
+        if not sel:
+            messagebox.showinfo("Nothing selected", "Please click a task first.")
+            return
+        task = self.tasks[int(sel[0])]
+        if task.status in (TASK_RUNNING, TASK_PROCESSING, TASK_QUEUED):
+            return
+        INFLIGHT.detach(task)
+        task.checkpoint = None
+        task.force = True
+        task.error = None
+        task.retry_count = 0
+        task.progress = 0.0
+        task.cancel_flag.clear()
+        task.status = TASK_QUEUED
+        self.task_queue.put(task)
+        self._update_task_row(task)
+        self.status(f"Queued #{task.id} for download again.")
+
+    def start_queue(self):
+        self.status("Queue is running…")
+
+    def cancel_current(self):
+        """
+        Cancel the selected task if it is running, post-processing or
+        paused, else the first running or post-processing one: abort its
+        connections and processes (ffmpeg included), and delete any
+        partially-downloaded file.
+        """
+        sel = self.tree.selection()
+        selected = self.tasks.get(int(sel[0])) if sel else None
+        if selected is not None and selected.status == TASK_PAUSED:
+            # no worker holds a paused task, so its files are deleted here
+            selected.interrupt(USER_CANCEL_SIGNAL, TASK_CANCELED)
+            selected.checkpoint = None
+            self._cleanup_pool.submit(remove_partial_files, [selected])
+            self._update_task_row(selected)
+            self.status(f"Cancelled and deleted #{selected.id}")
+            return
+
+        running = [w.current_task for w in self.pool.workers
+                   if w.current_task is not None and w.current_task.status == TASK_RUNNING]
+        # handed to the post-processing pool; no worker holds these any more
+        running += [t for t in self.tasks.values() if t.status == TASK_PROCESSING]
+        for task in ([selected] if selected in running else running)[:1]:
+            # the worker or post-processing job deletes the recorded partial files once it stops
+            task.interrupt(USER_CANCEL_SIGNAL, TASK_CANCELED)
+            self._update_task_row(task)
+            self.status(f"Cancelled and deleted #{task.id}")
+            return
+
+        self.status("No running, post-processing or paused task to cancel.")
 
     def pause_all(self):
         count = 0
         for task in self.tasks.values():
             if task.status == TASK_RUNNING:
-                task.pause_flag.set()   
+                task.interrupt(USER_PAUSE_SIGNAL)
                 count += 1
         self.status(f"Paused {count} downloads.")
 
@@ -1222,6 +5088,7 @@ class App:
             if task.status in (TASK_PAUSED, TASK_FAILED):   
                 task.pause_flag.clear()
                 task.error = None
+                task.retry_count = 0
                 task.status = TASK_QUEUED
                 self.task_queue.put(task)
                 count += 1
@@ -1229,19 +5096,81 @@ class App:
         self.status(f"Resumed {count} downloads.")
 
     def clear_completed(self):
-        to_remove = [tid for tid, t in self.tasks.items() if t.status in (TASK_DONE, TASK_FAILED, TASK_CANCELED)]
+        to_remove = [tid for tid, t in self.tasks.items()
+                     if t.status in (TASK_DONE, TASK_FAILED, TASK_CANCELED, TASK_SKIPPED)]
         for tid in to_remove:
-            self.remove_task(tid)
+            self.tasks.pop(tid, None)
+            self._thumb_cache.pop(str(tid), None)
+        self._rebuild_view()
         self.status(f"Cleared {len(to_remove)} completed items.")
 
     def remove_task(self, task_id):
         self.tasks.pop(task_id, None)
-        if str(task_id) in self.tree.get_children():
-            self.tree.delete(str(task_id))
+        self._thumb_cache.pop(str(task_id), None)
+        self._schedule_view_rebuild()
 
     def gui_callback(self, action, task: DownloadTask):
+        """Called from worker threads; only marks the row dirty for the next render tick."""
         if action == "update_task":
-            self.root.after_idle(self._update_task_row, task)
+            with self._dirty_lock:
+                self.render_stats["requested"] += 1
+                if task.id in self._dirty:
+                    self.render_stats["merged"] += 1
+                else:
+                    self._dirty.add(task.id)
+                if task.parent is not None:
+                    self._dirty.add(task.parent.id)    # playlist row shows the roll-up
+
+    def _render_interval(self):
+        rate = max(1, min(30, int(self.settings.get("ui_refresh_rate", 5))))
+        return 1000 // rate
+
+    def _render_dirty(self):
+        """Repaint the rows that changed since the last tick, then reschedule."""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+            new_children, self._new_children = self._new_children, []
+        for parent, entries in new_children:
+            self._add_children(parent, entries)
+            dirty.add(parent.id)
+        for task_id in dirty:
+            task = self.tasks.get(task_id)
+            if task is not None:
+                if task.children is not None:
+                    self._aggregate_playlist(task)
+                self._update_task_row(task)
+        self.render_stats["painted"] += len(dirty)
+        self._update_slots_label()
+        self.root.after(self._render_interval(), self._render_dirty)
+
+    def _adapt_concurrency(self):
+        """Feed one throughput sample to the AIMD controller and apply its answer."""
+        self.root.after(ADAPTIVE_INTERVAL * 1000, self._adapt_concurrency)
+        if not self.settings.get("adaptive_concurrency", False):
+            return
+        old = CONCURRENCY.slots
+        slots = CONCURRENCY.sample(self.task_queue.busy())
+        if slots != self.pool.target:
+            self.pool.resize(slots)
+        when, _, rate, decision = CONCURRENCY.history[-1]
+        log = logger.info if slots != old else logger.debug
+        log("Auto concurrency: %s -> %s slots at %s/s (%s)", old, slots, human_bytes(rate), decision)
+
+    def _update_slots_label(self):
+        usage = self.task_queue.slot_usage()
+        parts = []
+        if self.settings.get("adaptive_concurrency", False):
+            parts.append(f"auto {CONCURRENCY.slots} slots @ {human_bytes(CONCURRENCY.rate)}/s")
+        if BANDWIDTH.rate:
+            parts.append(f"limit {human_bytes(BANDWIDTH.rate)}/s")
+        for site, (running, limit, waiting) in sorted(usage.items(), key=lambda kv: (-kv[1][0], kv[0])):
+            part = f"{site} {running}/{limit or '∞'}"
+            parts.append(part + (f" (+{waiting} waiting)" if waiting else ""))
+        for site, wait in sorted(self.task_queue.open_circuits().items()):
+            parts.append(f"{site} failing, retry in {human_eta(wait)}")
+        text = ("Slots: " + " · ".join(parts)) if parts else ""
+        if self.slots_var.get() != text:
+            self.slots_var.set(text)
 
     # Quality selector
     def choose_quality_for_entry(self):
@@ -1253,8 +5182,7 @@ class App:
 
     def _open_format_selector(self, url, task_to_update: DownloadTask = None):
         try:
-            with YoutubeDL({}) as ydl:
-                info = ydl.extract_info(url, download=False)
+            info = METADATA_CACHE.get(url)
         except Exception as e:
             messagebox.showerror("Error", f"Could not fetch formats: {e}")
             return
@@ -1318,11 +5246,7 @@ class App:
                 self.status(f"Set quality {fmt} for queued item #{task_to_update.id}.")
                 self._update_task_row(task_to_update)
             else:
-                t = DownloadTask(url, audio_only=self.audio_only_var.get(), format_id=fmt)
-                t.status = TASK_QUEUED
-                self.tasks[t.id] = t
-                self._add_row_for_task(t)
-                self.task_queue.put(t)
+                self.enqueue_url(url, audio_only=self.audio_only_var.get(), format_id=fmt)
                 self.status(f"Added with format {fmt}.")
                 self.url_var.set("")
             top.destroy()
@@ -1330,11 +5254,13 @@ class App:
         ttk.Button(top, text="Select", command=on_select).pack(pady=6)
 
     def on_close(self):
-        try:
-            for worker in self.workers:
-                worker.stop()
-        except Exception:
-            pass
+        logger.info("Metadata cache: %s", METADATA_CACHE.stats())
+        logger.info("YoutubeDL pool: %s", YDL_POOL.stats())
+        if self.thumbs is not None:
+            self.thumbs.shutdown()
+        HISTORY.close()
+        self.pool.stop_all()
+        YDL_POOL.close()
         time.sleep(0.15)
         try:
             self.root.destroy()
@@ -1351,6 +5277,7 @@ def main():
     app.root.mainloop()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()    # process mode in a frozen build
     try:
         main()
     except Exception as e:
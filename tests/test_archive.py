@@ -0,0 +1,45 @@
+import threading
+import time
+
+import Viora
+
+
+def lookup(archive, key):
+    """``key in archive`` from another thread, or "blocked" if it did not return in time."""
+    result = ["blocked"]
+    thread = threading.Thread(target=lambda: result.__setitem__(0, key in archive), daemon=True)
+    thread.start()
+    thread.join(2)
+    return result[0]
+
+
+def test_unreadable_line_does_not_block_lookups(tmp_path):
+    path = tmp_path / "archive.txt"
+    path.write_bytes(b"youtube aaaaaaaaaaa\n\xff\xfe broken\nyoutube bbbbbbbbbbb\n")
+    archive = Viora.DownloadArchive(str(path))
+    archive.load()
+    assert lookup(archive, "youtube bbbbbbbbbbb") is True
+    assert lookup(archive, "youtube ccccccccccc") is False
+
+
+def test_failed_load_still_answers(tmp_path):
+    archive = Viora.DownloadArchive(str(tmp_path))     # a directory: open() fails
+    archive.load()
+    assert lookup(archive, "youtube aaaaaaaaaaa") is False
+
+
+def test_seeding_from_history_does_not_hold_lookups(tmp_path, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(Viora, "archive_id_for_url", lambda url: release.wait() and "youtube bbbbbbbbbbb")
+    path = tmp_path / "archive.txt"
+    archive = Viora.DownloadArchive(str(path))
+    archive.load([{"archive_id": "youtube aaaaaaaaaaa"},
+                  {"url": "https://www.youtube.com/watch?v=bbbbbbbbbbb"}])
+    assert lookup(archive, "youtube aaaaaaaaaaa") is True
+    assert lookup(archive, "youtube bbbbbbbbbbb") is False     # not matched yet
+
+    release.set()
+    deadline = time.time() + 5
+    while "youtube bbbbbbbbbbb" not in archive and time.time() < deadline:
+        time.sleep(0.01)
+    assert path.read_text().splitlines() == ["youtube aaaaaaaaaaa", "youtube bbbbbbbbbbb"]
@@ -0,0 +1,33 @@
+import Viora
+
+
+def test_limit_applies_on_configure():
+    settings = dict(Viora.DEFAULT_SETTINGS)
+    try:
+        Viora.BANDWIDTH.configure(dict(settings, max_download_speed=100))
+        assert Viora.BANDWIDTH.rate == 100 * 1024
+    finally:
+        Viora.BANDWIDTH.configure(settings)
+    assert Viora.BANDWIDTH.rate == 0
+
+
+def test_limit_disables_segmenting():
+    task = Viora.DownloadTask("http://x/")
+    settings = dict(Viora.DEFAULT_SETTINGS, segmented_hosts=["*"], segment_connections=4)
+    try:
+        Viora.BANDWIDTH.configure(dict(settings, max_download_speed=100))
+        assert Viora.segmented_for(task, settings) == 0
+    finally:
+        Viora.BANDWIDTH.configure(settings)
+    assert Viora.segmented_for(task, settings) == 4
+
+def test_single_stream_part_is_left_for_yt_dlp_to_resume(tmp_path):
+    from yt_dlp import YoutubeDL
+    name = str(tmp_path / "v.mp4")
+    with open(name + ".part", "wb") as f:
+        f.write(b"x" * 1000)
+    seg = Viora.SegmentedDownloader(YoutubeDL({"quiet": True}), {"url": "http://127.0.0.1:9/v.mp4"}, name, 4)
+    seg._probe = lambda: 100 * 1024 * 1024
+    assert seg.run() is False
+    with open(name + ".part", "rb") as f:
+        assert f.read() == b"x" * 1000
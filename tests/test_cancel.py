@@ -0,0 +1,144 @@
+import Viora
+
+
+class OneShotQueue:
+    """Hands out one task, then tells the worker to stop."""
+
+    def __init__(self, task):
+        self.tasks = [task]
+        self.done = []
+
+    def get(self, stop=None):
+        return self.tasks.pop() if self.tasks else None
+
+    def task_done(self, task):
+        self.done.append(task)
+
+    def put(self, task, delay=0):
+        pass
+
+    def record_outcome(self, task, failed):
+        pass
+
+
+def run_worker(task, settings_provider):
+    queue = OneShotQueue(task)
+    worker = Viora.DownloadWorker(queue, lambda *a: None, settings_provider)
+    worker.start()
+    worker.join(60)
+    return queue
+
+
+def settings(tmp_path):
+    return dict(Viora.DEFAULT_SETTINGS, download_folder=str(tmp_path), process_mode=False,
+                skip_downloaded=False, retry_attempts=0)
+
+
+def test_cancel_before_pickup_is_kept():
+    task = Viora.DownloadTask("http://127.0.0.1:9/v.mp4")
+    task.status = Viora.TASK_QUEUED
+    task.interrupt(Viora.USER_CANCEL_SIGNAL, Viora.TASK_CANCELED)
+    assert not task.start_attempt()
+    assert task.cancel_flag.is_set() and task.status == Viora.TASK_CANCELED
+
+
+def test_cancel_during_pickup_is_not_lost(tmp_path):
+    task = Viora.DownloadTask("http://127.0.0.1:9/v.mp4")
+    task.status = Viora.TASK_QUEUED
+
+    def cancel_while_picking_up():
+        # what Cancel All does to a task it still sees as QUEUED
+        task.interrupt(Viora.USER_CANCEL_SIGNAL, Viora.TASK_CANCELED)
+        return settings(tmp_path)
+
+    queue = run_worker(task, cancel_while_picking_up)
+    assert queue.done == [task]
+    assert task.status == Viora.TASK_CANCELED
+    assert task.error is None
+
+
+class Inline:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+def app_with(*tasks, selected=None):
+    """The parts of App that the cancel buttons touch."""
+    from types import SimpleNamespace
+    return SimpleNamespace(
+        tasks={t.id: t for t in tasks}, _cleanup_pool=Inline(), _update_task_row=lambda t: None,
+        status=lambda text: None, pool=SimpleNamespace(workers=[]),
+        tree=SimpleNamespace(selection=lambda: (str(selected.id),) if selected else ()))
+
+
+def task_with_status(status, tmp_path=None):
+    task = Viora.DownloadTask("http://x/%s" % status)
+    task.status = status
+    if tmp_path is not None:
+        part = tmp_path / ("%s.mp4.part" % status)
+        part.write_bytes(b"x")
+        task.partial_files.add(str(tmp_path / ("%s.mp4" % status)))
+    return task
+
+
+def test_cancel_all_leaves_finished_tasks_alone(tmp_path):
+    tasks = {s: task_with_status(s) for s in (Viora.TASK_DONE, Viora.TASK_SKIPPED, Viora.TASK_FAILED,
+                                               Viora.TASK_CANCELED, Viora.TASK_QUEUED)}
+    tasks[Viora.TASK_PAUSED] = task_with_status(Viora.TASK_PAUSED, tmp_path)
+    Viora.App.cancel_all(app_with(*tasks.values()))
+    assert {s: t.status for s, t in tasks.items()} == {
+        Viora.TASK_DONE: Viora.TASK_DONE, Viora.TASK_SKIPPED: Viora.TASK_SKIPPED,
+        Viora.TASK_FAILED: Viora.TASK_FAILED, Viora.TASK_CANCELED: Viora.TASK_CANCELED,
+        Viora.TASK_QUEUED: Viora.TASK_CANCELED, Viora.TASK_PAUSED: Viora.TASK_CANCELED}
+    assert not list(tmp_path.iterdir())
+
+
+def test_cancel_current_deletes_paused_files(tmp_path):
+    task = task_with_status(Viora.TASK_PAUSED, tmp_path)
+    task.checkpoint = {"info": {}, "parts": {}}
+    Viora.App.cancel_current(app_with(task, selected=task))
+    assert task.status == Viora.TASK_CANCELED and task.checkpoint is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_skipped_task_does_not_stay_bound(tmp_path, monkeypatch):
+    task = Viora.DownloadTask("http://x/v")
+    task.status, task.archive_id = Viora.TASK_QUEUED, "generic v"
+    monkeypatch.setattr(Viora, "DOWNLOAD_ARCHIVE", {"generic v"})
+    monkeypatch.setattr(Viora.METADATA_CACHE, "get", lambda url, playlist=False: {"title": "v"})
+    bound = []
+
+    class Queue(OneShotQueue):
+        def get(self, stop=None):
+            bound.append(Viora.TaskIO.current())
+            return super().get(stop)
+
+    queue = Queue(task)
+    worker = Viora.DownloadWorker(queue, lambda *a: None, lambda: dict(settings(tmp_path), skip_downloaded=True))
+    worker.start()
+    worker.join(60)
+    assert task.status == Viora.TASK_SKIPPED
+    assert bound == [None, None]
+
+
+def test_io_tracking_installs_once():
+    from yt_dlp.downloader.common import FileDownloader
+    from yt_dlp.utils import Popen
+    Viora.install_io_tracking()
+    patched = Popen.__init__, FileDownloader.report_retry
+    Viora.install_io_tracking()
+    assert (Popen.__init__, FileDownloader.report_retry) == patched
+
+
+def test_cancel_current_stops_post_processing():
+    import subprocess
+    import sys
+    task = task_with_status(Viora.TASK_PROCESSING)
+    ffmpeg = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    task.io.track(ffmpeg)       # what the post-processing job's Popen does
+    try:
+        Viora.App.cancel_current(app_with(task, selected=task))
+        assert task.status == Viora.TASK_CANCELED and task.cancel_flag.is_set()
+        assert ffmpeg.wait(5) is not None
+    finally:
+        ffmpeg.kill()
@@ -0,0 +1,69 @@
+import http.server
+import os
+import threading
+
+import pytest
+from yt_dlp import YoutubeDL
+
+import Viora
+
+SEGMENTS = [os.urandom(5000) for _ in range(12)]
+DROP = set()        # segment numbers whose next request gets its connection closed
+
+
+@pytest.fixture
+def playlist_url():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.endswith(".m3u8"):
+                body = ("#EXTM3U\n#EXT-X-TARGETDURATION:1\n"
+                        + "".join("#EXTINF:1,\nseg%d.ts\n" % i for i in range(len(SEGMENTS)))
+                        + "#EXT-X-ENDLIST\n").encode()
+            else:
+                i = int(self.path.rsplit("seg", 1)[1].split(".")[0])
+                if i in DROP:
+                    DROP.discard(i)
+                    self.close_connection = True
+                    return
+                body = SEGMENTS[i]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield "http://127.0.0.1:%d/v.m3u8" % server.server_port
+    server.shutdown()
+
+
+def test_fragments_are_assembled_from_memory(tmp_path, playlist_url):
+    seen = set()
+    ydl = YoutubeDL({"quiet": True, "noprogress": True})
+    ydl.add_progress_hook(lambda d: seen.update(os.listdir(tmp_path)))
+    Viora.install_memory_fragments(ydl, lambda: 4)
+    out = str(tmp_path / "v.ts")
+    info = {"id": "v", "title": "v", "ext": "ts", "url": playlist_url, "protocol": "m3u8_native"}
+
+    assert ydl.dl(out, info)[0]
+    with open(out, "rb") as f:
+        assert f.read() == b"".join(SEGMENTS)
+    assert not [name for name in seen if "Frag" in name]
+    assert os.listdir(tmp_path) == ["v.ts"]
+
+
+def test_reset_connection_is_retried_in_memory(tmp_path, playlist_url, caplog):
+    DROP.add(3)
+    ydl = YoutubeDL({"quiet": True, "noprogress": True})
+    Viora.install_memory_fragments(ydl, lambda: 4)
+    out = str(tmp_path / "v.ts")
+    info = {"id": "v", "title": "v", "ext": "ts", "url": playlist_url, "protocol": "m3u8_native"}
+
+    assert ydl.dl(out, info)[0]
+    assert not DROP
+    with open(out, "rb") as f:
+        assert f.read() == b"".join(SEGMENTS)
+    assert "falling back" not in caplog.text
@@ -0,0 +1,31 @@
+import threading
+
+import Viora
+
+
+def test_subscriber_sees_every_entry_in_file_order(tmp_path):
+    store = Viora.HistoryStore(str(tmp_path / "history"))
+    for i in range(20):
+        store.append({"title": str(i)})
+    entries, seq = store.snapshot()
+    for i in range(20, 25):
+        store.append({"title": str(i)})     # lands between the snapshot and subscribing
+    seen = list(entries)
+    assert store.subscribe(seen.append, seq)
+    store.append({"title": "25"})
+    assert [e["title"] for e in seen] == [str(i) for i in range(26)]
+    assert seen == store.read()
+
+
+def test_index_built_during_appends_matches_the_file(tmp_path):
+    store = Viora.HistoryStore(str(tmp_path / "history"), segment_bytes=2048)
+    for i in range(300):
+        store.append({"title": "t%d" % i, "url": "http://x/%d" % i})
+    writer = threading.Thread(target=lambda: [store.append({"title": "t%d" % i, "url": "http://x/%d" % i})
+                                              for i in range(300, 600)])
+    writer.start()
+    entries, seq = store.snapshot()
+    seen = list(entries)
+    assert store.subscribe(seen.append, seq)
+    writer.join()
+    assert [e["title"] for e in seen] == ["t%d" % i for i in range(600)]
@@ -0,0 +1,55 @@
+import copy
+
+from yt_dlp import YoutubeDL
+
+import Viora
+
+RAW = {
+    "id": "x", "title": "t", "extractor": "generic", "extractor_key": "Generic", "webpage_url": "http://x/",
+    "formats": [
+        {"format_id": "v", "url": "http://x/v.mp4", "ext": "mp4", "vcodec": "avc1", "acodec": "none",
+         "tbr": 1000, "protocol": "https", "filesize": 9000, "manifest_url": "http://x/m.mpd"},
+        {"format_id": "a", "url": "http://x/a.m4a", "ext": "m4a", "vcodec": "none", "acodec": "mp4a",
+         "abr": 128, "protocol": "https", "filesize": 1000},
+    ],
+}
+
+
+def cached():
+    """What MetadataCache holds: the result of the default format selection."""
+    return YoutubeDL({"quiet": True}).process_ie_result(copy.deepcopy(RAW), download=False)
+
+
+def downloaded(info, fmt):
+    seen = []
+    ydl = YoutubeDL({"quiet": True, "format": fmt})
+    ydl.process_info = lambda i: seen.append(
+        (i.get("url"), i.get("manifest_url"), [f["format_id"] for f in i.get("requested_formats") or ()]))
+    ydl.process_ie_result(info, download=True)
+    return seen
+
+
+def test_cached_info_is_reselected_for_audio_only():
+    fresh = downloaded(copy.deepcopy(RAW), "bestaudio/best")
+    assert downloaded(Viora.unselected_info(cached()), "bestaudio/best") == fresh
+    assert fresh == [("http://x/a.m4a", None, [])]
+
+
+def test_cached_info_keeps_default_selection():
+    assert downloaded(Viora.unselected_info(cached()), "bestvideo+bestaudio/best") == \
+        downloaded(copy.deepcopy(RAW), "bestvideo+bestaudio/best")
+
+
+def test_unselected_info_does_not_touch_cache_or_single_format():
+    info = cached()
+    Viora.unselected_info(info)
+    assert info["requested_formats"]
+    single = {"id": "y", "title": "s", "url": "http://x/s.mp4", "ext": "mp4"}
+    assert Viora.unselected_info(single)["url"] == "http://x/s.mp4"
+
+
+def test_estimate_size_follows_format_spec():
+    info = cached()
+    assert Viora.estimate_size(info, "bestaudio/best") == 1000
+    assert Viora.estimate_size(info, "bestvideo+bestaudio/best") == 10000
+    assert Viora.estimate_size(info, "v") == 9000
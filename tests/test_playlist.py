@@ -0,0 +1,68 @@
+import http.server
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import Viora
+
+
+def app(expand):
+    queued = []
+    return queued, SimpleNamespace(_expand_playlist=expand, task_queue=SimpleNamespace(put=queued.append),
+                                   _prefilter_task=lambda task: None, gui_callback=lambda *a: None)
+
+
+def test_failed_expansion_does_not_queue_the_parent_again():
+    task = Viora.DownloadTask("http://x/list")
+    task.status = Viora.TASK_QUEUED
+
+    def expand(task):
+        task.children = [Viora.DownloadTask("http://x/1")]
+        raise OSError("page 2 timed out")
+
+    queued, fake = app(expand)
+    Viora.App._expand_or_queue(fake, task)
+    assert queued == []
+
+
+def test_parent_is_queued_when_nothing_was_expanded():
+    task = Viora.DownloadTask("http://x/list")
+    task.status = Viora.TASK_QUEUED
+
+    def expand(task):
+        task.children = []
+        raise OSError("first page timed out")
+
+    queued, fake = app(expand)
+    Viora.App._expand_or_queue(fake, task)
+    assert queued == [task] and task.children is None
+
+
+@pytest.fixture
+def media_url():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Content-Length", "4")
+            self.end_headers()
+            self.wfile.write(b"\0\0\0\0")
+
+        do_HEAD = do_GET
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield "http://127.0.0.1:%d/clip.mp4" % server.server_port
+    server.shutdown()
+
+
+def test_single_video_is_cached_for_the_worker(media_url):
+    task = Viora.DownloadTask(media_url)
+    _, fake = app(None)
+    assert Viora.App._expand_playlist(fake, task) is False
+    info = Viora.METADATA_CACHE.peek(media_url, playlist=True)
+    assert info is not None and info["url"] == media_url
@@ -0,0 +1,50 @@
+import socket
+
+import Viora
+
+
+def test_autonumber_restarts_for_each_task(tmp_path):
+    pool = Viora.YDLPool()
+    outtmpl = str(tmp_path / "%(autonumber)s.%(ext)s")
+    info = {"id": "x", "title": "t", "ext": "mp4", "extractor": "generic"}
+    with pool.session({"quiet": True}, outtmpl) as ydl:
+        ydl._num_downloads += 2     # what process_info does for each download
+        first = ydl
+    with pool.session({"quiet": True}, outtmpl) as ydl:
+        assert ydl is first
+        ydl._num_downloads += 1
+        assert ydl.prepare_filename(info) == str(tmp_path / "00001.mp4")
+    pool.close()
+
+
+def test_task_io_is_released_before_the_instance_is_reused():
+    pool = Viora.YDLPool()
+    io = Viora.TaskIO()
+    prev = Viora.TaskIO.bind(io)
+    sock = socket.socket()
+    try:
+        with pool.session({"quiet": True}):
+            io.track(sock)
+        # a later abort of this task must not reach sockets the next holder reuses
+        assert not io._sockets
+    finally:
+        Viora.TaskIO.bind(prev)
+        sock.close()
+        pool.close()
+
+
+def test_parallel_formats_respect_match_filter(tmp_path):
+    from yt_dlp import YoutubeDL
+    fetched = []
+    ydl = YoutubeDL({"quiet": True, "outtmpl": str(tmp_path / "%(title)s.%(ext)s"),
+                     "match_filter": lambda info, incomplete: "too long" if info["duration"] > 60 else None})
+    ydl.dl = lambda name, info, subtitle=False, test=False: fetched.append(name) or (True, True)
+    formats = [{"format_id": "v", "url": "http://x/v.mp4", "ext": "mp4", "protocol": "https"},
+               {"format_id": "a", "url": "http://x/a.m4a", "ext": "m4a", "protocol": "https"}]
+    info = {"id": "x", "title": "t", "ext": "mp4", "extractor": "generic", "extractor_key": "Generic",
+            "requested_formats": formats}
+
+    Viora.fetch_formats_in_parallel(ydl, dict(info, duration=600))
+    assert fetched == []
+    Viora.fetch_formats_in_parallel(ydl, dict(info, duration=30))
+    assert sorted(fetched) == [str(tmp_path / "t.fa.m4a"), str(tmp_path / "t.fv.mp4")]
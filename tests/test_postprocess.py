@@ -0,0 +1,75 @@
+import copy
+
+from yt_dlp import YoutubeDL
+from yt_dlp.postprocessor import PostProcessor
+from yt_dlp.utils import PostProcessingError
+
+import Viora
+
+RAW = {
+    "id": "x", "title": "t", "extractor": "generic", "extractor_key": "Generic", "webpage_url": "http://x/",
+    "formats": [{"format_id": "v", "url": "http://x/v.mp4", "ext": "mp4", "protocol": "https"}],
+    "subtitles": {"en": [{"url": "http://x/en.vtt", "ext": "vtt"}]},
+}
+
+
+def fake_dl(name, info, subtitle=False, test=False):
+    open(name, "wb").close()
+    return True, True
+
+
+def deferred(tmp_path, archive):
+    """A YoutubeDL that queues its post-processing like a download slot does."""
+    jobs = []
+    ydl = YoutubeDL({"quiet": True, "writesubtitles": True, "download_archive": archive,
+                     "outtmpl": str(tmp_path / "%(title)s.%(ext)s")})
+    ydl.dl = fake_dl
+    Viora.install_deferred_postprocessing(ydl, lambda: jobs)
+    return ydl, jobs
+
+
+def test_deferred_job_keeps_its_own_info(tmp_path):
+    ydl, jobs = deferred(tmp_path, set())
+    ydl.process_ie_result(copy.deepcopy(RAW), download=True)
+    (filename, job_info, _), = jobs
+    # yt-dlp strips these from the live dict once the format is done
+    assert job_info["id"] == "x" and job_info["title"] == "t"
+    assert list(job_info["requested_subtitles"]) == ["en"]
+    assert job_info["filepath"] == filename
+
+
+class Failing(PostProcessor):
+    def run(self, info):
+        raise PostProcessingError("ffmpeg exited with code 1")
+
+
+def postprocess(tmp_path, archive, jobs):
+    task = Viora.DownloadTask("http://x/")
+    task.io = Viora.TaskIO()
+    task.outtmpl = str(tmp_path / "%(title)s.%(ext)s")
+    opts = {"quiet": True, "format": "best", "download_archive": archive, "outtmpl": task.outtmpl}
+    worker = Viora.DownloadWorker(None, lambda *a: None, dict)
+    worker._complete = lambda task, settings: setattr(task, "status", Viora.TASK_DONE)
+    worker._postprocess(task, None, jobs, opts, {})
+    return task
+
+
+def test_archive_waits_for_postprocessing(tmp_path):
+    archive = set()
+    ydl, jobs = deferred(tmp_path, archive)
+    ydl.process_ie_result(copy.deepcopy(RAW), download=True)
+    assert jobs and not archive
+
+    assert postprocess(tmp_path, archive, jobs).status == Viora.TASK_DONE
+    assert archive == {"generic x"}
+
+
+def test_failed_postprocessing_is_not_archived(tmp_path):
+    archive = set()
+    ydl, jobs = deferred(tmp_path, archive)
+    ydl.process_ie_result(copy.deepcopy(RAW), download=True)
+    for _, job_info, _ in jobs:
+        job_info["__postprocessors"] = [Failing(ydl)]
+
+    assert postprocess(tmp_path, archive, jobs).status == Viora.TASK_FAILED
+    assert not archive
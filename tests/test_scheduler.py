@@ -0,0 +1,44 @@
+import queue
+
+import Viora
+
+
+def task(host, size=None, priority=0, enqueued_at=None):
+    t = Viora.DownloadTask(f"https://{host}/v")
+    t.archive_id = f"{host} v"
+    t.est_bytes = size
+    t.priority = priority
+    t.enqueued_at = enqueued_at
+    return t
+
+
+def drain(scheduler):
+    order = []
+    while True:
+        try:
+            order.append(scheduler.get(block=False).archive_id.split()[0])
+        except queue.Empty:
+            return order
+
+
+def test_shortest_job_wins_across_sites():
+    scheduler = Viora.TaskScheduler("sjf")
+    scheduler.put(task("a.example", size=8 * 1024 ** 3))
+    for _ in range(5):
+        scheduler.put(task("b.example", size=5 * 1024 ** 2))
+    assert drain(scheduler) == ["b.example"] * 5 + ["a.example"]
+
+
+def test_aged_task_beats_fresh_priority_on_another_site():
+    scheduler = Viora.TaskScheduler("priority", aging=1.0)
+    scheduler.put(task("b.example", priority=1))
+    scheduler.put(task("a.example", enqueued_at=Viora.time.monotonic() - 10 ** 6))
+    assert scheduler.get(block=False).archive_id == "a.example v"
+
+
+def test_fifo_still_takes_turns_between_sites():
+    scheduler = Viora.TaskScheduler("fifo")
+    for _ in range(3):
+        scheduler.put(task("a.example"))
+    scheduler.put(task("b.example"))
+    assert drain(scheduler)[:2] == ["a.example", "b.example"]
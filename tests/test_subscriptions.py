@@ -0,0 +1,70 @@
+import Viora
+
+
+def entry(i, date):
+    return {"id": i, "upload_date": date}
+
+
+def test_failed_entries_are_queued_again(tmp_path):
+    store = Viora.SubscriptionStore(str(tmp_path / "subs.json"))
+    url = "https://example.com/channel"
+    store.add(url)
+    store.record_sync(url, "chan", ["new", "older"], "20240102")
+    store.record_downloaded(url, "new")      # "older" failed
+
+    sub = store.get(url)
+    seen = set(sub["seen"])
+    assert Viora.SubscriptionStore.entry_is_known(sub, seen, entry("new", "20240102"))
+    assert not Viora.SubscriptionStore.entry_is_known(sub, seen, entry("older", "20240101"))
+    assert Viora.SubscriptionStore.entry_is_known(sub, seen, entry("ancient", "20230101"))
+
+
+def test_finished_entry_is_recorded_with_its_subscription(tmp_path, monkeypatch):
+    store = Viora.SubscriptionStore(str(tmp_path / "subs.json"))
+    monkeypatch.setattr(Viora, "SUBSCRIPTIONS", store)
+    url = "https://example.com/channel"
+    store.add(url)
+    store.record_sync(url, "chan", ["a"], None)
+    task = Viora.DownloadTask("https://example.com/watch/a")
+    task.subscription, task.entry_id = url, "a"
+    Viora.DownloadWorker._record_subscription_entry(task)
+    assert store.get(url)["seen"] == ["a"] and store.get(url)["pending"] == []
+
+
+def test_every_downloaded_entry_stays_known(tmp_path):
+    store = Viora.SubscriptionStore(str(tmp_path / "subs.json"))
+    url = "https://example.com/channel"
+    store.add(url)
+    ids = [f"v{i}" for i in range(3000)]        # newest first, no upload dates
+    store.record_sync(url, "chan", ids, None)
+    for i in ids:                               # the newest finish first
+        store.record_downloaded(url, i)
+    sub = store.get(url)
+    seen = set(sub["seen"])
+    assert all(Viora.SubscriptionStore.entry_is_known(sub, seen, {"id": i}) for i in ids[:50])
+
+
+def test_downloads_are_journaled_not_rewritten(tmp_path):
+    path = tmp_path / "subs.json"
+    store = Viora.SubscriptionStore(str(path))
+    url = "https://example.com/channel"
+    store.add(url)
+    store.record_sync(url, "chan", ["a", "b"], None)
+    saved = path.read_text()
+    store.record_downloaded(url, "a")
+    assert path.read_text() == saved
+
+    reloaded = Viora.SubscriptionStore(str(path)).get(url)
+    assert reloaded["seen"] == ["a"] and reloaded["pending"] == ["b"]
+    store.record_sync(url, "chan", [], None)    # a full save folds the journal in
+    assert not (tmp_path / "subs.seen.jsonl").exists()
+    assert Viora.SubscriptionStore(str(path)).get(url)["seen"] == ["a"]
+
+
+def test_bare_channel_syncs_its_videos_tab():
+    assert Viora.subscription_list_url("https://www.youtube.com/@someone") == "https://www.youtube.com/@someone/videos"
+    assert (Viora.subscription_list_url("https://youtube.com/channel/UCabc/")
+            == "https://youtube.com/channel/UCabc/videos")
+    for url in ("https://www.youtube.com/@someone/shorts", "https://www.youtube.com/playlist?list=PLx",
+                "https://example.com/@someone"):
+        assert Viora.subscription_list_url(url) == url
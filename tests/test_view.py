@@ -0,0 +1,61 @@
+import random
+from types import SimpleNamespace
+
+import Viora
+
+
+def view(tasks, sort_col, reverse=False, status="All"):
+    fake = SimpleNamespace(tasks={t.id: t for t in tasks}, _sort_col=sort_col, _sort_reverse=reverse,
+                           _view_rebuild_pending=False, _view_ids=[],
+                           _schedule_view_refresh=lambda: None,
+                           _task_visible_in_view=lambda t: status == "All" or t.status == status)
+    fake._refresh_view = lambda: None
+    Viora.App._rebuild_view(fake)
+    return fake
+
+
+def test_speed_and_eta_sort_numerically():
+    tasks = [Viora.DownloadTask("http://x/%d" % i) for i in range(3)]
+    for t, bps, eta in zip(tasks, (900, 20_000_000, 3_000), (5, None, 600)):
+        t.speed_bps, t.eta_seconds = bps, eta
+    by_speed, by_eta = view(tasks, "speed"), view(tasks, "eta")
+    assert [by_speed.tasks[i].speed_bps for i in by_speed._view_ids] == [900, 3_000, 20_000_000]
+    assert [by_eta.tasks[i].eta_seconds for i in by_eta._view_ids] == [5, 600, None]
+
+
+def test_reslot_matches_a_full_rebuild():
+    rng = random.Random(5)
+    tasks = [Viora.DownloadTask("http://x/%d" % i) for i in range(40)]
+    for t in tasks:
+        t.status, t.speed_bps = rng.choice((Viora.TASK_RUNNING, Viora.TASK_QUEUED)), rng.randrange(10 ** 6)
+    for reverse in (False, True):
+        fake = view(tasks, "speed", reverse, status=Viora.TASK_RUNNING)
+        for _ in range(200):
+            t = rng.choice(tasks)
+            t.status, t.speed_bps = rng.choice((Viora.TASK_RUNNING, Viora.TASK_DONE)), rng.randrange(10 ** 6)
+            Viora.App._reslot_in_view(fake, t)
+        expected = view(tasks, "speed", reverse, status=Viora.TASK_RUNNING)._view_ids
+        assert [fake.tasks[i].speed_bps for i in fake._view_ids] == [fake.tasks[i].speed_bps for i in expected]
+
+
+def test_rows_changing_together_end_up_sorted():
+    rng = random.Random(7)
+    tasks = [Viora.DownloadTask("http://x/%d" % i) for i in range(40)]
+    for t in tasks:
+        t.status, t.speed_bps = Viora.TASK_RUNNING, rng.randrange(10 ** 6)
+    fake = view(tasks, "speed")
+    fake.filter_status_var = SimpleNamespace(get=lambda: "All")
+    fake.tree = SimpleNamespace(exists=lambda iid: False)
+    fake._view_depends_on_state = lambda: Viora.App._view_depends_on_state(fake)
+    fake._reslot_in_view = lambda t: Viora.App._reslot_in_view(fake, t)
+    fake._schedule_view_rebuild = lambda: setattr(fake, "_view_rebuild_pending", True)
+    for _ in range(5):      # render ticks
+        changed = rng.sample(tasks, 10)
+        for t in changed:
+            t.speed_bps = rng.randrange(10 ** 6)
+        for t in changed:
+            Viora.App._update_task_row(fake, t)
+        if fake._view_rebuild_pending:
+            Viora.App._rebuild_view(fake)
+        speeds = [fake.tasks[i].speed_bps for i in fake._view_ids]
+        assert speeds == sorted(speeds)